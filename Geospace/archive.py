@@ -0,0 +1,180 @@
+"""
+Append-only binary archive of test results.
+
+A .gsa file is a 16-byte header followed by fixed-width 64-byte records
+(depth, LL, PL, PI, G20, class code, boring).  Reading maps the file into
+memory: records() is a structured NumPy view of the file and columns()
+are views of its fields, so millions of historical results load without
+parsing or copying and go straight to limits.classify (which takes the
+structured array as is), the project chart or the depth profiles.
+Appends only add whole records at the end of the file.
+
+    python archive.py history.gsa results_2019.csv sheet_2020.xlsx
+"""
+import argparse
+import os
+import struct
+import sys
+
+import numpy as np
+
+import gravity
+import limits
+
+MAGIC = b"GEOSPACE"
+VERSION = 1
+HEADER = struct.Struct("<8sHHI")  # magic, version, record size, reserved
+BORING_BYTES = 23
+APPEND_BATCH = 65536
+
+# Keys as in the lab sheets and SampleStore; the layout is part of the format
+RECORD = np.dtype({
+    "names": ["Sample Depth", "LL", "PL", "PI", "G20", "Class Code", "Boring No"],
+    "formats": ["<f8", "<f8", "<f8", "<f8", "<f8", "i1", f"S{BORING_BYTES}"],
+    "offsets": [0, 8, 16, 24, 32, 40, 41],
+    "itemsize": 64,
+})
+NUMBER_FIELDS = ["Sample Depth", "LL", "PL", "PI", "G20"]
+
+FILETYPES = [("Result archives", "*.gsa"), ("All files", "*.*")]
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def is_archive(path):
+    return os.path.splitext(path)[1].lower() == ".gsa"
+
+
+class ResultArchive:
+    """
+    One archive file, created if it does not exist.  readonly=True opens
+    an existing archive for viewing only: the file is never written, so
+    read-only files and shares work.  A record cut short by an interrupted
+    append is ignored when reading and dropped by the next append.
+    """
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self._records = None
+        if not readonly and (not os.path.exists(path) or os.path.getsize(path) == 0):
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, RECORD.itemsize, 0))
+            return
+        with open(path, "rb") as f:
+            magic, version, record_size, _ = HEADER.unpack(f.read(HEADER.size).ljust(HEADER.size, b"\0"))
+        if magic != MAGIC or version != VERSION or record_size != RECORD.itemsize:
+            raise ArchiveError(f"{path} is not a version {VERSION} result archive")
+
+    def __len__(self):
+        return (os.path.getsize(self.path) - HEADER.size) // RECORD.itemsize
+
+    def records(self):
+        """
+        Read-only structured view of every record, mapped from the file.
+        The mapping is reused until the archive grows.
+        """
+        count = len(self)
+        if self._records is None or len(self._records) != count:
+            self._records = (np.memmap(self.path, dtype=RECORD, mode="r", offset=HEADER.size, shape=(count,))
+                             if count else np.empty(0, dtype=RECORD))
+        return self._records
+
+    def columns(self):
+        """
+        {key: view} of every field; "Boring No" holds bytes.
+        """
+        records = self.records()
+        return {name: records[name] for name in RECORD.names}
+
+    def append(self, columns):
+        """
+        Append one record per value of the given columns ({key: values});
+        missing numbers are NaN, and the class code is classified from LL
+        and PI when not given (-1 where either is missing).  Returns the
+        number of records added.  Raises ArchiveError, before writing
+        anything, for a boring ID longer than BORING_BYTES in UTF-8 or an
+        archive opened read-only.
+        """
+        if self.readonly:
+            raise ArchiveError(f"{self.path} is open read-only")
+        count = max(len(values) for values in columns.values())
+        records = np.zeros(count, dtype=RECORD)
+        for name in NUMBER_FIELDS:
+            records[name] = gravity.to_float(columns[name]) if name in columns else np.nan
+        if "Class Code" in columns:
+            records["Class Code"] = columns["Class Code"]
+        else:
+            with np.errstate(invalid="ignore"):
+                codes = limits.classify(records)[0]
+            records["Class Code"] = np.where(np.isfinite(records["LL"]) & np.isfinite(records["PI"]), codes, -1)
+        if "Boring No" in columns:
+            boring = np.char.encode(np.asarray(columns["Boring No"], dtype=str), "utf-8")
+            too_long = np.char.str_len(boring) > BORING_BYTES
+            if too_long.any():
+                raise ArchiveError(f"boring ID {boring[too_long][0].decode('utf-8')!r} is longer than "
+                                   f"{BORING_BYTES} bytes")
+            records["Boring No"] = boring
+        with open(self.path, "r+b") as f:
+            f.seek(HEADER.size + len(self) * RECORD.itemsize)
+            f.truncate()  # drop a record cut short by an interrupted append
+            f.write(records.tobytes())
+        return count
+
+    def append_rows(self, rows, batch_size=APPEND_BATCH):
+        """
+        Append result rows (dicts, e.g. from importer.process) in batches;
+        returns the number of records added.
+        """
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                count += self.append(_columns(batch))
+                batch = []
+        if batch:
+            count += self.append(_columns(batch))
+        return count
+
+    def close(self):
+        # Drop the mapping (the file is only open while appending)
+        self._records = None
+
+
+def _columns(rows):
+    keys = [name for name in RECORD.names if name != "Class Code" and name in rows[0]]
+    return {key: [row.get(key, "") for row in rows] for key in keys}
+
+
+def describe(columns, i):
+    """
+    Hover text of record i of columns() for the project chart.
+    """
+    code = int(columns["Class Code"][i])
+    return (f"Boring {columns['Boring No'][i].decode('utf-8', 'replace')}\n"
+            f"Depth {columns['Sample Depth'][i]:g} m\n{limits.SOIL_TYPES[code] if code >= 0 else ''}")
+
+
+def main(argv=None):
+    import importer
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("archive", help="archive file (.gsa), created if missing")
+    parser.add_argument("inputs", nargs="+", help="results CSVs or Atterberg/pycnometer sheets to append")
+    args = parser.parse_args(argv)
+
+    archive = ResultArchive(args.archive)
+    for path in args.inputs:
+        header = next(importer.read_rows(path), {})
+        rows = (importer.read_rows(path) if "LL" in header or "G20" in header
+                else importer.process(path))
+        print(f"{path}: {archive.append_rows(rows)} records", file=sys.stderr)
+    print(f"{args.archive}: {len(archive)} records", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,122 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk 
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import numpy as np
-from scipy.interpolate import interp1d
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+import archive
+import diagnostics
+import export
+import importer
+import limits
+import validation
+from store import ProjectStore
+
+# matplotlib (via charts and the TkAgg backend) is imported on the first
+# plot, not at startup
+
+POLL_MS = 50
+LIVE_DEBOUNCE_MS = 300
+
+PROJECT_FILETYPES = [("Project files", "*.sqlite"), ("All files", "*.*")]
+ALL_BORINGS = "All borings"
+RESULT_COLUMNS = ["Boring No", "Sample No", "Sample Depth", "LL", "PL", "PI", "Soil Type"]
+
+# Entry columns of the two tables, named like the lab-sheet columns ("LL2 Dry")
+LIQUID_FIELDS = ["Can", "Clean", "Moist", "Dry", "Blows"]
+PLASTIC_FIELDS = ["Can", "Clean", "Moist", "Dry"]
+# The sample the cans belong to; results are archived under it
+SAMPLE_FIELDS = ["Boring No", "Sample No", "Sample Depth"]
+
+
+class ProjectResults(tk.Toplevel):
+    """
+    Results of a stored project, paged from the project file: the tree
+    only ever holds the rows in view, whatever the size of the project.
+    """
+
+    def __init__(self, parent, project_store, project_id, title="Project"):
+        super().__init__(parent)
+        self.title(f"Results - {title}")
+        self.project_store = project_store
+        self.project_id = project_id
+        self.boring = None
+        self.first = 0
+
+        top = ttk.Frame(self)
+        top.pack(fill="x", padx=5, pady=5)
+        ttk.Label(top, text="Boring:").pack(side="left")
+        self.cmb_boring = ttk.Combobox(top, state="readonly",
+                                       values=[ALL_BORINGS, *project_store.borings(project_id)])
+        self.cmb_boring.set(ALL_BORINGS)
+        self.cmb_boring.pack(side="left", padx=5)
+        self.cmb_boring.bind("<<ComboboxSelected>>", self.select_boring)
+        self.lbl_count = ttk.Label(top, text="")
+        self.lbl_count.pack(side="left", padx=5)
+
+        self.tree = ttk.Treeview(self, columns=RESULT_COLUMNS, show="headings", height=25)
+        for column in RESULT_COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=90 if column != "Soil Type" else 260)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scroll = ttk.Scrollbar(self, orient="vertical", command=self.scroll_to)
+        self.scroll.pack(side="right", fill="y")
+        self.tree.bind("<Configure>", lambda event: self.render())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel)
+        self.select_boring()
+
+    def select_boring(self, event=None):
+        choice = self.cmb_boring.get()
+        self.boring = None if choice == ALL_BORINGS else choice
+        self.count = self.project_store.count(self.project_id, self.boring)
+        self.lbl_count.config(text=f"{self.count} samples")
+        self.first = 0
+        self.render()
+
+    def page_size(self):
+        row_height = ttk.Style().lookup("Treeview", "rowheight") or 20
+        return max(1, int(self.tree.cget("height")), self.tree.winfo_height() // int(row_height))
+
+    def render(self):
+        # Fetch only the page in view from the (project, boring, depth) index
+        page = self.page_size()
+        self.first = max(0, min(self.first, self.count - page))
+        rows = self.project_store.page(self.project_id, self.first, page, self.boring, RESULT_COLUMNS)
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.tree.insert("", "end", values=["" if row[key] is None else
+                                                f"{row[key]:g}" if isinstance(row[key], float) else row[key]
+                                                for key in RESULT_COLUMNS])
+        if self.count:
+            self.scroll.set(self.first / self.count, (self.first + len(rows)) / self.count)
+        else:
+            self.scroll.set(0, 1)
+
+    def scroll_to(self, action, amount, unit=None):
+        if action == "moveto":
+            self.first = int(float(amount) * self.count)
+        elif unit == "pages":
+            self.first += int(amount) * self.page_size()
+        else:
+            self.first += int(amount)
+        self.render()
+
+    def on_wheel(self, event):
+        # "break": the Treeview must not scroll natively on top of the page
+        self.scroll_to("scroll", -1 if event.num == 4 or event.delta > 0 else 1, "units")
+        return "break"
+
 
 class aterbag(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
+        # Open project file: its id and {boring: sample count}
+        self.project_store = None
+        self.project_id = None
         self.boring_data = {}
         self.entry_widgets = {}
         self.liquid_limit = 0
@@ -32,6 +140,15 @@ class aterbag(tk.Frame):
             frame.pack(pady=5, padx=20, fill="x")
             ttk.Label(frame, text=f"{field}:", width=10).pack(side="left", padx=5)
             ttk.Label(frame, textvariable=controller.shared_data[field]).pack(side="right", expand=True, fill="x", padx=5)
+
+        # -- Sample --
+        sample_frame = ttk.Frame(first_column)
+        sample_frame.pack(fill="x", padx=20, pady=5)
+        self.sample_entries = {}
+        for row, field in enumerate(SAMPLE_FIELDS):
+            ttk.Label(sample_frame, text=f"{field}:").grid(row=row, column=0, sticky="w", padx=5, pady=2)
+            self.sample_entries[field] = ttk.Entry(sample_frame, width=15)
+            self.sample_entries[field].grid(row=row, column=1, sticky="ew", padx=5, pady=2)
         
         # -- Liquid Limit Analysis Section --
         ttk.Label(first_column, text="Liquid Limit Analysis", font=("Arial", 10, "bold")).pack(pady=5)
@@ -51,6 +168,8 @@ class aterbag(tk.Frame):
                 entry.grid(row=row, column=col, padx=2, pady=2)
                 row_entries.append(entry)
             self.liquid_entries.append(row_entries)
+            for entry in row_entries:
+                entry.bind("<KeyRelease>", lambda event, r=row - 1: self.on_cell_changed("liquid", r))
         
         # -- Plastic Limit Analysis Section --
         ttk.Label(first_column, text="Plastic Limit Analysis", font=("Arial", 10, "bold")).pack(pady=5)
@@ -69,7 +188,12 @@ class aterbag(tk.Frame):
                 entry.grid(row=row, column=col, padx=2, pady=2)
                 row_entries.append(entry)
             self.plastic_entries.append(row_entries)
+            for entry in row_entries:
+                entry.bind("<KeyRelease>", lambda event, r=row - 1: self.on_cell_changed("plastic", r))
         
+        # Cells that fail validation are marked in place
+        ttk.Style(self).configure("Invalid.TEntry", fieldbackground="#f8d7da", foreground="#a00000")
+
         # -- Results Display Label --
         self.results_label = ttk.Label(first_column, text="", justify="center")
         self.results_label.pack(pady=10)
@@ -78,6 +202,45 @@ class aterbag(tk.Frame):
         self.calculate_btn = ttk.Button(first_column, text="Calculate All", command=self.calculate_all)
         self.calculate_btn.pack(pady=5)
 
+        # Shown while a calculation is running
+        self.progress = ttk.Progressbar(first_column, mode="indeterminate", length=150)
+
+        # -- Batch import: lab sheet in, results CSV out --
+        self.import_btn = ttk.Button(first_column, text="Import Sheet...", command=self.import_sheet)
+        self.import_btn.pack(pady=5)
+
+        # -- Casagrande chart of a whole project / archive --
+        self.project_chart_btn = ttk.Button(first_column, text="Project Chart...", command=self.open_project_chart)
+        self.project_chart_btn.pack(pady=5)
+
+        # -- LL/PL/PI/G20 against depth and per-boring summary --
+        self.profiles_btn = ttk.Button(first_column, text="Depth Profiles...", command=self.open_depth_profiles)
+        self.profiles_btn.pack(pady=5)
+
+        self.diagnostics_btn = ttk.Button(first_column, text="Diagnostics...", command=self.show_diagnostics)
+        self.diagnostics_btn.pack(pady=5)
+
+        # -- Project file: imported results are stored by boring and depth --
+        self.open_project_btn = ttk.Button(first_column, text="Open Project...", command=self.open_project)
+        self.open_project_btn.pack(pady=5)
+        self.project_results_btn = ttk.Button(first_column, text="Project Results...",
+                                              command=self.show_project_results)
+        self.project_results_btn.pack(pady=5)
+        self.export_btn = ttk.Button(first_column, text="Export Results...", command=self.export_results)
+        self.export_btn.pack(pady=5)
+
+        # -- Result archive: a calculation is appended to it when its result is new --
+        self.archive_btn = ttk.Button(first_column, text="Open Archive...", command=self.open_archive)
+        self.archive_btn.pack(pady=5)
+        self.archive = None
+        self.archived = {}  # (boring no, sample no) -> last record appended
+
+        # -- Local ingestion service: results posted by balances/LIMS land here --
+        self.service_btn = ttk.Button(first_column, text="Start Service", command=self.toggle_service)
+        self.service_btn.pack(pady=5)
+        self.service = None
+        self.service_rows = 0
+
         # ---------------------------------------
         # 2) Second Column: Graph Display
         # ---------------------------------------
@@ -95,193 +258,585 @@ class aterbag(tk.Frame):
         self.casagrande_graph_frame = ttk.Frame(self.graph_frame)
         self.casagrande_graph_frame.pack(fill="both", expand=True)
 
+        # প্রথম হিসাবের সময় তৈরি হয় এবং পরে পুনর্ব্যবহৃত হয়
+        self.ll_chart = None
+        self.casagrande_chart = None
+
+        # Background calculation: one worker thread, results polled with after()
+        self.render_lock = threading.RLock()
+        self.calc_executor = None
+        self.calc_results = queue.Queue()
+        self.calc_generation = 0
+        self.calc_pending = False
+
+        # Live updates: parsed values and moisture content cached per can,
+        # so a changed cell only re-parses its own can
+        self.live_values = {"liquid": np.full((len(self.liquid_entries), 4), np.nan),
+                            "plastic": np.full((len(self.plastic_entries), 3), np.nan)}
+        self.live_mc = {"liquid": np.full(len(self.liquid_entries), np.nan),
+                        "plastic": np.full(len(self.plastic_entries), np.nan)}
+        self.live_dirty = set()
+        self.live_after = None
+
     # -----------------------------------------------------------------
     # মেইন ফাংশনসমূহ
     # -----------------------------------------------------------------
+    @diagnostics.instrument
     def calculate_all(self):
         """
-        Calculate liquid limit, plastic limit, and show graphs.
+        Calculate liquid limit, plastic limit, and show graphs.  The entries
+        are read here; the calculation and chart rendering run on a worker
+        thread and only the newest request's results are shown.
         """
-        self.calculate_liquid_limit()
-        self.classify_soil()
+        try:
+            inputs = self.read_inputs()
+        except ValueError as e:
+            self.show_input_errors(str(e))
+            return
 
-    def calculate_liquid_limit(self):
+        self.create_charts()
+        self.calc_generation += 1
+        if self.calc_executor is None:
+            self.calc_executor = ThreadPoolExecutor(max_workers=1)
+        self.calc_executor.submit(self.run_calculation, self.calc_generation, inputs)
+
+        if not self.calc_pending:
+            self.calc_pending = True
+            self.progress.pack(pady=5)
+            self.progress.start(10)
+            self.after(POLL_MS, self.poll_results)
+
+    @diagnostics.instrument
+    def run_calculation(self, generation, inputs):
         """
-        Calculate liquid limit using blow counts & moisture contents.
+        Worker thread: compute, update the chart artists and render both
+        figures with Agg.  No Tk calls here.
         """
+        import charts
+
+        if generation != self.calc_generation:
+            return  # superseded while waiting in the queue
         try:
-            moisture_contents = []
-            blow_counts = []
-            liquid_results = []
-            
-            for row_entries in self.liquid_entries:
-                can_no = row_entries[0].get().strip()
-                if not can_no:
-                    continue
-                wt_clean = float(row_entries[1].get())
-                wt_moist = float(row_entries[2].get())
-                wt_dry = float(row_entries[3].get())
-                blow_count = int(row_entries[4].get())
-                
-                dry_soil = wt_dry - wt_clean
-                pore_water = wt_moist - wt_dry
-                mc = (pore_water / dry_soil) * 100 if dry_soil != 0 else 0
-                
-                moisture_contents.append(mc)
-                blow_counts.append(blow_count)
-                
-                liquid_results.append({
-                    "Can No.": can_no,
-                    "Wt. of Can+Moist soil (gm)": wt_moist,
-                    "Wt. of Can+Dry soil (gm)": wt_dry,
-                    "Wt. of Dry soil (gm)": dry_soil,
-                    "Wt. of pore Water (gm)": pore_water,
-                    "Moisture Content (%)": mc,
-                    "Blow Count": blow_count
-                })
-            
-            if not blow_counts:
-                raise ValueError("No sample data entered for Liquid Limit Analysis.")
-            
-            blow_counts = np.array(blow_counts)
-            moisture_contents = np.array(moisture_contents)
-            
-            sorted_idx = np.argsort(blow_counts)
-            sorted_blows = blow_counts[sorted_idx]
-            sorted_mc = moisture_contents[sorted_idx]
-            
-            if len(sorted_blows) < 2:
-                raise ValueError("Insufficient data for interpolation.")
-            
-            # Interpolate to find moisture content at 25 blows
-            f = interp1d(sorted_blows, sorted_mc, kind='linear', fill_value='extrapolate')
-            ll_value = float(f(25))
-            
-            # Simple rounding
-            decimal_part = ll_value - int(ll_value)
-            if decimal_part >= 0.5:
-                ll_value = int(ll_value) + 1
-            else:
-                ll_value = int(ll_value)
-            
-            # Build result text
-            result_text = "Liquid Limit Analysis Results:\n"
-            result_text += ("Can No.\tWt. of Can+Moist\tWt. of Can+Dry\tWt. Dry soil\t"
-                            "Wt. pore Water\tMoisture (%)\tBlow Count\n")
-            for r in liquid_results:
-                result_text += (f"{r['Can No.']}\t{r['Wt. of Can+Moist soil (gm)']:.2f}\t"
-                                f"{r['Wt. of Can+Dry soil (gm)']:.2f}\t{r['Wt. of Dry soil (gm)']:.2f}\t"
-                                f"{r['Wt. of pore Water (gm)']:.2f}\t{r['Moisture Content (%)']:.2f}\t"
-                                f"{r['Blow Count']}\n")
-            
-            # Plastic Limit
-            plastic_text, plastic_limit = self.calculate_plastic_limit(display_only=True)
-            result_text += plastic_text
-            
-            # Update class variables
-            self.liquid_limit = ll_value
-            self.plastic_limit = plastic_limit
-            self.PI = ll_value - plastic_limit
-            
-            # Append final results
-            result_text += f"\nLiquid Limit (LL): {self.liquid_limit}%"
-            result_text += f"\nPlastic Limit (PL): {self.plastic_limit}%"
-            result_text += f"\nPlasticity Index (PI): {self.PI}%\n"
-            
-            # Show in label
-            self.results_label.config(text=result_text)
-            
-            # Plot Liquid Limit Graph
-            self.plot_liquid_limit_graph(sorted_blows, sorted_mc, ll_value)
-            
+            results = self.compute_results(*inputs)
+            with self.render_lock:
+                self.ll_chart.update(results["blows"], results["moisture"], results["LL"])
+                self.casagrande_chart.update(results["LL"], results["PI"], results["soil_type"])
+                charts.render_offscreen(self.ll_canvas)
+                charts.render_offscreen(self.casagrande_canvas)
         except ValueError as e:
-            messagebox.showerror("Error", str(e))
+            results = e
+        except Exception as e:  # anything else must still reach poll_results
+            results = RuntimeError(f"Calculation failed: {e}")
+        self.calc_results.put((generation, results))
+
+    def poll_results(self):
+        """
+        Main thread (via after()): show the newest finished calculation.
+        """
+        latest = None
+        while True:
+            try:
+                latest = self.calc_results.get_nowait()
+            except queue.Empty:
+                break
+
+        if latest is not None and latest[0] == self.calc_generation:
+            self.calc_pending = False
+            self.progress.stop()
+            self.progress.pack_forget()
+            self.show_results(latest[1])
+        if self.calc_pending:
+            self.after(POLL_MS, self.poll_results)
+
+    def show_results(self, results):
+        if isinstance(results, Exception):
+            self.show_input_errors(str(results))
+            return
+        self.liquid_limit = results["LL"]
+        self.plastic_limit = results["PL"]
+        self.PI = results["PI"]
+        self.results_label.config(text=f"{results['text']}\nSoil Type: {results['soil_type']}")
+        if self.archive is not None:
+            self.archive_results(results)
+        # figures are already rendered; just copy the pixels to Tk
+        with self.render_lock:
+            self.ll_canvas.blit()
+            self.casagrande_canvas.blit()
+
+    # -----------------------------------------------------------------
+    # Live updates while typing
+    # -----------------------------------------------------------------
+    def on_cell_changed(self, table, row):
+        """
+        Remember the changed can and (re)start the debounce timer.
+        """
+        self.live_dirty.add((table, row))
+        if self.live_after is not None:
+            self.after_cancel(self.live_after)
+        self.live_after = self.after(LIVE_DEBOUNCE_MS, self.live_update)
 
-    def calculate_plastic_limit(self, display_only=False):
+    def live_update(self):
         """
-        Calculate plastic limit using minimum moisture content from plastic_entries.
+        Re-parse only the changed cans, then update LL/PL/PI, the soil type
+        and the plotted points.  Incomplete input is ignored silently.
         """
+        self.live_after = None
+        # mark bad cells as they are typed; cells not filled in yet are not errors
+        report = self.validate_inputs(ignore=(validation.MISSING, validation.TOO_FEW_CANS))
+        for table, row in self.live_dirty:
+            entries = self.liquid_entries if table == "liquid" else self.plastic_entries
+            try:
+                parsed = self.read_can_row(entries[row], with_blows=table == "liquid")
+            except ValueError:
+                parsed = None
+            values = self.live_values[table][row]
+            values[:] = parsed[1] if parsed else np.nan
+            self.live_mc[table][row] = limits.moisture_content(*values[:3])[0]
+        self.live_dirty.clear()
+
+        # cans that failed validation are left out, as in read_inputs and the importer
+        blows = self.live_values["liquid"][:, 3]
+        liquid_mc = np.where(report.cans["LL"][0], self.live_mc["liquid"], np.nan)
+        plastic_mc = np.where(report.cans["PL"][0], self.live_mc["plastic"], np.nan)
+        LL = limits.liquid_limit(blows, liquid_mc)[0]
+        PL = limits.plastic_limit(plastic_mc)[0]
+        if not (np.isfinite(LL) and np.isfinite(PL)):
+            return
+
+        self.liquid_limit = int(LL)
+        self.plastic_limit = int(PL)
+        self.PI = self.liquid_limit - self.plastic_limit
+        soil_type = self.classify_soil_type(self.liquid_limit, self.PI)
+        self.results_label.config(text=f"Liquid Limit (LL): {self.liquid_limit}%"
+                                       f"\nPlastic Limit (PL): {self.plastic_limit}%"
+                                       f"\nPlasticity Index (PI): {self.PI}%\n"
+                                       f"\nSoil Type: {soil_type}")
+
+        valid = ~(np.isnan(blows) | np.isnan(liquid_mc))
+        order = np.argsort(blows[valid], kind="stable")
+        self.plot_liquid_limit_graph(blows[valid][order].astype(int),
+                                     liquid_mc[valid][order], self.liquid_limit)
+        self.plot_casagrande_chart(self.liquid_limit, self.PI, soil_type)
+
+    def import_sheet(self):
+        """
+        Stream an Atterberg lab sheet through the engine and write the
+        results next to it as <name>_results.csv.
+        """
+        path = filedialog.askopenfilename(filetypes=[("Lab sheets", "*.csv *.xlsx"), ("All files", "*.*")])
+        if not path:
+            return
+        out_path = os.path.splitext(path)[0] + "_results.csv"
+        stats = importer.import_file(path, out_path, kind="atterberg")
+        text = (f"Imported {stats['rows']} samples in {stats['seconds']:.2f} s "
+                f"({stats['rows_per_second']:.0f} rows/s)\nResults: {out_path}")
+        if self.project_store is not None:
+            # streamed back from the results file, one transaction per batch
+            self.project_store.add_rows(self.project_id, importer.read_rows(out_path))
+            self.boring_data = self.project_store.borings(self.project_id)
+            text += f"\nSaved to project ({len(self.boring_data)} borings)"
+        self.results_label.config(text=text)
+
+    def open_project(self):
+        """
+        Open or create a project file; the project is named after the
+        Project field and the project details are saved with it.
+        """
+        path = filedialog.asksaveasfilename(title="Open Project", defaultextension=".sqlite",
+                                            filetypes=PROJECT_FILETYPES, confirmoverwrite=False)
+        if not path:
+            return
+        fields = {field: var.get() for field, var in self.controller.shared_data.items()}
+        name = fields.get("Project") or os.path.splitext(os.path.basename(path))[0]
+        if self.project_store is not None:
+            self.project_store.close()
+        self.project_store = ProjectStore(path)
+        self.project_id = self.project_store.project(name, fields)
+        self.boring_data = self.project_store.borings(self.project_id)
+        self.results_label.config(text=f"Project: {name}\n{sum(self.boring_data.values())} samples "
+                                       f"in {len(self.boring_data)} borings")
+
+    def open_archive(self):
+        """
+        Open or create a result archive; later calculations are appended.
+        """
+        path = filedialog.asksaveasfilename(title="Open Archive", defaultextension=".gsa",
+                                            filetypes=archive.FILETYPES, confirmoverwrite=False)
+        if not path:
+            return
         try:
-            moisture_contents = []
-            results = []
-            
-            for row_entries in self.plastic_entries:
-                can_no = row_entries[0].get().strip()
-                if not can_no:
-                    continue
-                wt_clean = float(row_entries[1].get())
-                wt_moist = float(row_entries[2].get())
-                wt_dry = float(row_entries[3].get())
-                
-                dry_soil = wt_dry - wt_clean
-                pore_water = wt_moist - wt_dry
-                mc = (pore_water / dry_soil) * 100 if dry_soil != 0 else 0
-                
-                moisture_contents.append(mc)
-                results.append({
-                    "Can No.": can_no,
-                    "Wt. of Can+Moist soil (gm)": wt_moist,
-                    "Wt. of Can+Dry soil (gm)": wt_dry,
-                    "Wt. of Dry soil (gm)": dry_soil,
-                    "Wt. of pore Water (gm)": pore_water,
-                    "Moisture Content (%)": mc
-                })
-            
-            if not moisture_contents:
-                raise ValueError("No sample data entered for Plastic Limit Analysis.")
-            
-            # Use the minimum moisture content as Plastic Limit
-            pl_unrounded = min(moisture_contents)
-            decimal_part = pl_unrounded - int(pl_unrounded)
-            if decimal_part >= 0.5:
-                plastic_limit = int(pl_unrounded) + 1
-            else:
-                plastic_limit = int(pl_unrounded)
-            
-            # Build result text
-            result_text = "\nPlastic Limit Analysis Results:\n"
-            result_text += ("Can No.\tWt. of Can+Moist\tWt. of Can+Dry\tWt. Dry soil\t"
-                            "Wt. pore Water\tMoisture (%)\n")
-            for r in results:
-                result_text += (f"{r['Can No.']}\t{r['Wt. of Can+Moist soil (gm)']:.2f}\t"
-                                f"{r['Wt. of Can+Dry soil (gm)']:.2f}\t{r['Wt. of Dry soil (gm)']:.2f}\t"
-                                f"{r['Wt. of pore Water (gm)']:.2f}\t{r['Moisture Content (%)']:.2f}\n")
-            
-            return result_text, plastic_limit
-        
+            self.archive = archive.ResultArchive(path)
+        except (archive.ArchiveError, OSError) as e:
+            self.results_label.config(text=str(e))
+            return
+        self.archived = {}
+        self.results_label.config(text=f"Archive: {os.path.basename(path)}\n{len(self.archive)} results")
+
+    def archive_results(self, results):
+        """
+        Append the sample's limits to the archive.  Recalculating a sample
+        without changing it adds nothing; an edited sample gets a new
+        record (the archive is the history of its results).  Nothing is
+        archived until the sample has a boring or sample no.
+        """
+        sample = {field: entry.get().strip() for field, entry in self.sample_entries.items()}
+        key = (sample["Boring No"], sample["Sample No"])
+        if not any(key):
+            self.results_label.config(text=f"{self.results_label.cget('text')}\n"
+                                           f"Not archived: enter the boring and sample no.")
+            return
+        record = {"Boring No": [sample["Boring No"]], "Sample Depth": [sample["Sample Depth"]],
+                  "LL": [results["LL"]], "PL": [results["PL"]], "PI": [results["PI"]]}
+        if self.archived.get(key) == repr(record):
+            return
+        try:
+            self.archive.append(record)
+        except archive.ArchiveError as e:
+            self.results_label.config(text=f"{self.results_label.cget('text')}\nNot archived: {e}")
+            return
+        self.archived[key] = repr(record)
+
+    def show_project_results(self):
+        if self.project_store is None:
+            self.open_project()
+            if self.project_store is None:
+                return
+        return ProjectResults(self, self.project_store, self.project_id,
+                              title=os.path.basename(self.project_store.path))
+
+    def export_results(self):
+        """
+        Export the open project to CSV, Excel or a formatted lab report,
+        streamed from the project file in chunks.
+        """
+        if self.project_store is None:
+            self.open_project()
+            if self.project_store is None:
+                return
+        filetype = tk.StringVar(self)
+        path = filedialog.asksaveasfilename(title="Export Results", defaultextension=".csv",
+                                            filetypes=export.FILETYPES, typevariable=filetype)
+        if not path:
+            return
+        details = self.project_store.project_fields(self.project_id)
+        count = export.export(export.store_chunks(self.project_store, self.project_id, RESULT_COLUMNS),
+                              path, RESULT_COLUMNS, export.file_format(path, filetype.get()),
+                              title="Atterberg Limits", details=details)
+        self.results_label.config(text=f"Exported {count} samples\n{path}")
+
+    def open_project_chart(self):
+        """
+        Plot every sample of the open project (or else of a results CSV or
+        lab sheet) on a Casagrande chart in its own window, with pan/zoom
+        and nearest-sample hover.
+        """
+        if self.project_store is not None:
+            columns = self.project_store.columns(self.project_id, ["Boring No", "Sample No", "Sample Depth",
+                                                                   "LL", "PI", "Soil Type"])
+            self.show_project_chart(columns["LL"], columns["PI"],
+                                    lambda i: (f"Boring {columns['Boring No'][i]}, sample {columns['Sample No'][i]}\n"
+                                               f"Depth {columns['Sample Depth'][i]:g} m\n{columns['Soil Type'][i]}"),
+                                    title=os.path.basename(self.project_store.path))
+            return
+        path = filedialog.askopenfilename(filetypes=[("Lab sheets / results", "*.csv *.xlsx *.gsa"),
+                                                     ("All files", "*.*")])
+        if not path:
+            return
+        if archive.is_archive(path):
+            # mapped, not read: the chart gets views of the file
+            try:
+                columns = archive.ResultArchive(path, readonly=True).columns()
+            except (archive.ArchiveError, OSError) as e:
+                self.results_label.config(text=str(e))
+                return
+            self.show_project_chart(columns["LL"], columns["PI"], lambda i: archive.describe(columns, i),
+                                    title=os.path.basename(path))
+            return
+        columns = importer.load_results(path)
+        self.show_project_chart(columns["LL"], columns["PI"],
+                                lambda i: (f"Boring {columns['Boring No'][i]}, sample {columns['Sample No'][i]}\n"
+                                           f"Depth {columns['Sample Depth'][i]:g} m\n{columns['Soil Type'][i]}"),
+                                title=os.path.basename(path))
+
+    def open_depth_profiles(self):
+        """
+        Depth profiles and per-boring summary of the open project, or else
+        of a results CSV or lab sheet.
+        """
+        from profile_view import DepthProfileWindow
+
+        if self.project_store is not None:
+            columns = self.project_store.columns(self.project_id, ["Boring No", "Sample Depth",
+                                                                   "LL", "PL", "PI", "G20"])
+            title = os.path.basename(self.project_store.path)
+        else:
+            path = filedialog.askopenfilename(filetypes=[("Lab sheets / results", "*.csv *.xlsx *.gsa"),
+                                                         ("All files", "*.*")])
+            if not path:
+                return
+            try:
+                columns = (archive.ResultArchive(path, readonly=True).columns() if archive.is_archive(path)
+                           else importer.load_results(path))
+            except (archive.ArchiveError, OSError) as e:
+                self.results_label.config(text=str(e))
+                return
+            title = os.path.basename(path)
+        return DepthProfileWindow(self, columns, title=title)
+
+    def show_diagnostics(self):
+        from diagnostics_view import DiagnosticsWindow
+        return DiagnosticsWindow(self)
+
+    def toggle_service(self):
+        """
+        Start or stop the local ingestion service.  Atterberg results it
+        computes are shown here and saved to the open project.
+        """
+        import service
+
+        hub = service.shared(self.controller)
+        if self.service is not None:
+            hub.unsubscribe("atterberg")
+            self.service = None
+            self.service_btn.config(text="Start Service")
+            return
+        try:
+            self.service = hub.subscribe(self, "atterberg", self.on_service_results)
+        except OSError as e:
+            self.results_label.config(text=f"Service not started: {e}")
+            return
+        self.service_btn.config(text="Stop Service")
+        self.results_label.config(text=f"Service listening on http://{self.service.service.host}:"
+                                       f"{self.service.service.port}/atterberg")
+
+    def on_service_results(self, rows):
+        # Main thread (polled with after()): one micro-batch of results
+        self.service_rows += len(rows)
+        if self.project_store is not None:
+            self.project_store.add_rows(self.project_id, rows)
+            self.boring_data = self.project_store.borings(self.project_id)
+        last = rows[-1]
+        text = (f"Service: {self.service_rows} samples received\n"
+                f"Last: boring {last['Boring No']}, sample {last['Sample No']}\n")
+        if last["Error"]:
+            text += last["Error"]
+        else:
+            text += (f"LL: {last['LL']:.0f}, PL: {last['PL']:.0f}, PI: {last['PI']:.0f}\n"
+                     f"Soil Type: {last['Soil Type']}")
+        self.results_label.config(text=text)
+
+    def show_project_chart(self, LL, PI, describe, title="Project"):
+        import charts
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from matplotlib.figure import Figure
+
+        window = tk.Toplevel(self)
+        window.title(f"Casagrande’s Plasticity Chart - {title} ({len(LL)} samples)")
+        chart = charts.CasagrandeChart(Figure(figsize=(8, 6), dpi=100))
+        canvas = FigureCanvasTkAgg(chart.figure, master=window)
+        NavigationToolbar2Tk(canvas, window).pack(side="bottom", fill="x")
+        canvas.get_tk_widget().pack(fill="both", expand=True)
+        window.cloud = charts.SampleCloud(chart, LL, PI, describe)
+        window.cloud.connect(canvas)
+        canvas.draw()
+        return window
+
+    def read_can_row(self, row_entries, with_blows=False):
+        """
+        Parse one row of entries into (can no., [clean, moist, dry(, blows)]),
+        or None if the row has no can no.
+        """
+        can_no = row_entries[0].get().strip()
+        if not can_no:
+            return None
+        values = [float(row_entries[1].get()),
+                  float(row_entries[2].get()),
+                  float(row_entries[3].get())]
+        if with_blows:
+            values.append(int(float(row_entries[4].get())))
+        return can_no, values
+
+    def read_cans(self, entries, with_blows=False):
+        """
+        Parse one table of entries into can numbers and a float array with
+        columns (clean, moist, dry[, blows]).  Rows without a can no. are skipped.
+        """
+        cans = []
+        rows = []
+        for row_entries in entries:
+            parsed = self.read_can_row(row_entries, with_blows)
+            if parsed is None:
+                continue
+            cans.append(parsed[0])
+            rows.append(parsed[1])
+        return cans, np.array(rows, dtype=float).reshape(-1, 4 if with_blows else 3)
+
+    def table_entries(self):
+        # (lab-sheet field name, entry) of every cell of both tables
+        for prefix, entries, fields in (("LL", self.liquid_entries, LIQUID_FIELDS),
+                                        ("PL", self.plastic_entries, PLASTIC_FIELDS)):
+            for i, row_entries in enumerate(entries, 1):
+                for field, entry in zip(fields, row_entries):
+                    yield f"{prefix}{i} {field}", entry
+
+    def validate_inputs(self, ignore=()):
+        """
+        Check all cells of both tables in one pass and mark the bad ones
+        (errors with a code in ignore are not marked).  Returns the
+        validation.ValidationReport.
+        """
+        entries = dict(self.table_entries())
+        report = validation.check_atterberg({field: [entry.get()] for field, entry in entries.items()}, 1,
+                                            len(self.liquid_entries), len(self.plastic_entries))
+        bad = {error.field for error in report.errors if error.code not in ignore}
+        for field, entry in entries.items():
+            entry.configure(style="Invalid.TEntry" if field in bad else "TEntry")
+        return report
+
+    def show_input_errors(self, message):
+        # Errors go to the results label (bad cells are already marked), not a dialog
+        self.results_label.config(text=f"Please correct the marked cells:\n{message}")
+
+    def read_inputs(self):
+        """
+        Validate and parse the liquid and plastic limit tables; raises
+        ValueError listing every problem found.
+        """
+        report = self.validate_inputs()
+        if not report.ok:
+            raise ValueError("\n".join(error.message for error in report.errors))
+        liquid_cans, liquid = self.read_cans(self.liquid_entries, with_blows=True)
+        plastic_cans, plastic = self.read_cans(self.plastic_entries)
+        return liquid_cans, liquid, plastic_cans, plastic
+
+    def compute_results(self, liquid_cans, liquid, plastic_cans, plastic):
+        """
+        LL, PL, PI, soil type and the result text for the parsed tables.
+        Touches no widgets, so it can run on the worker thread.
+        """
+        # one-sample batch through the headless engine
+        result = limits.calculate_limits(*liquid.T[:, None], *plastic.T[:, None])
+        if not np.isfinite(result.LL[0]):
+            raise ValueError("Insufficient data for interpolation.")
+
+        ll_value = int(result.LL[0])
+        blow_counts = liquid[:, 3].astype(int)
+        moisture_contents = result.liquid_mc[0]
+
+        # Build result text: parts are collected and joined once
+        parts = ["Liquid Limit Analysis Results:\n",
+                 "Can No.\tWt. of Can+Moist\tWt. of Can+Dry\tWt. Dry soil\t"
+                 "Wt. pore Water\tMoisture (%)\tBlow Count\n"]
+        parts.extend(f"{can_no}\t{liquid[i, 1]:.2f}\t"
+                     f"{liquid[i, 2]:.2f}\t{result.liquid_dry[0, i]:.2f}\t"
+                     f"{result.liquid_water[0, i]:.2f}\t{moisture_contents[i]:.2f}\t"
+                     f"{blow_counts[i]}\n"
+                     for i, can_no in enumerate(liquid_cans))
+
+        # Plastic Limit
+        plastic_text, plastic_limit = self.calculate_plastic_limit(plastic_cans, plastic, result)
+        parts.append(plastic_text)
+        PI = ll_value - plastic_limit
+
+        # Append final results
+        parts.append(f"\nLiquid Limit (LL): {ll_value}%"
+                     f"\nPlastic Limit (PL): {plastic_limit}%"
+                     f"\nPlasticity Index (PI): {PI}%\n")
+        if np.isfinite(result.flow_index[0]):
+            parts.append(f"Flow Index (If): {result.flow_index[0]:.2f}\n"
+                         f"Toughness Index (It): {result.toughness_index[0]:.2f}\n")
+        result_text = "".join(parts)
+
+        sorted_idx = np.argsort(blow_counts, kind="stable")
+        return {
+            "LL": ll_value,
+            "PL": plastic_limit,
+            "PI": PI,
+            "soil_type": self.classify_soil_type(ll_value, PI),
+            "text": result_text,
+            "blows": blow_counts[sorted_idx],
+            "moisture": moisture_contents[sorted_idx],
+        }
+
+    @diagnostics.instrument
+    def calculate_liquid_limit(self):
+        """
+        Calculate liquid limit using blow counts & moisture contents
+        (synchronously, on the calling thread).
+        """
+        try:
+            results = self.compute_results(*self.read_inputs())
         except ValueError as e:
-            messagebox.showerror("Error", str(e))
-            return "", 0
+            self.show_input_errors(str(e))
+            return
+
+        # Update class variables
+        self.liquid_limit = results["LL"]
+        self.plastic_limit = results["PL"]
+        self.PI = results["PI"]
+
+        # Show in label
+        self.results_label.config(text=results["text"])
+
+        # Plot Liquid Limit Graph
+        self.plot_liquid_limit_graph(results["blows"], results["moisture"], results["LL"])
+
+    def calculate_plastic_limit(self, cans, plastic, result):
+        """
+        Build the plastic limit text from the engine result; the plastic limit
+        is the minimum moisture content of the plastic cans.
+        """
+        plastic_limit = int(result.PL[0])
+
+        # Build result text
+        parts = ["\nPlastic Limit Analysis Results:\n",
+                 "Can No.\tWt. of Can+Moist\tWt. of Can+Dry\tWt. Dry soil\t"
+                 "Wt. pore Water\tMoisture (%)\n"]
+        parts.extend(f"{can_no}\t{plastic[i, 1]:.2f}\t"
+                     f"{plastic[i, 2]:.2f}\t{result.plastic_dry[0, i]:.2f}\t"
+                     f"{result.plastic_water[0, i]:.2f}\t{result.plastic_mc[0, i]:.2f}\n"
+                     for i, can_no in enumerate(cans))
+
+        return "".join(parts), plastic_limit
 
     # -----------------------------------------------------------------
     # গ্রাফ আঁকার ফাংশন
     # -----------------------------------------------------------------
+    def create_charts(self):
+        """
+        Build both figures and their Tk canvases on first use.
+        """
+        if self.ll_chart is not None:
+            return
+        import charts
+
+        # ফিগার একবারই তৈরি হয়, পরে শুধু ডেটা আপডেট হয়
+        self.ll_chart = charts.LiquidLimitChart()
+        self.ll_canvas = charts.tk_canvas(self.ll_chart.figure, self.ll_graph_frame, self.render_lock)
+        self.ll_canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.ll_blitter = charts.Blitter(self.ll_canvas, self.ll_chart.artists)
+
+        self.casagrande_chart = charts.CasagrandeChart()
+        self.casagrande_canvas = charts.tk_canvas(self.casagrande_chart.figure,
+                                                  self.casagrande_graph_frame, self.render_lock)
+        self.casagrande_canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.casagrande_blitter = charts.Blitter(self.casagrande_canvas,
+                                                 self.casagrande_chart.artists)
+
+    @diagnostics.instrument
     def plot_liquid_limit_graph(self, blow_counts, moisture_contents, ll_value):
         """
         Draw the Liquid Limit Analysis graph in ll_graph_frame
         with a fixed size (width x height).
         """
-        # ll_graph_frame এর পূর্ববর্তী সব উইজেট মুছে দিন
-        for widget in self.ll_graph_frame.winfo_children():
-            widget.destroy()
-        
-        # figsize=(width_in_inches, height_in_inches), dpi=100 => পিক্সেলে পরিণত হবে
-        fig, ax = plt.subplots(figsize=(5, 4), dpi=100)  
-        ax.plot(blow_counts, moisture_contents, 'bo-', label="Moisture Content")
-        ax.axvline(x=25, color='g', linestyle='--', label="25 Blows")
-        
-        ax.set_xlabel("Blow Count")
-        ax.set_ylabel("Moisture Content (%)")
-        ax.set_title("Liquid Limit Analysis")
-        ax.grid(True)
-        ax.legend()
-        
-        canvas = FigureCanvasTkAgg(fig, master=self.ll_graph_frame)
-        canvas.draw()
-        # গ্রাফের ক্যানভাসের আকারও নির্দিষ্ট করতে চাইলে:
-        # canvas.get_tk_widget().config(width=500, height=400)
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.create_charts()
+        with self.render_lock:
+            if self.ll_chart.update(blow_counts, moisture_contents, ll_value):
+                self.ll_canvas.draw()
+            else:
+                self.ll_blitter.update()
 
+    @diagnostics.instrument
     def classify_soil(self):
         """
         Classify the soil based on Liquid Limit (LL) and Plasticity Index (PI).
@@ -302,72 +857,17 @@ class aterbag(tk.Frame):
         """
         Determine the soil type using A-line & standard classification rules.
         """
-        A_line_PI = 0.73 * (LL - 20)
-
-        # CL-ML zone
-        if 4 <= PI <= 7 and 12 <= LL <= 29.59:
-            return "CL-ML (Intermediate Clay-Silt Soil)"
-
-        if LL < 50:
-            if PI > A_line_PI:
-                return "CL or OL (Clay or Organic Clay)"
-            else:
-                return "ML or OL (Silt or Organic Silt)"
-        else:
-            if PI > A_line_PI:
-                return "CH or OH (High Plastic Clay or Organic Clay)"
-            else:
-                return "MH or OH (High Plastic Silt or Organic Silt)"
+        return limits.classify_soil_type(LL, PI)
 
+    @diagnostics.instrument
     def plot_casagrande_chart(self, LL, PI, soil_type):
         """
         Draw the Casagrande’s Plasticity Chart in casagrande_graph_frame
         with a fixed size (width x height).
         """
-        # casagrande_graph_frame এর পূর্ববর্তী সব উইজেট মুছে দিন
-        for widget in self.casagrande_graph_frame.winfo_children():
-            widget.destroy()
-
-        fig, ax = plt.subplots(figsize=(5, 4), dpi=100)  # 5x4 inches, 100 dpi
-        # "A" Line
-        LL_A = np.linspace(10, 100, 20)
-        A_Line = 0.73 * (LL_A - 20)
-        
-        # "U" Line
-        LL_U = np.linspace(8, 100, 20)
-        U_Line = 0.9 * (LL_U - 8)
-        
-        ax.plot(LL_A, A_Line, label='"A" Line', color='blue', linewidth=2)
-        ax.plot(LL_U, U_Line, label='"U" Line', color='purple', linewidth=2)
-
-        # Horizontal lines for typical boundaries
-        ax.hlines(y=7, xmin=16, xmax=29.59, color='red', linewidth=2)
-        ax.hlines(y=4, xmin=12, xmax=25.47, color='green', linewidth=2)
-        ax.axvline(x=50, color='black', linewidth=2, label='50% LL Line')
-
-        # Text labels
-        ax.text(16, 5,  "CL-ML", color='green', fontsize=12, fontweight='bold')
-        ax.text(35, 5,  "ML or OL", color='red', fontsize=12, fontweight='bold')
-        ax.text(38, 23, "CL or OL", color='blue', fontsize=12, fontweight='bold')
-        ax.text(60, 40, "CH or OH", color='blue', fontsize=12, fontweight='bold')
-        ax.text(65, 10, "MH or OH", color='red', fontsize=12, fontweight='bold')
-
-        # Plot the test point
-        ax.scatter(LL, PI, color='red', marker='x', s=100, label=f'Soil Sample ({soil_type})')
-
-        ax.set_xlabel("Liquid Limit, LL (%)", fontsize=12, fontweight='bold')
-        ax.set_ylabel("Plasticity Index, PI (%)", fontsize=12, fontweight='bold')
-        ax.set_title("Casagrande’s Plasticity Chart", fontsize=14, fontweight='bold')
-
-        ax.set_xticks(np.arange(0, 110, 10))
-        ax.set_yticks(np.arange(0, 60, 10))
-        ax.set_xlim(0, 100)
-        ax.set_ylim(0, 50)
-        ax.legend()
-        ax.grid(True, linestyle='--', linewidth=0.5)
-
-        canvas = FigureCanvasTkAgg(fig, master=self.casagrande_graph_frame)
-        canvas.draw()
-        # চাইলে এখানেও ক্যানভাসের আকার নির্দিষ্ট করা যেতে পারে
-        # canvas.get_tk_widget().config(width=500, height=400)
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.create_charts()
+        with self.render_lock:
+            if self.casagrande_chart.update(LL, PI, soil_type):
+                self.casagrande_canvas.draw()
+            else:
+                self.casagrande_blitter.update()
@@ -0,0 +1,137 @@
+"""
+Load test for the ingestion service.
+
+Starts the service in this process (or targets a running one with
+--port), opens --clients keep-alive connections that each post
+--requests batches of --rows Atterberg rows, and reports requests/s,
+rows/s and the p50/p99 round-trip latency seen by the clients next to
+the server's own /stats.
+
+    python benchmarks/ingest.py --clients 32 --requests 50 --rows 10
+    python benchmarks/ingest.py --workers 2 --save service.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+GEOSPACE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GEOSPACE)
+
+import numpy as np
+
+import service
+
+
+def atterberg_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        row = {"Boring No": f"B-{i % 20 + 1}", "Sample No": str(i + 1), "Sample Depth": f"{i % 50 * 0.5:g}"}
+        for prefix, cans, blows in (("LL", 3, True), ("PL", 2, False)):
+            for can in range(1, cans + 1):
+                clean = rng.uniform(10, 20)
+                dry = clean + rng.uniform(5, 30)
+                row[f"{prefix}{can} Can"] = f"{prefix}{can}-{i}"
+                row[f"{prefix}{can} Clean"] = f"{clean:.2f}"
+                row[f"{prefix}{can} Moist"] = f"{dry + rng.uniform(1, 15 if blows else 8):.2f}"
+                row[f"{prefix}{can} Dry"] = f"{dry:.2f}"
+                if blows:
+                    row[f"{prefix}{can} Blows"] = str(rng.integers(10, 40))
+        rows.append(row)
+    return rows
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(port, payload, requests, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            status, reply = await request(reader, writer, "POST", "/atterberg", payload)
+            latencies.append(time.perf_counter() - start)
+            if status != 200 or len(reply["results"]) != len(payload):
+                raise RuntimeError(f"bad reply ({status}): {reply}")
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def measure(args):
+    server = None
+    port = args.port
+    if not port:
+        server = await service.IngestService(port=0, workers=args.workers).start()
+        port = server.port
+    payload = atterberg_rows(args.rows)
+    latencies = []
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*[client(port, payload, args.requests, latencies) for _ in range(args.clients)])
+        seconds = time.perf_counter() - start
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        server_stats = (await request(reader, writer, "GET", "/stats"))[1]
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        if server is not None:
+            await server.stop()
+
+    latencies.sort()
+    requests = len(latencies)
+    return {
+        "clients": args.clients,
+        "rows_per_request": args.rows,
+        "requests": requests,
+        "seconds": seconds,
+        "requests_per_second": requests / seconds,
+        "rows_per_second": requests * args.rows / seconds,
+        "latency_p50_seconds": statistics.median(latencies),
+        "latency_p99_seconds": latencies[min(requests - 1, int(0.99 * requests))],
+        "server": server_stats,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--rows", type=int, default=10, help="rows per request")
+    parser.add_argument("--workers", type=int, default=0, help="service worker processes")
+    parser.add_argument("--port", type=int, default=0, help="use a running service on this port")
+    parser.add_argument("--save", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(measure(args))
+    print(f"{result['requests']} requests x {args.rows} rows from {args.clients} clients in "
+          f"{result['seconds']:.2f} s: {result['requests_per_second']:.0f} req/s, "
+          f"{result['rows_per_second']:.0f} rows/s, p50 {result['latency_p50_seconds'] * 1000:.1f} ms, "
+          f"p99 {result['latency_p99_seconds'] * 1000:.1f} ms "
+          f"(mean batch {result['server']['mean_batch_rows']:.0f} rows)")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Startup-time benchmark for the aterbag frame.
+
+Each run starts a fresh interpreter, times `import aterbag` and (when a
+display is available) building and showing the first frame, and checks
+that scipy/matplotlib were not imported on the way.
+
+    python benchmarks/startup.py --runs 5 --save startup.json
+    python benchmarks/startup.py --baseline startup.json --tolerance 0.25
+
+With --baseline the exit status is 1 if the median import or first-frame
+time regressed by more than the tolerance, or a heavy module was loaded.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+GEOSPACE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["scipy", "matplotlib"]
+
+PROBE = r"""
+import json, sys, time
+sys.path.insert(0, %(path)r)
+start = time.perf_counter()
+import aterbag
+result = {"import_seconds": time.perf_counter() - start, "first_frame_seconds": None}
+
+try:
+    import tkinter as tk
+    root = tk.Tk()
+except tk.TclError:
+    root = None
+if root is not None:
+    import types
+    start = time.perf_counter()
+    controller = types.SimpleNamespace(shared_data={"Project": tk.StringVar(root, "Benchmark")})
+    frame = aterbag.aterbag(root, controller)
+    frame.pack(fill="both", expand=True)
+    root.update()
+    result["first_frame_seconds"] = time.perf_counter() - start
+    root.destroy()
+
+result["heavy_modules"] = [name for name in %(heavy)r if name in sys.modules]
+print(json.dumps(result))
+"""
+
+
+def run_once():
+    code = PROBE % {"path": GEOSPACE, "heavy": HEAVY_MODULES}
+    output = subprocess.run([sys.executable, "-c", code], check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(runs):
+    samples = [run_once() for _ in range(runs)]
+    frames = [s["first_frame_seconds"] for s in samples if s["first_frame_seconds"] is not None]
+    return {
+        "runs": runs,
+        "import_seconds": statistics.median(s["import_seconds"] for s in samples),
+        "first_frame_seconds": statistics.median(frames) if frames else None,
+        "heavy_modules": sorted({name for s in samples for name in s["heavy_modules"]}),
+    }
+
+
+def regressions(result, baseline, tolerance):
+    problems = []
+    for key in ("import_seconds", "first_frame_seconds"):
+        if result[key] is None or baseline.get(key) is None:
+            continue
+        if result[key] > baseline[key] * (1 + tolerance):
+            problems.append(f"{key}: {result[key]:.4f}s vs baseline {baseline[key]:.4f}s")
+    if result["heavy_modules"]:
+        problems.append("heavy modules imported at startup: " + ", ".join(result["heavy_modules"]))
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--save", help="write the result as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a saved JSON result")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown over the baseline (default 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    result = measure(args.runs)
+    print(json.dumps(result, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = regressions(result, json.load(f), args.tolerance)
+        for problem in problems:
+            print("REGRESSION:", problem, file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
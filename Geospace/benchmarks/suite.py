@@ -0,0 +1,320 @@
+"""
+Benchmark suite for the calculation, plotting and grid hot paths.
+
+Runs headless: the frames are built on a real (withdrawn) Tk root when a
+display is available, e.g. under xvfb-run, and on stub widgets otherwise.
+Charts draw on an Agg canvas either way.  Results are written as JSON so
+runs can be compared:
+
+    python benchmarks/suite.py --out run.json
+    python benchmarks/suite.py --quick --compare run.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import aterbag
+import bm
+import charts
+import gravity
+import limits
+
+LIQUID_ROWS = [("1", "10", "40", "32", "30"), ("2", "10", "42", "33", "22"), ("3", "10", "45", "35", "15")]
+PLASTIC_ROWS = [("4", "10", "20", "18"), ("5", "10", "21", "19")]
+SAMPLE_INPUTS = {
+    "txt_boring_no": "B1", "txt_sample_no": "1", "txt_sample_depth": "1.5",
+    "cmb_soil_description": "Clayey Silt", "txt_observed_temperature": "25.3",
+    "txt_m1": "100", "txt_m4": "650", "txt_pycnometer_capacity": "500",
+}
+
+
+# ---------------------------------------------------------------------
+# Stub widgets for machines without a display
+# ---------------------------------------------------------------------
+class StubEntry:
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def delete(self, first, last=None):
+        self.value = ""
+
+    def insert(self, index, value):
+        self.value += value
+
+    def configure(self, **kwargs):
+        pass
+
+
+class StubLabel:
+    def __init__(self):
+        self.text = ""
+
+    def config(self, text=None, **kwargs):
+        if text is not None:
+            self.text = text
+
+    def cget(self, key):
+        return self.text
+
+
+class StubTree:
+    def __init__(self):
+        self.items = []
+        self.values = {}
+        self.counter = 0
+
+    def insert(self, parent, index, values=(), tags=()):
+        self.counter += 1
+        item = f"I{self.counter}"
+        self.items.insert(len(self.items) if index == "end" else index, item)
+        self.values[item] = values
+        return item
+
+    def delete(self, *items):
+        for item in items:
+            self.items.remove(item)
+            del self.values[item]
+
+    def item(self, item, values=(), tags=()):
+        self.values[item] = values
+
+    def get_children(self):
+        return tuple(self.items)
+
+
+class StubScrollbar:
+    def set(self, first, last):
+        pass
+
+
+def make_tk_root():
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        return root
+    except Exception:
+        return None
+
+
+def make_aterbag(root):
+    if root is not None:
+        import tkinter as tk
+        controller = types.SimpleNamespace(shared_data={"Project": tk.StringVar(root, "Benchmark")})
+        frame = aterbag.aterbag(root, controller)
+    else:
+        frame = aterbag.aterbag.__new__(aterbag.aterbag)
+        frame.liquid_entries = [[StubEntry() for _ in range(5)] for _ in LIQUID_ROWS]
+        frame.plastic_entries = [[StubEntry() for _ in range(4)] for _ in PLASTIC_ROWS]
+        frame.sample_entries = {field: StubEntry() for field in aterbag.SAMPLE_FIELDS}
+        frame.results_label = StubLabel()
+        frame.liquid_limit = frame.plastic_limit = frame.PI = 0
+        frame.render_lock = threading.RLock()
+        frame.archive = None
+
+    for entries, rows in ((frame.liquid_entries, LIQUID_ROWS), (frame.plastic_entries, PLASTIC_ROWS)):
+        for row_entries, row in zip(entries, rows):
+            for entry, value in zip(row_entries, row):
+                entry.delete(0, "end")
+                entry.insert(0, value)
+
+    # Agg canvases stand in for FigureCanvasTkAgg
+    frame.ll_chart = charts.LiquidLimitChart()
+    frame.ll_canvas = FigureCanvasAgg(frame.ll_chart.figure)
+    frame.ll_blitter = charts.Blitter(frame.ll_canvas, frame.ll_chart.artists)
+    frame.casagrande_chart = charts.CasagrandeChart()
+    frame.casagrande_canvas = FigureCanvasAgg(frame.casagrande_chart.figure)
+    frame.casagrande_blitter = charts.Blitter(frame.casagrande_canvas, frame.casagrande_chart.artists)
+    return frame
+
+
+def make_app(root):
+    if root is not None:
+        import tkinter as tk
+        app = bm.App(tk.Toplevel(root))
+        for name, value in SAMPLE_INPUTS.items():
+            getattr(app, name).delete(0, "end")
+            getattr(app, name).insert(0, value)
+        return app
+
+    app = bm.App.__new__(bm.App)
+    for name, value in SAMPLE_INPUTS.items():
+        setattr(app, name, StubEntry(value))
+    app.dgv_data = StubTree()
+    app.lbl_live = StubLabel()
+    app.input_entries = {"M1": app.txt_m1, "M4": app.txt_m4, "Observed Temperature": app.txt_observed_temperature,
+                         "Pycnometer Capacity": app.txt_pycnometer_capacity}
+    app.sample_errors = {}
+    app.archive = None
+    app.grid_scroll = StubScrollbar()
+    app.grid_page_size = lambda: 3
+    app.samples = bm.SampleStore()
+    app.sample_items = {}
+    app.grid_first = 0
+    return app
+
+
+# ---------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------
+def timed(name, fn, repeat, n=1, setup=None):
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        fn() if state is None else fn(state)
+        times.append(time.perf_counter() - start)
+    return {
+        "name": name,
+        "n": n,
+        "repeat": repeat,
+        "median_seconds": statistics.median(times),
+        "min_seconds": min(times),
+        "per_item_seconds": statistics.median(times) / n,
+    }
+
+
+def random_campaign(n, seed=0):
+    rng = np.random.default_rng(seed)
+    clean = rng.uniform(10, 20, (n, 3))
+    dry = clean + rng.uniform(5, 30, (n, 3))
+    moist = dry + rng.uniform(1, 15, (n, 3))
+    blows = rng.integers(10, 40, (n, 3)).astype(float)
+    pl_clean = rng.uniform(10, 20, (n, 2))
+    pl_dry = pl_clean + rng.uniform(5, 30, (n, 2))
+    pl_moist = pl_dry + rng.uniform(1, 8, (n, 2))
+    return clean, moist, dry, blows, pl_clean, pl_moist, pl_dry
+
+
+def count_figures():
+    gc.collect()
+    return sum(isinstance(obj, Figure) for obj in gc.get_objects())
+
+
+def run(quick=False):
+    repeat = 3 if quick else 7
+    sizes = [1, 100, 10_000] if quick else [1, 100, 10_000, 100_000]
+    grid_sizes = [10, 100] if quick else [10, 100, 1000]
+    root = make_tk_root()
+    frame = make_aterbag(root)
+    app = make_app(root)
+    results = []
+
+    # Atterberg limits: frame (one sample) and engine (N samples)
+    results.append(timed("aterbag.calculate_liquid_limit", frame.calculate_liquid_limit, repeat))
+    for n in sizes:
+        campaign = random_campaign(n)
+        results.append(timed("limits.calculate_limits", lambda: limits.calculate_limits(*campaign), repeat, n))
+
+    # Classification: scalar and batch
+    results.append(timed("aterbag.classify_soil_type", lambda: frame.classify_soil_type(38, 16), repeat))
+    for n in sizes:
+        rng = np.random.default_rng(1)
+        LL, PI = rng.uniform(0, 100, n), rng.uniform(0, 60, n)
+        results.append(timed("limits.classify", lambda: limits.classify(LL, PI), repeat, n))
+
+    # Specific gravity
+    results.append(timed("bm.App.get_density_at_temperature",
+                         lambda: app.get_density_at_temperature(25.37), repeat))
+    for n in sizes:
+        rng = np.random.default_rng(2)
+        temps = rng.uniform(15, 31, n)
+        results.append(timed("gravity.calculate_gravity",
+                             lambda: gravity.calculate_gravity(100, 650, temps, 500, "Clayey Silt"), repeat, n))
+
+    # DataGrid: add N samples to an empty grid, then recalculate them all
+    for n in grid_sizes:
+        def add_rows(app):
+            for _ in range(n):
+                app.add_initial_rows()
+        results.append(timed("bm.App.add_initial_rows", add_rows, repeat, n, setup=lambda: make_app(root)))
+        filled = make_app(root)
+        add_rows(filled)
+        results.append(timed("bm.App.perform_calculation", filled.perform_calculation, repeat, n))
+
+    # Plots: repeated updates of the persistent figures
+    blows, mc = np.array([15, 22, 30]), np.array([40.0, 39.13, 36.36])
+    results.append(timed("aterbag.plot_liquid_limit_graph",
+                         lambda: frame.plot_liquid_limit_graph(blows, mc, 38), repeat))
+    results.append(timed("aterbag.plot_casagrande_chart",
+                         lambda: frame.plot_casagrande_chart(38, 16, limits.classify_soil_type(38, 16)), repeat))
+
+    # Leak check: figure count must not grow with repeated calculations
+    # (the synchronous path of calculate_all, without the worker thread)
+    frame.calculate_liquid_limit()
+    frame.classify_soil()
+    before = count_figures()
+    for i in range(50):
+        frame.plot_liquid_limit_graph(blows, mc + i % 3, 38)
+        frame.plot_casagrande_chart(38 + i % 5, 16, limits.classify_soil_type(38 + i % 5, 16))
+        frame.calculate_liquid_limit()
+        frame.classify_soil()
+    after = count_figures()
+
+    if root is not None:
+        root.destroy()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "tk": "display" if root is not None else "stub",
+            "quick": quick,
+        },
+        "results": results,
+        "figure_leak": {"before": before, "after": after, "iterations": 50, "ok": after == before},
+    }
+
+
+def compare(current, previous):
+    old = {(r["name"], r["n"]): r for r in previous["results"]}
+    lines = []
+    for r in current["results"]:
+        ref = old.get((r["name"], r["n"]))
+        if ref:
+            ratio = r["median_seconds"] / ref["median_seconds"] if ref["median_seconds"] else float("inf")
+            lines.append(f"{r['name']:40s} n={r['n']:<7d} {r['median_seconds']:.6f}s  x{ratio:.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes and fewer repeats")
+    parser.add_argument("--compare", help="print ratios against a previous JSON run")
+    args = parser.parse_args(argv)
+
+    report = run(args.quick)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(report, json.load(f)))
+    return 0 if report["figure_leak"]["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,63 @@
+import os
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
+
+import numpy as np
+
+import archive
+import diagnostics
+import export
+import gravity
+import importer
+import validation
+from samples import SampleStore
+from store import ProjectStore
+
+# Rows shown in the DataGrid for every sample: (Parameter, Unit, sample key)
+GRID_ROWS = [
+    ("Boring No.", "", "Boring No"),
+    ("Sample No.", "", "Sample No"),
+    ("Sample Depth (m)", "", "Sample Depth"),
+    ("Soil Description", "", "Soil Description"),
+    ("Observed Temperature (T₁ °C)", "", "Observed Temperature"),
+    ("Weight of pycnometer (gm)", "M1", "M1"),
+    ("Weight of pycnometer + Soil + Water (gm)", "M4", "M4"),
+    ("Pycnometer Capacity (ml)", "", "Pycnometer Capacity"),
+    ("Weight of pycnometer + Water (gm)", "M3", "M3"),
+    ("Weight of pycnometer + Soil (gm)", "M2", "M2"),
+    ("Specific Gravity of Soil", "GTX", "GTX"),
+    ("Specific Gravity (20°C)", "G20", "G20"),
+]
+# Calculated values and their display format
+GRID_FORMATS = {"M3": "{:.2f}", "M2": "{:.2f}", "GTX": "{:.3f}", "G20": "{:.3f}"}
+
+LIVE_DEBOUNCE_MS = 300
+
+PROJECT_FILETYPES = [("Project files", "*.sqlite"), ("All files", "*.*")]
+ALL_BORINGS = "All borings"
 
 class App:
-    def __init__(self, root):
+    def __init__(self, root, controller=None):
         self.root = root
+        self.controller = self if controller is None else controller  # owns the shared service
         self.root.title("Soil Specific Gravity Calculator")
         self.root.geometry("1000x800")
 
         # Create DataGridViews (Treeviews)
-        self.dgv_data = ttk.Treeview(self.root, columns=("Parameter", "Unit", "Value"), show="headings")
+        # Only the samples in view exist as Treeview items; the scrollbar
+        # moves a window over self.samples instead of scrolling the tree.
+        self.grid_frame = ttk.Frame(self.root)
+        self.grid_frame.pack(fill="both", expand=True, padx=5, pady=5)
+        self.dgv_data = ttk.Treeview(self.grid_frame, columns=("Parameter", "Unit", "Value"), show="headings")
         self.dgv_data.heading("Parameter", text="Parameter")
         self.dgv_data.heading("Unit", text="Unit")
         self.dgv_data.heading("Value", text="Value")
-        self.dgv_data.pack(fill="both", expand=True, padx=5, pady=5)
+        self.dgv_data.pack(side="left", fill="both", expand=True)
+        self.grid_scroll = ttk.Scrollbar(self.grid_frame, orient="vertical", command=self.scroll_grid)
+        self.grid_scroll.pack(side="right", fill="y")
+        self.dgv_data.bind("<Configure>", lambda event: self.render_grid())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.dgv_data.bind(sequence, self.on_grid_wheel)
 
         # Create input fields
         self.input_frame = ttk.Frame(self.root)
@@ -57,120 +102,472 @@ class App:
         self.btn_calculate = ttk.Button(self.input_frame, text="Calculate", command=self.perform_calculation)
         self.btn_calculate.grid(row=8, column=1, padx=2, pady=2)
 
-        # Store multiple samples
-        self.samples = []
+        self.btn_import = ttk.Button(self.input_frame, text="Import Sheet...", command=self.import_sheet)
+        self.btn_import.grid(row=9, column=0, padx=2, pady=2)
 
-    def add_initial_rows(self):
+        self.btn_profiles = ttk.Button(self.input_frame, text="Depth Profiles...", command=self.show_depth_profiles)
+        self.btn_profiles.grid(row=9, column=1, padx=2, pady=2)
+
+        self.btn_diagnostics = ttk.Button(self.input_frame, text="Diagnostics...", command=self.show_diagnostics)
+        self.btn_diagnostics.grid(row=13, column=0, padx=2, pady=2)
+
+        # Local ingestion service: posted pycnometer readings are added to the grid
+        self.btn_service = ttk.Button(self.input_frame, text="Start Service", command=self.toggle_service)
+        self.btn_service.grid(row=13, column=1, padx=2, pady=2)
+        self.service = None
+
+        # Result archive: a calculated sample is appended to it when its result is new
+        self.btn_archive = ttk.Button(self.input_frame, text="Open Archive...", command=self.open_archive)
+        self.btn_archive.grid(row=14, column=0, padx=2, pady=2)
+        self.archive = None
+        self.archived = {}  # (boring no, sample no) -> last record appended
+
+        self.btn_export = ttk.Button(self.input_frame, text="Export...", command=self.export_results)
+        self.btn_export.grid(row=14, column=1, padx=2, pady=2)
+
+        # Live result of the sample being typed
+        self.lbl_live = ttk.Label(self.input_frame, text="")
+        self.lbl_live.grid(row=10, column=0, columnspan=2, padx=2, pady=2, sticky="w")
+        self.live_after = None
+        for widget in (self.txt_observed_temperature, self.txt_m1, self.txt_m4,
+                       self.txt_pycnometer_capacity, self.cmb_soil_description):
+            widget.bind("<KeyRelease>", self.on_input_changed)
+        self.cmb_soil_description.bind("<<ComboboxSelected>>", self.on_input_changed)
+
+        # Project file: samples are loaded one boring at a time
+        self.btn_open_project = ttk.Button(self.input_frame, text="Open Project...", command=self.open_project)
+        self.btn_open_project.grid(row=11, column=0, padx=2, pady=2)
+        self.btn_save_project = ttk.Button(self.input_frame, text="Save Project...", command=self.save_project)
+        self.btn_save_project.grid(row=11, column=1, padx=2, pady=2)
+
+        ttk.Label(self.input_frame, text="Boring:").grid(row=12, column=0, padx=2, pady=2)
+        self.cmb_boring = ttk.Combobox(self.input_frame, values=[ALL_BORINGS], state="readonly")
+        self.cmb_boring.set(ALL_BORINGS)
+        self.cmb_boring.grid(row=12, column=1, padx=2, pady=2)
+        self.cmb_boring.bind("<<ComboboxSelected>>", self.load_boring)
+
+        # Bad input cells and grid rows are marked in place
+        ttk.Style(self.root).configure("Invalid.TEntry", fieldbackground="#f8d7da", foreground="#a00000")
+        self.dgv_data.tag_configure("invalid", background="#f8d7da")
+        self.input_entries = {
+            "M1": self.txt_m1,
+            "M4": self.txt_m4,
+            "Observed Temperature": self.txt_observed_temperature,
+            "Pycnometer Capacity": self.txt_pycnometer_capacity,
+        }
+
+        # Store multiple samples; sample index -> Treeview item IDs of its rows
+        self.samples = SampleStore()
+        self.sample_items = {}
+        self.grid_first = 0
+        # sample index -> {field: message} from the last batch validation
+        self.sample_errors = {}
+
+        # Open project (None until opened or saved) and the boring shown
+        self.project_store = None
+        self.project_id = None
+        self.project_boring = None
+        self.project_ids = []  # row ids of the samples loaded from the project, in order
+        self.project_dirty = False
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def read_inputs(self):
         # Collect data from input fields
-        boring_no = self.txt_boring_no.get()
-        sample_no = self.txt_sample_no.get()
-        sample_depth = self.txt_sample_depth.get()
-        soil_description = self.cmb_soil_description.get()
-        observed_temp = self.txt_observed_temperature.get()
-        m1 = self.txt_m1.get()
-        m4 = self.txt_m4.get()
-        pycnometer_capacity = self.txt_pycnometer_capacity.get()
-
-        # Add sample data to list
-        self.samples.append({
-            "Boring No": boring_no,
-            "Sample No": sample_no,
-            "Sample Depth": sample_depth,
-            "Soil Description": soil_description,
-            "Observed Temperature": observed_temp,
-            "M1": m1,
-            "M4": m4,
-            "Pycnometer Capacity": pycnometer_capacity
-        })
-
-        # Clear and add rows to DataGridView
-        self.dgv_data.delete(*self.dgv_data.get_children())
-        for sample in self.samples:
-            self.dgv_data.insert("", "end", values=("Boring No.", "", sample["Boring No"]))
-            self.dgv_data.insert("", "end", values=("Sample No.", "", sample["Sample No"]))
-            self.dgv_data.insert("", "end", values=("Sample Depth (m)", "", sample["Sample Depth"]))
-            self.dgv_data.insert("", "end", values=("Soil Description", "", sample["Soil Description"]))
-            self.dgv_data.insert("", "end", values=("Observed Temperature (T₁ °C)", "", sample["Observed Temperature"]))
-            self.dgv_data.insert("", "end", values=("Weight of pycnometer (gm)", "M1", sample["M1"]))
-            self.dgv_data.insert("", "end", values=("Weight of pycnometer + Soil + Water (gm)", "M4", sample["M4"]))
-            self.dgv_data.insert("", "end", values=("Pycnometer Capacity (ml)", "", sample["Pycnometer Capacity"]))
-            self.dgv_data.insert("", "end", values=("Weight of pycnometer + Soil (gm)", "M2", 0))
-            self.dgv_data.insert("", "end", values=("Specific Gravity of Soil", "GTX", 0))
-            self.dgv_data.insert("", "end", values=("Specific Gravity (20°C)", "G20", 0))
+        return {
+            "Boring No": self.txt_boring_no.get(),
+            "Sample No": self.txt_sample_no.get(),
+            "Sample Depth": self.txt_sample_depth.get(),
+            "Soil Description": self.cmb_soil_description.get(),
+            "Observed Temperature": self.txt_observed_temperature.get(),
+            "M1": self.txt_m1.get(),
+            "M4": self.txt_m4.get(),
+            "Pycnometer Capacity": self.txt_pycnometer_capacity.get()
+        }
+
+    @diagnostics.instrument
+    def add_initial_rows(self):
+        # Add sample data to list; only the new sample's rows are inserted
+        self.samples.append(self.read_inputs())
+        self.project_dirty = True
+
+        # Keep the newest sample in view
+        self.grid_first = max(0, len(self.samples) - self.grid_page_size())
+        self.render_grid()
+
+    def import_sheet(self):
+        # Stream a pycnometer CSV/Excel sheet into self.samples
+        path = filedialog.askopenfilename(filetypes=[("Lab sheets", "*.csv *.xlsx"), ("All files", "*.*")])
+        if not path:
+            return
+        stats = importer.import_file(path, kind="gravity", on_result=self.add_imported_sample)
+        self.grid_first = max(0, len(self.samples) - self.grid_page_size())
+        self.render_grid()
+        messagebox.showinfo("Import", f"Imported {stats['rows']} samples "
+                                      f"({stats['rows_per_second']:.0f} rows/s).")
+
+    def add_imported_sample(self, row):
+        row["Valid"] = not row["Error"]
+        self.samples.append(row)
+        self.project_dirty = True
+
+    def show_depth_profiles(self):
+        # G20 (and LL/PL/PI of stored projects) against depth for every boring shown
+        if not self.samples:
+            messagebox.showinfo("Depth Profiles", "No samples to plot.")
+            return
+        from profile_view import DepthProfileWindow
+        columns = {key: self.samples.column(key) for key in ("Sample Depth", "LL", "PL", "PI", "G20")}
+        columns["Boring No"] = self.samples.text("Boring No")
+        return DepthProfileWindow(self.root, columns, title=self.cmb_boring.get())
+
+    def show_diagnostics(self):
+        from diagnostics_view import DiagnosticsWindow
+        return DiagnosticsWindow(self.root)
+
+    def open_archive(self):
+        # Open or create a result archive; later calculations are appended
+        path = filedialog.asksaveasfilename(title="Open Archive", defaultextension=".gsa",
+                                            filetypes=archive.FILETYPES, confirmoverwrite=False)
+        if not path:
+            return
+        try:
+            self.archive = archive.ResultArchive(path)
+        except (archive.ArchiveError, OSError) as e:
+            messagebox.showerror("Archive", str(e))
+            return
+        self.archived = {}
+        self.lbl_live.config(text=f"Archive: {os.path.basename(path)} ({len(self.archive)} results)")
+
+    def archive_sample(self, index):
+        # Append a valid sample's result, unless it is unchanged since it was last appended
+        if index is None:
+            return
+        sample = self.samples[index]
+        if not sample.get("Valid"):
+            return
+        record = {key: [sample.get(key, "")] for key in ("Boring No", "Sample Depth", "G20")}
+        key = (sample["Boring No"], sample["Sample No"])
+        if self.archived.get(key) == repr(record):
+            return
+        try:
+            self.archive.append(record)
+        except archive.ArchiveError as e:
+            self.lbl_live.config(text=f"Not archived: {e}")
+            return
+        self.archived[key] = repr(record)
+
+    def export_results(self):
+        # Stream every sample (of the whole project, if one is open) to CSV, Excel or a lab report
+        filetype = tk.StringVar(self.root)
+        path = filedialog.asksaveasfilename(title="Export", defaultextension=".csv",
+                                            filetypes=export.FILETYPES, typevariable=filetype)
+        if not path:
+            return
+        fields = [key for _, _, key in GRID_ROWS]
+        if self.project_store is not None:
+            self.save_changes()
+            chunks = export.store_chunks(self.project_store, self.project_id, fields)
+            details = self.project_store.project_fields(self.project_id)
+        else:
+            chunks = export.sample_chunks(self.samples, fields)
+            details = None
+        count = export.export(chunks, path, fields, export.file_format(path, filetype.get()),
+                              title="Specific Gravity of Soil", details=details,
+                              group=self.project_store is not None)
+        messagebox.showinfo("Export", f"Exported {count} samples to {path}")
+
+    def toggle_service(self):
+        # Start/stop the local ingestion service; gravity results land in the grid
+        import service
+
+        hub = service.shared(self.controller)
+        if self.service is not None:
+            hub.unsubscribe("gravity")
+            self.service = None
+            self.btn_service.config(text="Start Service")
+            return
+        try:
+            self.service = hub.subscribe(self.root, "gravity", self.on_service_results)
+        except OSError as e:
+            messagebox.showerror("Service", f"Service not started: {e}")
+            return
+        self.btn_service.config(text="Stop Service")
+        self.lbl_live.config(text=f"Service on http://{self.service.service.host}:{self.service.service.port}/gravity")
+
+    def on_service_results(self, rows):
+        # Main thread (polled with after()): one micro-batch of results
+        for row in rows:
+            self.add_imported_sample(dict(row))  # the service thread still reads rows
+        self.grid_first = max(0, len(self.samples) - self.grid_page_size())
+        self.render_grid()
+
+    def find_sample(self, boring_no, sample_no):
+        # Index of the latest sample with this boring/sample no., or None;
+        # compares the code columns instead of decoding every sample
+        found = np.ones(len(self.samples), dtype=bool)
+        for name, value in (("Boring No", boring_no), ("Sample No", sample_no)):
+            code = self.samples.categories[name].codes.get("" if value is None else str(value))
+            if code is None:
+                return None
+            found &= self.samples.column(name) == code
+        found = np.flatnonzero(found)
+        return int(found[-1]) if len(found) else None
+
+    # -----------------------------------------------------------------
+    # Project file
+    # -----------------------------------------------------------------
+    def open_project(self):
+        # Open or create a project file and show its first boring
+        path = filedialog.asksaveasfilename(title="Open Project", defaultextension=".sqlite",
+                                            filetypes=PROJECT_FILETYPES, confirmoverwrite=False)
+        if not path:
+            return
+        keep = False
+        if self.project_store is None and self.project_dirty and self.samples:
+            # the grid holds samples not saved anywhere yet
+            keep = messagebox.askyesnocancel(
+                "Open Project", f"Add the {len(self.samples)} unsaved samples to {os.path.basename(path)}?")
+            if keep is None:
+                return
+        self.set_project(path)
+        self.project_dirty = keep
+        borings = list(self.project_store.borings(self.project_id))
+        self.cmb_boring.set(borings[0] if borings else ALL_BORINGS)
+        self.load_boring()
+
+    def set_project(self, path):
+        # Use the first project in the file, or a new one named after it
+        self.save_changes()
+        if self.project_store is not None:
+            self.project_store.close()
+        self.project_store = ProjectStore(path)
+        self.project_ids = []  # the samples shown are not in this file yet
+        self.project_dirty = False  # nor written to it unless the caller says so
+        names = self.project_store.projects()
+        self.project_id = self.project_store.project(names[0] if names else
+                                                     os.path.splitext(os.path.basename(path))[0])
+        self.root.title(f"Soil Specific Gravity Calculator - {os.path.basename(path)}")
+        self.refresh_borings()
+
+    def save_project(self):
+        # Write the samples in the grid to the project file (asks for one the first time)
+        if self.project_store is None:
+            path = filedialog.asksaveasfilename(title="Save Project", defaultextension=".sqlite",
+                                                filetypes=PROJECT_FILETYPES)
+            if not path:
+                return
+            self.set_project(path)
+        self.project_dirty = True
+        self.save_changes()
+        self.refresh_borings()
+
+    def save_changes(self):
+        # Save the samples shown if they changed since they were loaded
+        if self.project_store is None or not self.project_dirty:
+            return
+        self.project_ids = self.project_store.save_samples(self.project_id, self.samples, self.project_ids)
+        self.project_dirty = False
+
+    def on_close(self):
+        if self.service is not None:
+            self.toggle_service()
+        self.save_changes()
+        if self.project_store is not None:
+            self.project_store.close()
+        self.root.destroy()
+
+    def refresh_borings(self):
+        self.cmb_boring["values"] = [ALL_BORINGS, *self.project_store.borings(self.project_id)]
+
+    def load_boring(self, event=None):
+        """
+        Show the samples of the selected boring; only those are read from
+        the project file (by its boring/depth index).
+        """
+        if self.project_store is None:
+            return
+        self.save_changes()
+        choice = self.cmb_boring.get()
+        self.project_boring = None if choice == ALL_BORINGS else choice
+        self.samples, self.project_ids = self.project_store.load(self.project_id, self.project_boring)
+        self.sample_errors = {}
+        for items in self.sample_items.values():
+            self.dgv_data.delete(*items)
+        self.sample_items = {}
+        self.grid_first = 0
+        self.render_grid()
+
+    # -----------------------------------------------------------------
+    # Virtualized DataGrid
+    # -----------------------------------------------------------------
+    def grid_row_values(self, sample):
+        values = []
+        for parameter, unit, key in GRID_ROWS:
+            value = sample[key]
+            if isinstance(value, float):
+                # blank until calculated (or when the input is not a number)
+                value = "" if value != value else GRID_FORMATS.get(key, "{:g}").format(value)
+            values.append((parameter, unit, value))
+        return values
+
+    def grid_row_tags(self, index):
+        errors = self.sample_errors.get(index, {})
+        return [("invalid",) if key in errors else () for parameter, unit, key in GRID_ROWS]
+
+    def grid_page_size(self):
+        # Number of whole samples that fit in the Treeview
+        row_height = ttk.Style().lookup("Treeview", "rowheight") or 20
+        rows = max(int(self.dgv_data.cget("height")), self.dgv_data.winfo_height() // int(row_height))
+        return max(1, rows // len(GRID_ROWS))
+
+    def render_grid(self):
+        """
+        Materialize Treeview items only for the samples in the visible
+        window, deleting items of samples that scrolled out.
+        """
+        page = self.grid_page_size()
+        self.grid_first = max(0, min(self.grid_first, len(self.samples) - page))
+        window = range(self.grid_first, min(self.grid_first + page + 1, len(self.samples)))
+
+        for index in [i for i in self.sample_items if i not in window]:
+            self.dgv_data.delete(*self.sample_items.pop(index))
+
+        for index in window:
+            if index in self.sample_items:
+                continue
+            position = (index - self.grid_first) * len(GRID_ROWS)
+            self.sample_items[index] = [
+                self.dgv_data.insert("", position + row, values=values, tags=tags)
+                for row, (values, tags) in enumerate(zip(self.grid_row_values(self.samples[index]),
+                                                         self.grid_row_tags(index)))
+            ]
+
+        if self.samples:
+            self.grid_scroll.set(self.grid_first / len(self.samples), window.stop / len(self.samples))
+        else:
+            self.grid_scroll.set(0, 1)
+
+    def scroll_grid(self, action, amount, unit=None):
+        # Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if action == "moveto":
+            self.grid_first = int(float(amount) * len(self.samples))
+        elif unit == "pages":
+            self.grid_first += int(amount) * self.grid_page_size()
+        else:
+            self.grid_first += int(amount)
+        self.render_grid()
+
+    def on_grid_wheel(self, event):
+        # Scroll the virtual grid only; "break" keeps the Treeview from scrolling natively as well
+        self.scroll_grid("scroll", -1 if event.num == 4 or event.delta > 0 else 1, "units")
+        return "break"
 
     def get_density_at_temperature(self, temp):
-        # Density data for temperatures from 15°C to 30.9°C
-        density_data = [
-            0.9991, 0.99909, 0.99907, 0.99906, 0.99904, 0.99902, 0.99901, 0.99899, 0.99898, 0.99896,
-            0.99895, 0.99893, 0.99891, 0.9989, 0.99888, 0.99886, 0.99885, 0.99883, 0.99881, 0.99879,
-            0.99878, 0.99876, 0.99874, 0.99872, 0.99871, 0.99869, 0.99867, 0.99865, 0.99863, 0.99862,
-            0.9986, 0.99858, 0.99856, 0.99854, 0.99852, 0.9985, 0.99848, 0.99847, 0.99845, 0.99843,
-            0.99841, 0.99839, 0.99837, 0.99835, 0.99833, 0.99831, 0.99829, 0.99827, 0.99825, 0.99823,
-            0.99821, 0.99819, 0.99816, 0.99814, 0.99812, 0.9981, 0.99808, 0.99806, 0.99802, 0.99799,
-            0.99797, 0.99795, 0.99793, 0.99791, 0.99789, 0.99786, 0.99784, 0.99782, 0.9978, 0.99777,
-            0.99775, 0.99773, 0.9977, 0.99768, 0.99766, 0.99764, 0.99761, 0.99759, 0.99756, 0.99754,
-            0.99752, 0.99749, 0.99747, 0.99745, 0.99742, 0.9974, 0.99737, 0.99735, 0.99732, 0.9973,
-            0.99727, 0.99725, 0.99723, 0.9972, 0.99717, 0.99715, 0.99712, 0.9971, 0.99707, 0.99705,
-            0.99702, 0.997, 0.99697, 0.99694, 0.99692, 0.99689, 0.99687, 0.99684, 0.99681, 0.99679,
-            0.99676, 0.99673, 0.99671, 0.99668, 0.99665, 0.99663, 0.9966, 0.99657, 0.99654, 0.99652,
-            0.99649, 0.99646, 0.99643, 0.99641, 0.99638, 0.99635, 0.99632, 0.99629, 0.99627, 0.99624,
-            0.99621, 0.99618, 0.99615, 0.99612, 0.99609, 0.99607, 0.99604, 0.99601, 0.99598, 0.99595,
-            0.99592, 0.99589, 0.99586, 0.99583, 0.9958, 0.99577, 0.99574, 0.99571, 0.99568, 0.99565,
-            0.99562, 0.99559, 0.99556, 0.99553, 0.9955, 0.99547, 0.99544, 0.99541, 0.99538
-        ]
-
-        if temp < 15 or temp > 30.9:
+        # Density from the precomputed table (15°C to 30.8°C), -1 if out of range
+        density = float(gravity.density_at_temperature(temp))
+        if np.isnan(density):
             return -1  # Out of range
-        index = int((temp - 15) * 10)
-        return density_data[index]
+        return density
+
+    def validate_inputs(self, ignore=()):
+        """
+        Check the input fields and mark the bad ones (errors with a code in
+        ignore are not marked).  Returns the validation.ValidationReport.
+        """
+        inputs = self.read_inputs()
+        report = validation.check_gravity({key: [inputs[key]] for key in self.input_entries})
+        bad = {error.field for error in report.errors if error.code not in ignore}
+        for key, entry in self.input_entries.items():
+            entry.configure(style="Invalid.TEntry" if key in bad else "TEntry")
+        return report
 
+    @diagnostics.instrument
     def perform_calculation(self):
-        try:
-            m1 = float(self.txt_m1.get())
-            m4 = float(self.txt_m4.get())
-            temperature = float(self.txt_observed_temperature.get())
-            pycnometer_capacity = float(self.txt_pycnometer_capacity.get())
-        except ValueError:
-            messagebox.showerror("Input Error", "Please enter valid numbers for weights, temperature, and capacity.")
-            return
-
-        # Determine M2 based on soil description
-        soil_description = self.cmb_soil_description.get().strip()
-        if soil_description == "Clayey Silt":
-            m2 = 40 + m1
-        elif soil_description == "Silty Sand":
-            m2 = 50 + m1
+        # Bad fields are marked and listed under the inputs; no dialog per error
+        report = self.validate_inputs()
+        if not report.ok:
+            self.lbl_live.config(text="\n".join(error.message for error in report.errors))
+            return
+        self.lbl_live.config(text="")
+
+        # The entry sample is stored like any other; add it if it is not in the grid yet
+        index = self.find_sample(self.txt_boring_no.get(), self.txt_sample_no.get())
+        if index is None:
+            self.add_initial_rows()
         else:
-            m2 = 35 + m1  # Default soil type value
+            self.samples[index].update(self.read_inputs())
 
-        # Calculate M3 based on temperature and pycnometer capacity
-        density = self.get_density_at_temperature(temperature)
-        if density == -1:
-            messagebox.showerror("Temperature Error", "Temperature is out of range (15°C to 30.9°C).")
+        # M2, M3, GTX and G20 for every stored sample in one batch; bad rows are flagged, not reported one by one
+        self.calculate_samples()
+        self.project_dirty = True
+        if self.archive is not None:
+            self.archive_sample(self.find_sample(self.txt_boring_no.get(), self.txt_sample_no.get()))
+
+        # Update DataGridView
+        self.update_data_grid()
+
+    def on_input_changed(self, event=None):
+        # Debounce: recalculate once typing pauses
+        if self.live_after is not None:
+            self.root.after_cancel(self.live_after)
+        self.live_after = self.root.after(LIVE_DEBOUNCE_MS, self.live_update)
+
+    def live_update(self):
+        """
+        Recalculate only the sample in the input fields; if it is already in
+        the grid, update its stored values and its rows in place.
+        """
+        self.live_after = None
+        self.validate_inputs(ignore=(validation.MISSING,))
+        inputs = self.read_inputs()
+        result = gravity.calculate_gravity(
+            gravity.to_float([inputs["M1"]]), gravity.to_float([inputs["M4"]]),
+            gravity.to_float([inputs["Observed Temperature"]]),
+            gravity.to_float([inputs["Pycnometer Capacity"]]), inputs["Soil Description"])
+        if not result.valid[0]:
+            self.lbl_live.config(text="")
             return
-        m3 = m1 + pycnometer_capacity * density
+        self.lbl_live.config(text=f"GTX: {result.GTX[0]:.3f}    G20: {result.G20[0]:.3f}")
 
-        # Calculate GTX and G20
-        denominator = (m2 - m1) + (m3 - m4)
-        gtx = (m2 - m1) / denominator 
-        correction_factor = self.get_density_at_temperature(20)  # Correction factor at 20°C
-        g20 = gtx * correction_factor
+        index = self.find_sample(inputs["Boring No"], inputs["Sample No"])
+        if index is not None:
+            sample = self.samples[index]
+            sample.update(inputs)
+            sample.update(M2=result.M2[0], M3=result.M3[0], GTX=result.GTX[0], G20=result.G20[0], Valid=True)
+            self.sample_errors.pop(index, None)
+            self.project_dirty = True
+            self.update_data_grid([index])
 
-        # Update DataGridView
-        self.update_data_grid(m1, m2, m3, m4, gtx, g20)
-
-    def update_data_grid(self, m1, m2, m3, m4, gtx, g20):
-        # Ensure there are enough rows
-        while len(self.dgv_data.get_children()) < 12:
-            self.dgv_data.insert("", "end", values=("", "", ""))
-
-        # Update specific rows
-        self.dgv_data.item(self.dgv_data.get_children()[5], values=("Weight of pycnometer (gm)", "M1", f"{m1:.2f}"))
-        self.dgv_data.item(self.dgv_data.get_children()[6], values=("Weight of pycnometer + Water (gm)", "M3", f"{m3:.2f}"))
-        self.dgv_data.item(self.dgv_data.get_children()[7], values=("Weight of pycnometer + Soil + Water (gm)", "M4", f"{m4:.2f}"))
-        self.dgv_data.item(self.dgv_data.get_children()[9], values=("Weight of pycnometer + Soil (gm)", "M2", f"{m2:.2f}"))
-        self.dgv_data.item(self.dgv_data.get_children()[10], values=("Specific Gravity of Soil", "GTX", f"{gtx:.3f}"))
-        self.dgv_data.item(self.dgv_data.get_children()[11], values=("Specific Gravity (20°C)", "G20", f"{g20:.3f}"))
+    def calculate_samples(self):
+        """
+        Run all rows in self.samples through the specific-gravity engine and
+        store M2, M3, GTX, G20 (NaN for bad rows) and a Valid flag on each.
+        All rows are validated in one pass; bad cells are marked in the grid.
+        """
+        if not self.samples:
+            return None
+        report = validation.check_gravity({key: self.samples.raw(key) for key in self.input_entries})
+        self.sample_errors = {row: {error.field: error.message for error in errors}
+                              for row, errors in report.by_row().items()}
+        result = gravity.calculate_samples(self.samples)
+        self.samples.set_column("M2", result.M2)
+        self.samples.set_column("M3", result.M3)
+        self.samples.set_column("GTX", result.GTX)
+        self.samples.set_column("G20", result.G20)
+        self.samples.set_column("Valid", result.valid)
+        return result
+
+    def update_data_grid(self, indexes=None):
+        # Update the rows of the given samples (default: all in view) in place
+        if indexes is None:
+            indexes = list(self.sample_items)
+        for index in indexes:
+            items = self.sample_items.get(index)
+            if items is None:
+                continue  # not in view, rendered from self.samples when scrolled to
+            for item, values, tags in zip(items, self.grid_row_values(self.samples[index]),
+                                          self.grid_row_tags(index)):
+                self.dgv_data.item(item, values=values, tags=tags)
 
 # Run the application
 if __name__ == "__main__":
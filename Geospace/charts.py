@@ -0,0 +1,329 @@
+"""
+Liquid-limit and Casagrande chart figures.
+
+Each chart builds its figure once; later calculations only move the data
+artists.  Figures are plain matplotlib Figures owned by their chart (not
+registered with pyplot), so repeated calculations never add figures.
+Pass an existing figure and subplot to put several charts on one page.
+"""
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+import diagnostics
+import limits
+import profiles
+import spatial
+
+# Above this many samples the Casagrande cloud is drawn as a hexbin density
+DENSITY_THRESHOLD = 5000
+
+# Depth profiles: axis labels, and the most borings named in the legend
+PROFILE_LABELS = {"LL": "LL (%)", "PL": "PL (%)", "PI": "PI (%)", "G20": "G20"}
+PROFILE_LEGEND = 10
+
+
+def tk_canvas(figure, master, lock):
+    """
+    FigureCanvasTkAgg whose draws hold `lock`, so a worker thread can
+    render the same figure offscreen (see render_offscreen) safely.
+    """
+    canvas = _locked_canvas_class()(figure, master=master)
+    canvas.render_lock = lock
+    return canvas
+
+
+def render_offscreen(canvas):
+    """
+    Agg-render a Tk canvas's figure without touching Tk; call
+    canvas.blit() on the main thread afterwards to show it.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    FigureCanvasAgg.draw(canvas)
+
+
+_locked_canvas = None
+
+
+def _locked_canvas_class():
+    global _locked_canvas
+    if _locked_canvas is None:
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        class LockedCanvas(FigureCanvasTkAgg):
+            def draw(self):
+                with self.render_lock:
+                    super().draw()
+
+        _locked_canvas = LockedCanvas
+    return _locked_canvas
+
+
+class Blitter:
+    """
+    Redraw only the animated artists of a canvas over a cached copy of
+    the static background.  The background is re-captured on every full
+    draw (first show, resize, rescale).
+    """
+
+    def __init__(self, canvas, artists):
+        self.canvas = canvas
+        self.artists = artists
+        self.background = None
+        canvas.mpl_connect("draw_event", self.on_draw)
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.draw_artists()
+
+    def draw_artists(self):
+        for artist in self.artists:
+            artist.axes.draw_artist(artist)
+
+    def update(self):
+        if self.background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_artists()
+        self.canvas.blit(self.canvas.figure.bbox)
+        self.canvas.flush_events()
+
+
+class LiquidLimitChart:
+    """
+    Moisture content against blow count with the 25-blow line.
+    """
+
+    def __init__(self, figure=None, animated=True, subplot=(1, 1, 1)):
+        self.figure = figure or Figure(figsize=(5, 4), dpi=100)
+        diagnostics.track_figure(self.figure)
+        self.ax = ax = self.figure.add_subplot(*subplot)
+        self.line, = ax.plot([], [], 'bo-', label="Moisture Content", animated=animated)
+        ax.axvline(x=limits.LL_BLOWS, color='g', linestyle='--', label="25 Blows")
+
+        ax.set_xlabel("Blow Count")
+        ax.set_ylabel("Moisture Content (%)")
+        ax.set_title("Liquid Limit Analysis")
+        ax.grid(True)
+        ax.legend()
+        self.artists = [self.line]
+
+    def update(self, blow_counts, moisture_contents, ll_value=None):
+        """
+        Move the data line.  Returns True if the axes had to be rescaled,
+        i.e. the static background is stale and needs a full draw.
+        """
+        self.line.set_data(blow_counts, moisture_contents)
+        old_limits = self.ax.get_xlim() + self.ax.get_ylim()
+        self.ax.relim()
+        self.ax.autoscale_view()
+        return not np.allclose(old_limits, self.ax.get_xlim() + self.ax.get_ylim())
+
+
+class CasagrandeChart:
+    """
+    Casagrande's plasticity chart with the A/U lines and soil zones.
+    """
+
+    def __init__(self, figure=None, animated=True, subplot=(1, 1, 1)):
+        self.figure = figure or Figure(figsize=(5, 4), dpi=100)  # 5x4 inches, 100 dpi
+        diagnostics.track_figure(self.figure)
+        self.ax = ax = self.figure.add_subplot(*subplot)
+        # "A" Line
+        LL_A = np.linspace(10, 100, 20)
+        A_Line = limits.a_line(LL_A)
+
+        # "U" Line
+        LL_U = np.linspace(8, 100, 20)
+        U_Line = 0.9 * (LL_U - 8)
+
+        ax.plot(LL_A, A_Line, label='"A" Line', color='blue', linewidth=2)
+        ax.plot(LL_U, U_Line, label='"U" Line', color='purple', linewidth=2)
+
+        # Horizontal lines for typical boundaries
+        ax.hlines(y=7, xmin=16, xmax=29.59, color='red', linewidth=2)
+        ax.hlines(y=4, xmin=12, xmax=25.47, color='green', linewidth=2)
+        ax.axvline(x=50, color='black', linewidth=2, label='50% LL Line')
+
+        # Text labels
+        ax.text(16, 5,  "CL-ML", color='green', fontsize=12, fontweight='bold')
+        ax.text(35, 5,  "ML or OL", color='red', fontsize=12, fontweight='bold')
+        ax.text(38, 23, "CL or OL", color='blue', fontsize=12, fontweight='bold')
+        ax.text(60, 40, "CH or OH", color='blue', fontsize=12, fontweight='bold')
+        ax.text(65, 10, "MH or OH", color='red', fontsize=12, fontweight='bold')
+
+        # The test point
+        self.point = ax.scatter([], [], color='red', marker='x', s=100,
+                                label='Soil Sample', animated=animated)
+
+        ax.set_xlabel("Liquid Limit, LL (%)", fontsize=12, fontweight='bold')
+        ax.set_ylabel("Plasticity Index, PI (%)", fontsize=12, fontweight='bold')
+        ax.set_title("Casagrande’s Plasticity Chart", fontsize=14, fontweight='bold')
+
+        ax.set_xticks(np.arange(0, 110, 10))
+        ax.set_yticks(np.arange(0, 60, 10))
+        ax.set_xlim(0, 100)
+        ax.set_ylim(0, 50)
+        ax.legend()
+        ax.grid(True, linestyle='--', linewidth=0.5)
+        self.artists = [self.point]
+
+    def update(self, LL, PI, soil_type):
+        """
+        Move the test point.  Returns True if the legend label changed,
+        i.e. the static background is stale and needs a full draw.
+        """
+        self.point.set_offsets(np.column_stack([np.atleast_1d(LL), np.atleast_1d(PI)]))
+        label = f'Soil Sample ({soil_type})'
+        if label == self.point.get_label():
+            return False
+        self.point.set_label(label)
+        self.ax.legend()
+        return True
+
+
+class SampleCloud:
+    """
+    Every sample of a project on a CasagrandeChart.  Large sets are drawn
+    as a hexbin density, smaller ones as a rasterized scatter; hover and
+    click find the nearest sample through a spatial.GridIndex.
+
+    describe(i) returns the text shown for sample i (boring, depth, class).
+    """
+
+    def __init__(self, chart, LL, PI, describe):
+        self.chart = chart
+        self.ax = ax = chart.ax
+        self.LL = np.asarray(LL, dtype=float)
+        self.PI = np.asarray(PI, dtype=float)
+        self.describe = describe
+        finite = np.isfinite(self.LL) & np.isfinite(self.PI)
+
+        if finite.sum() > DENSITY_THRESHOLD:
+            self.artist = ax.hexbin(self.LL[finite], self.PI[finite], gridsize=100,
+                                    extent=(0, 100, 0, 50), mincnt=1, bins="log",
+                                    cmap="viridis", zorder=1)
+            chart.figure.colorbar(self.artist, ax=ax, label="Samples")
+        else:
+            self.artist = ax.scatter(self.LL[finite], self.PI[finite], s=8, color="0.3",
+                                     alpha=0.6, rasterized=True, zorder=1)
+        self.index = spatial.GridIndex(self.LL, self.PI)
+
+        self.highlight = ax.scatter([], [], s=80, facecolors="none", edgecolors="red",
+                                    linewidths=1.5, animated=True, zorder=5)
+        self.annotation = ax.annotate("", xy=(0, 0), xytext=(12, 12), textcoords="offset points",
+                                      bbox=dict(boxstyle="round", fc="lightyellow", alpha=0.9),
+                                      animated=True, visible=False, zorder=6)
+        self.selected = None
+        self.blitter = None
+        self.on_select = None
+
+    def connect(self, canvas, on_select=None):
+        """
+        Hook hover/click handling into a canvas; on_select(i) is called on
+        click.
+        """
+        self.on_select = on_select
+        self.blitter = Blitter(canvas, [self.highlight, self.annotation])
+        canvas.mpl_connect("motion_notify_event", self.on_move)
+        canvas.mpl_connect("button_press_event", self.on_click)
+
+    def nearest(self, x, y):
+        # pick radius: 2% of the visible LL range, so it follows zooming
+        x0, x1 = self.ax.get_xlim()
+        return self.index.nearest(x, y, max_distance=abs(x1 - x0) * 0.02)
+
+    def show(self, i):
+        if i == self.selected:
+            return
+        self.selected = i
+        if i is None:
+            self.highlight.set_offsets(np.empty((0, 2)))
+            self.annotation.set_visible(False)
+        else:
+            self.highlight.set_offsets([[self.LL[i], self.PI[i]]])
+            self.annotation.xy = (self.LL[i], self.PI[i])
+            self.annotation.set_text(self.describe(i))
+            self.annotation.set_visible(True)
+        self.blitter.update()
+
+    def on_move(self, event):
+        if event.inaxes is not self.ax:
+            self.show(None)
+            return
+        self.show(self.nearest(event.xdata, event.ydata))
+
+    def on_click(self, event):
+        if event.inaxes is not self.ax:
+            return
+        i = self.nearest(event.xdata, event.ydata)
+        self.show(i)
+        if i is not None and self.on_select is not None:
+            self.on_select(i)
+
+
+class DepthProfileChart:
+    """
+    LL, PL, PI and G20 against depth (downwards), one line per boring.
+    Each parameter is a single LineCollection, so hundreds of borings
+    draw as fast as one; update() takes the output of profiles.profiles.
+    The highlighted boring is animated (see Blitter).
+    """
+
+    def __init__(self, figure=None, fields=profiles.PROFILE_FIELDS):
+        self.figure = figure or Figure(figsize=(10, 6), dpi=100)
+        diagnostics.track_figure(self.figure)
+        self.fields = list(fields)
+        self.axes = self.figure.subplots(1, len(self.fields), sharey=True, squeeze=False)[0]
+        self.collections = {}
+        self.highlights = {}
+        for ax, name in zip(self.axes, self.fields):
+            self.collections[name] = ax.add_collection(LineCollection([], linewidths=1))
+            self.highlights[name], = ax.plot([], [], 'o-', color='red', linewidth=2, markersize=3,
+                                             zorder=3, animated=True)
+            ax.set_xlabel(PROFILE_LABELS.get(name, name))
+            ax.xaxis.set_label_position("top")
+            ax.xaxis.tick_top()
+            ax.grid(True, linestyle='--', linewidth=0.5)
+        self.axes[0].set_ylabel("Depth (m)")
+        self.artists = list(self.highlights.values())
+        self.data = {}
+
+    def update(self, data):
+        self.data = data
+        colors = [f"C{i % 10}" for i in range(len(data))]
+        depths = [np.concatenate([series[name][0] for series in data.values()] or [[]])
+                  for name in self.fields]
+        for ax, name in zip(self.axes, self.fields):
+            segments = [np.column_stack([series[name][1], series[name][0]]) for series in data.values()]
+            self.collections[name].set_segments(segments)
+            self.collections[name].set_color(colors)
+            values = np.concatenate([segment[:, 0] for segment in segments] or [[]])
+            if len(values):
+                low, high = values.min(), values.max()
+                pad = (high - low) * 0.05 or 1.0
+                ax.set_xlim(low - pad, high + pad)
+        depths = np.concatenate(depths)
+        if len(depths):
+            pad = (depths.max() - depths.min()) * 0.05 or 1.0
+            self.axes[0].set_ylim(depths.max() + pad, max(0.0, depths.min() - pad))
+
+        legend = self.axes[-1].get_legend()
+        if legend is not None:
+            legend.remove()
+        if 0 < len(data) <= PROFILE_LEGEND:
+            from matplotlib.lines import Line2D
+            self.axes[-1].legend([Line2D([], [], color=color) for color in colors], list(data),
+                                 fontsize=8, loc="lower right")
+        self.highlight(None)
+
+    def highlight(self, boring):
+        """
+        Draw one boring's profiles on top in red (None clears).
+        """
+        for name in self.fields:
+            if boring in self.data:
+                self.highlights[name].set_data(self.data[boring][name][1], self.data[boring][name][0])
+            else:
+                self.highlights[name].set_data([], [])
@@ -0,0 +1,168 @@
+"""
+Headless batch runner for lab sheets.
+
+    python cli.py samples.csv -o results.csv
+    python cli.py pycnometer.xlsx -o results.json --workers 4
+    python cli.py samples.csv -o results.csv --charts pages/ --chart-format pdf
+    python cli.py samples.csv -o report.xlsx --format report
+
+Reads an Atterberg or pycnometer sheet (CSV or Excel), computes every
+sample in batches on a pool of worker processes and streams the results
+to CSV, JSON, Excel or a formatted report sheet.  Only the NumPy engines
+are imported: tkinter is never loaded, and matplotlib only with --charts.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import importer
+
+FORMATS = ("csv", "json", "xlsx", "report")
+CHART_FORMATS = ("png", "pdf")
+
+
+def run_batch(kind, batch, charts_dir=None, first=0, chart_format="png"):
+    """
+    Result rows for one batch of sheet rows (in a worker process).  With
+    charts_dir, Atterberg samples with LL and PL also get a chart page
+    each (first is the row number of the batch's first sample, for the
+    page names).
+    """
+    if kind == "gravity":
+        return list(importer.gravity_results(batch, len(batch)))
+    rows, result = importer.atterberg_batch(batch)
+    if charts_dir:
+        import report
+        names = [f"{row.get('Boring No', '')}-{row.get('Sample No', '')}" for row in batch]
+        for task in report.page_tasks(result, names, charts_dir, chart_format, first):
+            report.render_page(task)
+    return rows
+
+
+def run(path, kind=None, workers=1, batch_size=importer.BATCH_SIZE, charts_dir=None, chart_format="png"):
+    """
+    Yield result rows in input order.  At most two batches per worker are
+    in flight, so memory stays bounded however long the sheet is.
+    """
+    kind = kind or importer.detect_kind(path)
+    batches = importer.batched(importer.read_rows(path), batch_size)
+    first = 0
+    if workers == 1:
+        for batch in batches:
+            yield from run_batch(kind, batch, charts_dir, first, chart_format)
+            first += len(batch)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(run_batch, kind, batch, charts_dir, first, chart_format))
+            first += len(batch)
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def json_value(value):
+    # NumPy scalars as Python numbers, NaN as null
+    if isinstance(value, float) or hasattr(value, "item"):
+        value = value.item() if hasattr(value, "item") else value
+        if value != value:
+            return None
+    return value
+
+
+def write_json(results, f):
+    # One object per row inside a JSON array, written as the rows arrive
+    count = 0
+    f.write("[")
+    for row in results:
+        f.write(",\n" if count else "\n")
+        json.dump({key: json_value(value) for key, value in row.items()}, f)
+        count += 1
+    f.write("\n]\n")
+    return count
+
+
+def write_results(results, out, fmt, fields):
+    if fmt == "json":
+        return write_json(results, out)
+    count = 0
+    writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for row in results:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="Atterberg or pycnometer sheet (.csv or .xlsx)")
+    parser.add_argument("-o", "--out", help="results file (default: standard output)")
+    parser.add_argument("--format", choices=FORMATS,
+                        help="output format (default: from the --out extension, else csv)")
+    parser.add_argument("--kind", choices=("atterberg", "gravity"),
+                        help="sheet type (default: detected from the header)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes (default 1: run in this process; 0: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=importer.BATCH_SIZE,
+                        help=f"rows per batch (default {importer.BATCH_SIZE})")
+    parser.add_argument("--charts", metavar="DIR",
+                        help="also render a liquid-limit/Casagrande page per Atterberg sample")
+    parser.add_argument("--chart-format", choices=CHART_FORMATS, default="png",
+                        help="file format of the chart pages (default png)")
+    args = parser.parse_args(argv)
+
+    kind = args.kind or importer.detect_kind(args.input)
+    extension = os.path.splitext(args.out or "")[1].lower()
+    fmt = args.format or {".json": "json", ".xlsx": "xlsx"}.get(extension, "csv")
+    if fmt in ("xlsx", "report") and not args.out:
+        parser.error(f"--format {fmt} needs --out")
+    workers = args.workers if args.workers > 0 else os.cpu_count()
+    if args.charts:
+        if kind == "gravity":
+            parser.error("--charts is only available for Atterberg sheets")
+        os.makedirs(args.charts, exist_ok=True)
+
+    fields = importer.GRAVITY_RESULTS if kind == "gravity" else importer.ATTERBERG_RESULTS
+    results = run(args.input, kind, workers, args.batch_size, args.charts, args.chart_format)
+    pages = [0]
+    if args.charts:
+        results = _count_pages(results, pages)
+    start = time.perf_counter()
+    if fmt in ("xlsx", "report"):
+        import export
+        rows = export.export(export.row_chunks(results, fields), args.out, fields, fmt,
+                             title=os.path.basename(args.input), group=False)
+    elif args.out:
+        with open(args.out, "w", newline="", encoding="utf-8") as out:
+            rows = write_results(results, out, fmt, fields)
+    else:
+        rows = write_results(results, sys.stdout, fmt, fields)
+    seconds = time.perf_counter() - start
+
+    print(f"{kind}: {rows} rows in {seconds:.2f} s ({rows / seconds if seconds else 0:.0f} rows/s, "
+          f"{workers} worker{'s' if workers != 1 else ''})", file=sys.stderr)
+    if args.charts:
+        print(f"charts: {pages[0]} {args.chart_format} pages in {args.charts} "
+              f"({pages[0] / seconds if seconds else 0:.1f} pages/s)", file=sys.stderr)
+    return 0
+
+
+def _count_pages(results, pages):
+    # run_batch renders a page for every result row with an LL (LL and PL were found)
+    for row in results:
+        if row.get("LL", "") != "":
+            pages[0] += 1
+        yield row
+
+
+if __name__ == "__main__":
+    sys.exit(main())
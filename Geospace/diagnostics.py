@@ -0,0 +1,191 @@
+"""
+Optional hot-path instrumentation.
+
+Hot paths are decorated with @instrument.  While disabled the wrapper
+only checks one flag before calling through, so the cost is a single
+extra call.  Once enabled, every call records its wall time and, with
+allocations=True, the memory it allocated (tracemalloc; its peak is
+process-wide, so traced calls on different threads take turns).  The stats
+are read with snapshot(), saved with dump_json(), and a cProfile run of
+the main thread can be started and dumped alongside.
+
+Set GEOSPACE_DIAGNOSTICS=1 to enable at startup (GEOSPACE_DIAGNOSTICS=alloc
+also traces allocations) and GEOSPACE_DIAGNOSTICS_DUMP=<file.json> to
+write the stats on exit.
+"""
+import atexit
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+
+_stats = {}
+_lock = threading.Lock()
+_trace_lock = threading.Lock()  # one outermost traced call at a time
+_local = threading.local()
+_enabled = False
+_allocations = False
+_started_tracing = False
+_profiler = None
+_figures = weakref.WeakSet()
+
+
+class CallStats:
+    __slots__ = ("calls", "seconds", "max_seconds", "allocated", "peak")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.allocated = 0
+        self.peak = 0
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "mean_seconds": self.seconds / self.calls if self.calls else 0.0,
+            "max_seconds": self.max_seconds,
+            "allocated_bytes": self.allocated,
+            "peak_bytes": self.peak,
+        }
+
+
+def instrument(func):
+    """
+    Decorator: record calls of func while instrumentation is enabled.
+    """
+    label = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+        depth = getattr(_local, "depth", 0)
+        _local.depth = depth + 1
+        tracing = _allocations and tracemalloc.is_tracing()
+        if tracing:
+            if depth == 0:
+                _trace_lock.acquire()
+                tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            _local.depth = depth
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                if depth == 0:
+                    _trace_lock.release()
+            with _lock:
+                stats = _stats.get(label)
+                if stats is None:
+                    stats = _stats[label] = CallStats()
+                stats.calls += 1
+                stats.seconds += seconds
+                stats.max_seconds = max(stats.max_seconds, seconds)
+                if tracing:
+                    stats.allocated += max(0, current - before)
+                    if depth == 0:
+                        stats.peak = max(stats.peak, peak - before)
+    return wrapper
+
+
+def enable(allocations=False):
+    global _enabled, _allocations, _started_tracing
+    if allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracing = True
+    _allocations = allocations
+    _enabled = True
+
+
+def disable():
+    global _enabled, _allocations, _started_tracing
+    if _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+    _allocations = False
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def track_figure(figure):
+    """
+    Count a matplotlib Figure in figure_count() for as long as it lives
+    (the charts register theirs when built).
+    """
+    _figures.add(figure)
+
+
+def figure_count():
+    """
+    Live tracked Figures; a weak set, so this is cheap enough to refresh
+    every second.
+    """
+    return len(_figures)
+
+
+def snapshot():
+    with _lock:
+        functions = {label: stats.as_dict() for label, stats in sorted(_stats.items())}
+    return {
+        "enabled": _enabled,
+        "allocations": _allocations,
+        "profiling": _profiler is not None,
+        "figures": figure_count(),
+        "traced_bytes": tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+        "functions": functions,
+    }
+
+
+def dump_json(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2)
+    return path
+
+
+def start_profile():
+    """
+    Start cProfile on the calling (main) thread.
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def stop_profile(path=None):
+    """
+    Stop cProfile; with a path, write the stats there (pstats format, e.g.
+    for snakeviz).  Returns the profiler.
+    """
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is None:
+        return None
+    profiler.disable()
+    if path:
+        profiler.dump_stats(path)
+    return profiler
+
+
+_mode = os.environ.get("GEOSPACE_DIAGNOSTICS", "")
+if _mode and _mode != "0":
+    enable(allocations=_mode == "alloc")
+if os.environ.get("GEOSPACE_DIAGNOSTICS_DUMP"):
+    atexit.register(dump_json, os.environ["GEOSPACE_DIAGNOSTICS_DUMP"])
@@ -0,0 +1,93 @@
+"""
+Diagnostics window: live call counts, timings and allocations of the
+instrumented hot paths, the live figure count, and buttons to switch
+instrumentation on/off and save the stats (JSON) or a cProfile run.
+"""
+import tkinter as tk
+from tkinter import ttk, filedialog
+
+import diagnostics
+
+REFRESH_MS = 1000
+COLUMNS = ["Function", "Calls", "Total (ms)", "Mean (ms)", "Max (ms)", "Allocated (KiB)", "Peak (KiB)"]
+
+
+class DiagnosticsWindow(tk.Toplevel):
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Diagnostics")
+        self.refresh_after = None
+
+        buttons = ttk.Frame(self)
+        buttons.pack(fill="x", padx=5, pady=5)
+        self.enabled = tk.BooleanVar(self, diagnostics.is_enabled())
+        self.allocations = tk.BooleanVar(self, diagnostics.snapshot()["allocations"])
+        ttk.Checkbutton(buttons, text="Record", variable=self.enabled,
+                        command=self.toggle).pack(side="left", padx=2)
+        ttk.Checkbutton(buttons, text="Trace allocations", variable=self.allocations,
+                        command=self.toggle).pack(side="left", padx=2)
+        ttk.Button(buttons, text="Reset", command=self.reset).pack(side="left", padx=2)
+        ttk.Button(buttons, text="Save JSON...", command=self.save_json).pack(side="left", padx=2)
+        self.profile_btn = ttk.Button(buttons, text="Start cProfile", command=self.toggle_profile)
+        self.profile_btn.pack(side="left", padx=2)
+
+        self.lbl_status = ttk.Label(self, text="")
+        self.lbl_status.pack(fill="x", padx=5)
+
+        self.tree = ttk.Treeview(self, columns=COLUMNS, show="headings", height=12)
+        for column in COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=300 if column == "Function" else 90,
+                             anchor="w" if column == "Function" else "e")
+        self.tree.pack(fill="both", expand=True, padx=5, pady=5)
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+
+    def toggle(self):
+        if self.enabled.get():
+            diagnostics.disable()  # re-enable to apply the allocations setting
+            diagnostics.enable(allocations=self.allocations.get())
+        else:
+            diagnostics.disable()
+        self.refresh()
+
+    def reset(self):
+        diagnostics.reset()
+        self.refresh()
+
+    def save_json(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json",
+                                            filetypes=[("JSON", "*.json"), ("All files", "*.*")])
+        if path:
+            diagnostics.dump_json(path)
+
+    def toggle_profile(self):
+        if not diagnostics.snapshot()["profiling"]:
+            diagnostics.start_profile()
+            self.profile_btn.config(text="Stop cProfile...")
+            return
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".prof",
+                                            filetypes=[("cProfile stats", "*.prof"), ("All files", "*.*")])
+        diagnostics.stop_profile(path or None)
+        self.profile_btn.config(text="Start cProfile")
+
+    def refresh(self):
+        snapshot = diagnostics.snapshot()
+        traced = snapshot["traced_bytes"]
+        self.lbl_status.config(text=f"{'Recording' if snapshot['enabled'] else 'Off'}    "
+                                    f"Live figures: {snapshot['figures']}"
+                                    + (f"    Traced memory: {traced / 1024:.0f} KiB" if traced is not None else ""))
+        self.tree.delete(*self.tree.get_children())
+        for label, stats in snapshot["functions"].items():
+            self.tree.insert("", "end", values=(
+                label, stats["calls"], f"{stats['seconds'] * 1000:.1f}",
+                f"{stats['mean_seconds'] * 1000:.2f}", f"{stats['max_seconds'] * 1000:.2f}",
+                f"{stats['allocated_bytes'] / 1024:.0f}", f"{stats['peak_bytes'] / 1024:.0f}"))
+        self.refresh_after = self.after(REFRESH_MS, self.refresh)
+
+    def close(self):
+        if self.refresh_after is not None:
+            self.after_cancel(self.refresh_after)
+        self.destroy()
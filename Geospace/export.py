@@ -0,0 +1,234 @@
+"""
+Streaming export of results to CSV, Excel and formatted lab report sheets.
+
+Results arrive as chunks: dicts of equal-length columns ({"LL": array,
+...}) read CHUNK_ROWS samples at a time from a project file, a result
+archive, a SampleStore or a stream of result rows.  Each chunk is written
+before the next one is read, so memory stays flat however many samples
+are exported.  CSV goes through a large write buffer; Excel files use
+openpyxl's write-only mode, which streams rows to disk as they come.
+
+    export.export(export.store_chunks(store, project, fields), "site.xlsx", fields)
+"""
+import csv
+import os
+from itertools import islice
+
+import numpy as np
+
+import gravity
+import limits
+from samples import TEXT
+from store import SAMPLE_FIELDS
+
+CHUNK_ROWS = 4096
+WRITE_BUFFER = 1 << 20
+FORMATS = ("csv", "xlsx", "report")
+
+# Every result a project can hold, in report order
+PROJECT_FIELDS = ["Boring No", "Sample No", "Sample Depth", "Soil Description", "LL", "PL", "PI",
+                  "Soil Type", "Observed Temperature", "M1", "M2", "M3", "M4", "Pycnometer Capacity",
+                  "GTX", "G20"]
+
+# Number formats and column widths of report sheets
+REPORT_FORMATS = {"Sample Depth": "0.00", "LL": "0", "PL": "0", "PI": "0", "Observed Temperature": "0.0",
+                  "M1": "0.00", "M2": "0.00", "M3": "0.00", "M4": "0.00", "Pycnometer Capacity": "0",
+                  "GTX": "0.000", "G20": "0.000"}
+REPORT_WIDTHS = {"Soil Description": 24, "Soil Type": 40}
+REPORT_WIDTH = 12
+
+FILETYPES = [("CSV", "*.csv"), ("Excel workbook", "*.xlsx"), ("Lab report", "*.xlsx")]
+
+
+# ---------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------
+def store_chunks(store, project_id, keys, boring=None, size=CHUNK_ROWS):
+    """
+    Chunks of a stored project (or one boring), in boring/depth order.
+    """
+    keys = [key for key in keys if key == "Boring No" or key in SAMPLE_FIELDS]
+    return store.iter_columns(project_id, keys, boring, size)
+
+
+def sample_chunks(samples, keys, size=CHUNK_ROWS):
+    """
+    Chunks of a SampleStore; numbers are views of its columns.
+    """
+    keys = [key for key in keys if key in samples.columns]
+    for start in range(0, len(samples), size):
+        view = samples[start:start + size]
+        yield {key: view.text(key) if samples.columns[key] is TEXT else view.column(key) for key in keys}
+
+
+def archive_chunks(archive, size=CHUNK_ROWS):
+    """
+    Chunks of a result archive, read from its mapping; the soil type is
+    spelled out from the class code.
+    """
+    records = archive.records()
+    for start in range(0, len(records), size):
+        chunk = records[start:start + size]
+        columns = {name: chunk[name] for name in chunk.dtype.names}
+        columns["Boring No"] = np.char.decode(chunk["Boring No"], "utf-8", "replace")
+        codes = chunk["Class Code"]
+        columns["Soil Type"] = np.where(codes >= 0, limits.SOIL_TYPES[np.maximum(codes, 0)], "")
+        yield columns
+
+
+def row_chunks(rows, fields, size=CHUNK_ROWS):
+    """
+    Chunks of a stream of result rows (dicts), e.g. from importer.process;
+    numeric fields given as text (sheet cells) are parsed.
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield {key: (gravity.to_float([row.get(key, "") for row in batch]) if key in REPORT_FORMATS
+                     else [row.get(key, "") for row in batch])
+               for key in fields}
+
+
+def _cells(chunk, fields):
+    """
+    Rows of plain Python values for the given fields; NaN and missing
+    columns are None.
+    """
+    count = len(next(iter(chunk.values()))) if chunk else 0
+    columns = []
+    for key in fields:
+        values = chunk.get(key)
+        if values is None:
+            columns.append([None] * count)
+        elif isinstance(values, np.ndarray) and values.dtype.kind == "f":
+            cells = values.astype(object)
+            cells[np.isnan(values)] = None
+            columns.append(cells.tolist())
+        elif isinstance(values, np.ndarray):
+            columns.append(values.tolist())
+        else:
+            columns.append(values)
+    return zip(*columns)
+
+
+# ---------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------
+def write_csv(chunks, path, fields):
+    """
+    Write the chunks as CSV; returns the number of samples written.
+    """
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for chunk in chunks:
+            rows = list(_cells(chunk, fields))
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def write_xlsx(chunks, path, fields, sheet="Results"):
+    """
+    Write the chunks to one plain worksheet.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet)
+    worksheet.append(fields)
+    count = 0
+    for chunk in chunks:
+        for row in _cells(chunk, fields):
+            worksheet.append(row)
+            count += 1
+    workbook.save(path)
+    return count
+
+
+def write_report(chunks, path, fields, title="Test Results", details=None, group=True):
+    """
+    Write the chunks as a formatted lab report sheet: title and project
+    details on top, a styled header row kept in view and number formats
+    per column.  With group (for samples in boring order) every boring
+    starts with a heading row.  Still one chunk in memory at a time.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Report")
+    for i, key in enumerate(fields, start=1):
+        worksheet.column_dimensions[get_column_letter(i)].width = REPORT_WIDTHS.get(key, REPORT_WIDTH)
+
+    # one named style per number format, so data cells share their style
+    styles = {}
+    for key in fields:
+        name = f"report {REPORT_FORMATS.get(key, 'General')}"
+        if name not in workbook.named_styles:
+            workbook.add_named_style(NamedStyle(name=name, number_format=REPORT_FORMATS.get(key, "General")))
+        styles[key] = name
+
+    def cell(value, **style):
+        cell = WriteOnlyCell(worksheet, value)
+        for attribute, setting in style.items():
+            setattr(cell, attribute, setting)
+        return cell
+
+    # sheet settings go out with the first row: set them before any append
+    details = details or {}
+    worksheet.freeze_panes = f"A{len(details) + 4}"  # below title, details, blank line and header
+    worksheet.append([cell(title, font=Font(bold=True, size=14))])
+    for field, value in details.items():
+        worksheet.append([cell(f"{field}:", font=Font(bold=True)), value])
+    worksheet.append([])
+    line = Side(style="thin")
+    worksheet.append([cell(key, font=Font(bold=True), fill=PatternFill("solid", fgColor="DDEBF7"),
+                           border=Border(bottom=line), alignment=Alignment(wrap_text=True, horizontal="center"))
+                      for key in fields])
+
+    boring_font = Font(bold=True, italic=True)
+    boring = None
+    count = 0
+    for chunk in chunks:
+        for row in _cells(chunk, fields):
+            values = dict(zip(fields, row))
+            if group and "Boring No" in values and values["Boring No"] != boring:
+                boring = values["Boring No"]
+                worksheet.append([cell(f"Boring {boring}", font=boring_font)])
+            worksheet.append([value if value is None or isinstance(value, str)
+                              else cell(value, style=styles[key])
+                              for key, value in values.items()])
+            count += 1
+    workbook.save(path)
+    return count
+
+
+def export(chunks, path, fields, fmt=None, title="Test Results", details=None, group=True):
+    """
+    Stream the chunks to path as "csv", "xlsx" or "report" (default: from
+    the extension).  Returns the number of samples written.
+    """
+    fmt = fmt or ("xlsx" if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm") else "csv")
+    if fmt == "csv":
+        return write_csv(chunks, path, fields)
+    if fmt == "xlsx":
+        return write_xlsx(chunks, path, fields)
+    if fmt == "report":
+        return write_report(chunks, path, fields, title, details, group)
+    raise ValueError(f"unknown export format {fmt!r}")
+
+
+def file_format(path, filetype=""):
+    """
+    Export format for a save-dialog result (filetype is the chosen filter);
+    the extension decides between CSV and Excel.
+    """
+    if os.path.splitext(path)[1].lower() != ".xlsx":
+        return "csv"
+    return "report" if filetype == "Lab report" else "xlsx"
@@ -0,0 +1,137 @@
+"""
+Headless specific-gravity (pycnometer) engine.
+
+Works on arrays of samples; rows that cannot be computed are flagged in
+the result instead of stopping the whole batch.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+# Density of water (g/ml) from 15.0°C to 30.8°C in 0.1°C steps
+DENSITY_TEMPERATURES = np.round(np.arange(15.0, 30.85, 0.1), 1)
+DENSITY_DATA = np.array([
+    0.9991, 0.99909, 0.99907, 0.99906, 0.99904, 0.99902, 0.99901, 0.99899, 0.99898, 0.99896,
+    0.99895, 0.99893, 0.99891, 0.9989, 0.99888, 0.99886, 0.99885, 0.99883, 0.99881, 0.99879,
+    0.99878, 0.99876, 0.99874, 0.99872, 0.99871, 0.99869, 0.99867, 0.99865, 0.99863, 0.99862,
+    0.9986, 0.99858, 0.99856, 0.99854, 0.99852, 0.9985, 0.99848, 0.99847, 0.99845, 0.99843,
+    0.99841, 0.99839, 0.99837, 0.99835, 0.99833, 0.99831, 0.99829, 0.99827, 0.99825, 0.99823,
+    0.99821, 0.99819, 0.99816, 0.99814, 0.99812, 0.9981, 0.99808, 0.99806, 0.99802, 0.99799,
+    0.99797, 0.99795, 0.99793, 0.99791, 0.99789, 0.99786, 0.99784, 0.99782, 0.9978, 0.99777,
+    0.99775, 0.99773, 0.9977, 0.99768, 0.99766, 0.99764, 0.99761, 0.99759, 0.99756, 0.99754,
+    0.99752, 0.99749, 0.99747, 0.99745, 0.99742, 0.9974, 0.99737, 0.99735, 0.99732, 0.9973,
+    0.99727, 0.99725, 0.99723, 0.9972, 0.99717, 0.99715, 0.99712, 0.9971, 0.99707, 0.99705,
+    0.99702, 0.997, 0.99697, 0.99694, 0.99692, 0.99689, 0.99687, 0.99684, 0.99681, 0.99679,
+    0.99676, 0.99673, 0.99671, 0.99668, 0.99665, 0.99663, 0.9966, 0.99657, 0.99654, 0.99652,
+    0.99649, 0.99646, 0.99643, 0.99641, 0.99638, 0.99635, 0.99632, 0.99629, 0.99627, 0.99624,
+    0.99621, 0.99618, 0.99615, 0.99612, 0.99609, 0.99607, 0.99604, 0.99601, 0.99598, 0.99595,
+    0.99592, 0.99589, 0.99586, 0.99583, 0.9958, 0.99577, 0.99574, 0.99571, 0.99568, 0.99565,
+    0.99562, 0.99559, 0.99556, 0.99553, 0.9955, 0.99547, 0.99544, 0.99541, 0.99538
+])
+DENSITY_TEMPERATURES.flags.writeable = False
+DENSITY_DATA.flags.writeable = False
+
+# The table's range; np.interp would hold the end values beyond it
+MIN_TEMPERATURE = float(DENSITY_TEMPERATURES[0])
+MAX_TEMPERATURE = float(DENSITY_TEMPERATURES[-1])
+
+# M2 = M1 + dry soil mass used for each soil description
+SOIL_MASS = {
+    "Clayey Silt": 40,
+    "Silty Sand": 50,
+}
+DEFAULT_SOIL_MASS = 35
+
+GravityResult = namedtuple("GravityResult", ["M2", "M3", "GTX", "G20", "valid"])
+
+
+def to_float(values):
+    """
+    Convert a sequence of strings/numbers to a float array; anything that
+    does not parse becomes NaN.
+    """
+    try:
+        return np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        pass
+    out = np.empty(len(values), dtype=float)
+    for i, value in enumerate(values):
+        try:
+            out[i] = float(value)
+        except (TypeError, ValueError):
+            out[i] = np.nan
+    return out
+
+
+def temperature_in_range(temperature):
+    """
+    True where the temperature is covered by the density table.
+    """
+    temperature = np.asarray(temperature, dtype=float)
+    return (temperature >= MIN_TEMPERATURE) & (temperature <= MAX_TEMPERATURE)
+
+
+def density_at_temperature(temperature):
+    """
+    Water density linearly interpolated from the table; NaN out of range.
+    """
+    temperature = np.asarray(temperature, dtype=float)
+    density = np.interp(temperature, DENSITY_TEMPERATURES, DENSITY_DATA)
+    return np.where(temperature_in_range(temperature), density, np.nan)
+
+
+def soil_mass(soil_description):
+    """
+    Dry soil mass (gm) for each soil description.
+    """
+    descriptions = np.asarray(soil_description, dtype=str)
+    mass = np.full(descriptions.shape, DEFAULT_SOIL_MASS, dtype=float)
+    descriptions = np.char.strip(descriptions)
+    for description, value in SOIL_MASS.items():
+        mass[descriptions == description] = value
+    return mass
+
+
+def calculate_gravity(m1, m4, temperature, pycnometer_capacity, soil_description):
+    """
+    M2, M3, GTX and G20 for arrays of samples.  Rows with non-numeric input,
+    a temperature outside 15-30.8°C or a zero denominator are NaN and have
+    valid == False.
+    """
+    m1 = np.asarray(m1, dtype=float)
+    m4 = np.asarray(m4, dtype=float)
+    temperature = np.asarray(temperature, dtype=float)
+    pycnometer_capacity = np.asarray(pycnometer_capacity, dtype=float)
+
+    m2 = m1 + soil_mass(soil_description)
+    m3 = m1 + pycnometer_capacity * density_at_temperature(temperature)
+
+    denominator = (m2 - m1) + (m3 - m4)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gtx = np.where(denominator != 0, (m2 - m1) / denominator, np.nan)
+    g20 = gtx * float(density_at_temperature(20))
+
+    valid = np.isfinite(m2) & np.isfinite(m3) & np.isfinite(g20)
+    return GravityResult(m2, m3, gtx, g20, valid)
+
+
+def calculate_samples(samples):
+    """
+    Run samples through the engine: a SampleStore (read column-wise, no
+    copies) or a list of sample dicts.
+    """
+    if hasattr(samples, "column"):
+        return calculate_gravity(
+            samples.column("M1"),
+            samples.column("M4"),
+            samples.column("Observed Temperature"),
+            samples.column("Pycnometer Capacity"),
+            samples.text("Soil Description").astype(str),
+        )
+    return calculate_gravity(
+        to_float([s["M1"] for s in samples]),
+        to_float([s["M4"] for s in samples]),
+        to_float([s["Observed Temperature"] for s in samples]),
+        to_float([s["Pycnometer Capacity"] for s in samples]),
+        [s["Soil Description"] for s in samples],
+    )
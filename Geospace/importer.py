@@ -0,0 +1,248 @@
+"""
+Streaming lab-sheet importer.
+
+Rows are read one at a time from CSV or Excel, grouped into fixed-size
+batches for the vectorized engines, and yielded back as result rows, so
+memory stays bounded by the batch size however long the file is:
+
+    read_rows -> batched -> parse/validate -> compute -> classify -> results
+
+Every batch is validated as a whole (validation.check_atterberg /
+check_gravity); cans that fail are left out of the calculation and the
+"Error" column lists every problem of the row.
+
+Atterberg sheets have one row per sample with the columns
+"LL1 Can", "LL1 Clean", "LL1 Moist", "LL1 Dry", "LL1 Blows" (to LL3) and
+"PL1 Can", "PL1 Clean", "PL1 Moist", "PL1 Dry" (to PL2).  Pycnometer sheets
+use the same column names as the sample fields in bm.App.
+"""
+import csv
+import os
+import time
+from itertools import islice
+
+import numpy as np
+
+import gravity
+import limits
+import validation
+
+LIQUID_CANS = 3
+PLASTIC_CANS = 2
+BATCH_SIZE = 4096
+
+ID_FIELDS = ["Boring No", "Sample No", "Sample Depth"]
+GRAVITY_FIELDS = ID_FIELDS + ["Soil Description", "Observed Temperature",
+                              "M1", "M4", "Pycnometer Capacity"]
+
+ATTERBERG_RESULTS = ID_FIELDS + ["LL", "PL", "PI", "Class Code", "Soil Type", "Error"]
+GRAVITY_RESULTS = GRAVITY_FIELDS + ["M2", "M3", "GTX", "G20", "Error"]
+
+
+def read_rows(path):
+    """
+    Yield every data row of a CSV or Excel sheet as a dict keyed by header.
+    """
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        yield from read_excel_rows(path)
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def read_excel_rows(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("Reading Excel sheets requires openpyxl (pip install openpyxl).")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        for values in rows:
+            yield {key: ("" if value is None else value) for key, value in zip(header, values)}
+    finally:
+        workbook.close()
+
+
+def detect_kind(path):
+    """
+    "gravity" if the sheet has pycnometer columns, otherwise "atterberg".
+    """
+    header = next(read_rows(path), {})
+    return "gravity" if "M1" in header else "atterberg"
+
+
+def batched(rows, size=BATCH_SIZE):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def validate_batch(batch):
+    """
+    validation.ValidationReport for a batch of Atterberg sheet rows.
+    """
+    keys = [f"{prefix}{i} {field}"
+            for prefix, cans, fields in (("LL", LIQUID_CANS, ["Can", "Clean", "Moist", "Dry", "Blows"]),
+                                         ("PL", PLASTIC_CANS, ["Can", "Clean", "Moist", "Dry"]))
+            for i in range(1, cans + 1) for field in fields]
+    return validation.check_atterberg({key: [row.get(key, "") for row in batch] for key in keys},
+                                      len(batch), LIQUID_CANS, PLASTIC_CANS)
+
+
+def calculate_batch(batch, report=None):
+    """
+    limits.AtterbergResult for a batch of Atterberg sheet rows, from the
+    values parsed by validation; cans that fail it (or have no can no.)
+    are left out.
+    """
+    report = report or validate_batch(batch)
+    arrays = []
+    for prefix, fields in (("LL", ["Clean", "Moist", "Dry", "Blows"]), ("PL", ["Clean", "Moist", "Dry"])):
+        usable = report.cans[prefix]
+        arrays += [np.where(usable, report.numbers[prefix][field], np.nan) for field in fields]
+    return limits.calculate_limits(*arrays)
+
+
+def atterberg_results(rows, batch_size=BATCH_SIZE):
+    """
+    Yield LL, PL, PI and the soil classification for every sample row.
+    """
+    for batch in batched(rows, batch_size):
+        yield from atterberg_batch(batch)[0]
+
+
+def atterberg_batch(batch):
+    """
+    (result rows, limits.AtterbergResult) of one batch of Atterberg rows.
+    """
+    report = validate_batch(batch)
+    errors = report.by_row()
+    result = calculate_batch(batch, report)
+    codes, labels = limits.classify(result.LL, result.PI)
+    ll_ok = np.isfinite(result.LL)
+    pl_ok = np.isfinite(result.PL)
+
+    rows = []
+    for i, row in enumerate(batch):
+        out = {key: row.get(key, "") for key in ID_FIELDS}
+        error = "; ".join(e.message for e in errors.get(i, ()))
+        if ll_ok[i] and pl_ok[i]:
+            out.update({
+                "LL": int(result.LL[i]),
+                "PL": int(result.PL[i]),
+                "PI": int(result.PI[i]),
+                "Class Code": int(codes[i]),
+                "Soil Type": labels[i],
+                "Error": error,
+            })
+        else:
+            out.update({"LL": "", "PL": "", "PI": "", "Class Code": "", "Soil Type": "",
+                        "Error": error or ("Insufficient liquid limit data" if not ll_ok[i]
+                                          else "No plastic limit data")})
+        rows.append(out)
+    return rows, result
+
+
+def gravity_results(rows, batch_size=BATCH_SIZE):
+    """
+    Yield M2, M3, GTX and G20 for every pycnometer row.
+    """
+    for batch in batched(rows, batch_size):
+        fields = {key: [row.get(key, "") for row in batch] for key in GRAVITY_FIELDS}
+        report = validation.check_gravity(fields, len(batch))
+        numbers = report.numbers
+        result = gravity.calculate_gravity(numbers["M1"], numbers["M4"], numbers["Observed Temperature"],
+                                           numbers["Pycnometer Capacity"], fields["Soil Description"])
+        errors = report.by_row()
+        for i, row in enumerate(batch):
+            out = {key: row.get(key, "") for key in GRAVITY_FIELDS}
+            out.update({
+                "M2": result.M2[i],
+                "M3": result.M3[i],
+                "GTX": result.GTX[i],
+                "G20": result.G20[i],
+                "Error": "; ".join(e.message for e in errors.get(i, ())) or
+                         ("" if result.valid[i] else "Invalid input"),
+            })
+            yield out
+
+
+def process(path, kind=None, batch_size=BATCH_SIZE):
+    """
+    Stream result rows for a lab sheet; kind is "atterberg" or "gravity"
+    (detected from the header if not given).
+    """
+    kind = kind or detect_kind(path)
+    if kind == "gravity":
+        return gravity_results(read_rows(path), batch_size)
+    return atterberg_results(read_rows(path), batch_size)
+
+
+def load_results(path):
+    """
+    Columns of Atterberg results for charting, from a results CSV written
+    by import_file or straight from a lab sheet.  Only the charted columns
+    are kept in memory.
+    """
+    header = next(read_rows(path), {})
+    rows = read_rows(path) if "LL" in header else atterberg_results(read_rows(path))
+    columns = {key: [] for key in ["Boring No", "Sample No", "Sample Depth", "LL", "PL", "PI", "G20",
+                                   "Soil Type"]}
+    for row in rows:
+        for key, values in columns.items():
+            values.append(row.get(key, ""))
+    for key in ("Sample Depth", "LL", "PL", "PI", "G20"):
+        columns[key] = gravity.to_float([v if v != "" else "nan" for v in columns[key]])
+    return columns
+
+
+def write_csv(results, path, fields):
+    """
+    Write result rows as they arrive; returns the number of rows written.
+    """
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for row in results:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def import_file(path, out_path=None, kind=None, batch_size=BATCH_SIZE, on_result=None):
+    """
+    Run a lab sheet through the engines.  Results go to out_path (CSV)
+    and/or on_result(row).  Returns row count, elapsed seconds and rows per
+    second.
+    """
+    kind = kind or detect_kind(path)
+    results = process(path, kind, batch_size)
+    if on_result is not None:
+        results = _tap(results, on_result)
+
+    start = time.perf_counter()
+    if out_path:
+        rows = write_csv(results, out_path,
+                         GRAVITY_RESULTS if kind == "gravity" else ATTERBERG_RESULTS)
+    else:
+        rows = sum(1 for _ in results)
+    seconds = time.perf_counter() - start
+    return {
+        "kind": kind,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else 0.0,
+    }
+
+
+def _tap(results, callback):
+    for row in results:
+        callback(row)
+        yield row
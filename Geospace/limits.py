@@ -0,0 +1,224 @@
+"""
+Headless Atterberg-limits engine.
+
+All functions take NumPy arrays shaped (samples, cans); unused cans are
+marked with NaN so a whole borehole campaign can be computed in one pass.
+Nothing here imports tkinter.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+LL_BLOWS = 25
+# exponent of the one-point method, LL = w * (N / 25) ** 0.121
+ONE_POINT_EXPONENT = 0.121
+
+# category codes returned by classify(); index into SOIL_TYPES for the label
+CL_ML, CL_OL, ML_OL, CH_OH, MH_OH = range(5)
+SOIL_TYPES = np.array([
+    "CL-ML (Intermediate Clay-Silt Soil)",
+    "CL or OL (Clay or Organic Clay)",
+    "ML or OL (Silt or Organic Silt)",
+    "CH or OH (High Plastic Clay or Organic Clay)",
+    "MH or OH (High Plastic Silt or Organic Silt)",
+])
+
+AtterbergResult = namedtuple(
+    "AtterbergResult",
+    ["LL", "PL", "PI",
+     "liquid_mc", "liquid_dry", "liquid_water",
+     "plastic_mc", "plastic_dry", "plastic_water",
+     "blow_counts", "flow_index", "toughness_index"],
+)
+
+FlowCurve = namedtuple("FlowCurve", ["LL", "flow_index", "intercept", "cans"])
+
+
+def round_half_up(values):
+    """
+    Same "simple rounding" the lab sheet uses: a fractional part of .5 or more
+    rounds up, anything else is truncated.
+    """
+    values = np.asarray(values, dtype=float)
+    whole = np.trunc(values)
+    with np.errstate(invalid="ignore"):
+        return np.where(values - whole >= 0.5, whole + 1, whole)
+
+
+def moisture_content(wt_clean, wt_moist, wt_dry):
+    """
+    Moisture content (%) of every can.  A can with no dry soil (zero dry
+    weight) has no moisture content and gives NaN, like an empty can.
+    Returns (moisture_content, dry_soil, pore_water).
+    """
+    wt_clean = np.asarray(wt_clean, dtype=float)
+    wt_moist = np.asarray(wt_moist, dtype=float)
+    wt_dry = np.asarray(wt_dry, dtype=float)
+
+    dry_soil = wt_dry - wt_clean
+    pore_water = wt_moist - wt_dry
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mc = np.where(dry_soil != 0, pore_water / dry_soil * 100, np.nan)
+    return mc, dry_soil, pore_water
+
+
+def liquid_limit(blow_counts, moisture_contents, rounded=True):
+    """
+    Moisture content at 25 blows for every sample, interpolated linearly
+    between the two cans around 25 blows (extrapolated outside the range).
+    Samples with fewer than two cans give NaN.
+    """
+    blows = np.atleast_2d(np.asarray(blow_counts, dtype=float))
+    mc = np.atleast_2d(np.asarray(moisture_contents, dtype=float))
+    valid = ~(np.isnan(blows) | np.isnan(mc))
+    count = valid.sum(axis=1)
+
+    # empty cans go to the end of every row
+    order = np.argsort(np.where(valid, blows, np.inf), axis=1, kind="stable")
+    blows = np.take_along_axis(blows, order, axis=1)
+    mc = np.take_along_axis(mc, order, axis=1)
+
+    valid = np.take_along_axis(valid, order, axis=1)
+
+    # same segment choice as interp1d: first can at or above 25 blows
+    below = (np.where(valid, blows, np.inf) < LL_BLOWS).sum(axis=1)
+    hi = np.clip(below, 1, np.maximum(count - 1, 1))
+    lo = hi - 1
+
+    rows = np.arange(blows.shape[0])
+    x_lo, x_hi = blows[rows, lo], blows[rows, hi]
+    y_lo, y_hi = mc[rows, lo], mc[rows, hi]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ll = y_lo + (y_hi - y_lo) / (x_hi - x_lo) * (LL_BLOWS - x_lo)
+    ll = np.where(count >= 2, ll, np.nan)
+    return round_half_up(ll) if rounded else ll
+
+
+def one_point_liquid_limit(moisture_content, blow_count):
+    """
+    Liquid limit from a single can (one-point method, best between 20 and
+    30 blows).
+    """
+    moisture_content = np.asarray(moisture_content, dtype=float)
+    blow_count = np.asarray(blow_count, dtype=float)
+    return moisture_content * (blow_count / LL_BLOWS) ** ONE_POINT_EXPONENT
+
+
+def flow_curve(blow_counts, moisture_contents):
+    """
+    Closed-form least-squares fit of moisture content against log10(blows)
+    for every sample at once.
+
+    Returns a FlowCurve of arrays: LL (unrounded, read at 25 blows), flow
+    index (drop in moisture content per log cycle of blows), intercept and
+    the number of cans used.  Samples with a single can get the one-point
+    LL and a NaN flow index.
+    """
+    blows = np.atleast_2d(np.asarray(blow_counts, dtype=float))
+    mc = np.atleast_2d(np.asarray(moisture_contents, dtype=float))
+    valid = ~(np.isnan(blows) | np.isnan(mc)) & (blows > 0)
+    n = valid.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.where(valid, np.log10(np.where(valid, blows, 1)), 0.0)
+        y = np.where(valid, mc, 0.0)
+        sx = x.sum(axis=1)
+        sy = y.sum(axis=1)
+        sxx = (x * x).sum(axis=1)
+        sxy = (x * y).sum(axis=1)
+
+        slope = (n * sxy - sx * sy) / (n * sxx - sx ** 2)
+        intercept = (sy - slope * sx) / n
+        ll = intercept + slope * np.log10(LL_BLOWS)
+
+        # single can: one-point method on the only valid can
+        ll = np.where(n == 1, one_point_liquid_limit(sy, 10 ** sx), ll)
+    ll = np.where(n >= 1, ll, np.nan)
+    slope = np.where(n >= 2, slope, np.nan)
+    return FlowCurve(ll, -slope, np.where(n >= 2, intercept, np.nan), n)
+
+
+def toughness_index(PI, flow_index):
+    """
+    Plasticity index divided by flow index.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.asarray(PI, dtype=float) / np.asarray(flow_index, dtype=float)
+
+
+def plastic_limit(moisture_contents, rounded=True):
+    """
+    Minimum moisture content of the plastic-limit cans of every sample.
+    Samples without any can give NaN.
+    """
+    mc = np.atleast_2d(np.asarray(moisture_contents, dtype=float))
+    empty = np.isnan(mc).all(axis=1)
+    pl = np.min(np.where(np.isnan(mc), np.inf, mc), axis=1)
+    pl = np.where(empty, np.nan, pl)
+    return round_half_up(pl) if rounded else pl
+
+
+def calculate_limits(ll_clean, ll_moist, ll_dry, blow_counts,
+                     pl_clean, pl_moist, pl_dry, method="interpolate"):
+    """
+    LL, PL and PI for N samples at once.
+
+    Liquid-limit arrays are shaped (N, liquid cans) and plastic-limit arrays
+    (N, plastic cans).  method "interpolate" reads LL between the two cans
+    around 25 blows (the lab sheet); "flow_curve" reads it off the semi-log
+    least-squares fit of all cans (one-point method for a single can).
+    The flow and toughness indexes always come from the fit.
+    Returns an AtterbergResult of arrays.
+    """
+    liquid = [np.atleast_2d(a) for a in moisture_content(ll_clean, ll_moist, ll_dry)]
+    plastic = [np.atleast_2d(a) for a in moisture_content(pl_clean, pl_moist, pl_dry)]
+
+    curve = flow_curve(blow_counts, liquid[0])
+    if method == "flow_curve":
+        LL = round_half_up(curve.LL)
+    elif method == "interpolate":
+        LL = liquid_limit(blow_counts, liquid[0])
+    else:
+        raise ValueError(f"Unknown liquid limit method: {method}")
+    PL = plastic_limit(plastic[0])
+    PI = LL - PL
+    return AtterbergResult(LL, PL, PI, *liquid, *plastic,
+                           np.atleast_2d(np.asarray(blow_counts, dtype=float)),
+                           curve.flow_index, toughness_index(PI, curve.flow_index))
+
+
+def a_line(LL):
+    """
+    PI of the Casagrande "A" line at the given liquid limit.
+    """
+    return 0.73 * (np.asarray(LL, dtype=float) - 20)
+
+
+def classify(LL, PI=None):
+    """
+    Soil category code for every (LL, PI) pair, using the A-line and the
+    CL-ML zone.  LL may also be a structured array with "LL" and "PI" fields.
+    Returns (codes, labels).
+    """
+    if PI is None:
+        LL, PI = LL["LL"], LL["PI"]
+    LL = np.asarray(LL, dtype=float)
+    PI = np.asarray(PI, dtype=float)
+
+    above = PI > a_line(LL)
+    low = LL < 50
+    cl_ml = (PI >= 4) & (PI <= 7) & (LL >= 12) & (LL <= 29.59)
+
+    codes = np.select(
+        [cl_ml, low & above, low, above],
+        [CL_ML, CL_OL, ML_OL, CH_OH],
+        default=MH_OH,
+    ).astype(np.int8)
+    return codes, SOIL_TYPES[codes]
+
+
+def classify_soil_type(LL, PI):
+    """
+    Soil type label for a single (LL, PI) pair.
+    """
+    return str(classify(LL, PI)[1])
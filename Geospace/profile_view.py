@@ -0,0 +1,80 @@
+"""
+Depth-profile window: LL, PL, PI and G20 against depth for every boring,
+with a per-boring summary table below.  Selecting a boring in the table
+highlights its profiles.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+import profiles
+
+CLASS_HEADINGS = ["CL-ML", "CL/OL", "ML/OL", "CH/OH", "MH/OH"]
+SUMMARY_COLUMNS = (["Boring", "Samples"]
+                   + [f"{name} {stat}" for name in profiles.PROFILE_FIELDS for stat in ("mean", "min", "max")]
+                   + CLASS_HEADINGS)
+
+
+def _format(value, fmt):
+    return "" if value != value else fmt.format(value)
+
+
+class DepthProfileWindow(tk.Toplevel):
+    """
+    columns holds "Boring No", "Sample Depth" and any of LL, PL, PI, G20
+    (missing ones are left empty).
+    """
+
+    def __init__(self, parent, columns, title="Project"):
+        import charts
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
+        super().__init__(parent)
+        boring = np.asarray(columns["Boring No"])
+        depth = np.asarray(columns["Sample Depth"], dtype=float)
+        values = {name: np.asarray(columns[name], dtype=float) if name in columns
+                  else np.full(len(boring), np.nan) for name in profiles.PROFILE_FIELDS}
+        self.title(f"Depth Profiles - {title} ({len(boring)} samples)")
+
+        # one grouped pass for the table, downsampled series for the plots
+        self.summary = profiles.summarize(boring, values, profiles.class_codes(values["LL"], values["PI"]))
+        self.chart = charts.DepthProfileChart()
+        self.chart.update(profiles.profiles(boring, depth, values))
+
+        self.canvas = FigureCanvasTkAgg(self.chart.figure, master=self)
+        self.blitter = charts.Blitter(self.canvas, self.chart.artists)
+        NavigationToolbar2Tk(self.canvas, self).pack(side="bottom", fill="x")
+        table_frame = ttk.Frame(self)
+        table_frame.pack(side="bottom", fill="x")
+        self.canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
+
+        self.table = ttk.Treeview(table_frame, columns=SUMMARY_COLUMNS, show="headings", height=8)
+        for column in SUMMARY_COLUMNS:
+            self.table.heading(column, text=column)
+            self.table.column(column, width=70 if column != "Boring" else 90, anchor="e")
+        scroll = ttk.Scrollbar(table_frame, orient="vertical", command=self.table.yview)
+        self.table.configure(yscrollcommand=scroll.set)
+        self.table.pack(side="left", fill="x", expand=True)
+        scroll.pack(side="right", fill="y")
+        for i, values in enumerate(self.summary_rows()):
+            self.table.insert("", "end", iid=str(i), values=values)
+        self.table.bind("<<TreeviewSelect>>", self.on_select)
+        self.canvas.draw()
+
+    def summary_rows(self):
+        s = self.summary
+        for i, boring in enumerate(s.borings):
+            row = [str(boring), int(s.samples[i])]
+            for name in profiles.PROFILE_FIELDS:
+                fmt = "{:.3f}" if name == "G20" else "{:.1f}"
+                row += [_format(s.mean[name][i], fmt), _format(s.minimum[name][i], fmt),
+                        _format(s.maximum[name][i], fmt)]
+            row += [int(count) for count in s.class_counts[i]]
+            yield row
+
+    def on_select(self, event=None):
+        selection = self.table.selection()
+        self.chart.highlight(self.summary.borings[int(selection[0])] if selection else None)
+        self.blitter.update()
+
@@ -0,0 +1,133 @@
+"""
+Headless per-boring aggregation and depth profiles.
+
+Samples are grouped by boring once (one stable argsort); every statistic
+is then a single reduceat over the sorted columns, so the cost does not
+depend on how many borings there are.  Nothing here imports tkinter or
+matplotlib.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+import limits
+
+# Most points drawn per boring, and in all, for each parameter of a depth profile
+PROFILE_POINTS = 400
+PROFILE_BUDGET = 8000
+
+PROFILE_FIELDS = ["LL", "PL", "PI", "G20"]
+
+BoringSummary = namedtuple(
+    "BoringSummary",
+    ["borings", "samples", "count", "mean", "minimum", "maximum", "class_counts"],
+)
+
+
+def group_by(keys):
+    """
+    (distinct keys, sort order, start of each group in the order).
+    """
+    keys = np.asarray(keys)
+    if keys.dtype.kind != "S":  # bytes (archive columns) sort as they are
+        keys = keys.astype(str)
+    order = np.argsort(keys, kind="stable")
+    borings, starts = np.unique(keys[order], return_index=True)
+    if borings.dtype.kind == "S":
+        borings = np.char.decode(borings, "utf-8", "replace")
+    return borings, order, starts
+
+
+def summarize(boring, columns, codes=None):
+    """
+    Per-boring statistics of the given columns ({name: values}) in one
+    grouped pass.  count/mean/minimum/maximum are {name: array per boring}
+    and ignore NaN (NaN where a boring has no value); class_counts is
+    (borings, 5), counted from codes (limits.classify codes, -1 for
+    unclassified samples).
+    """
+    borings, order, starts = group_by(boring)
+    names = list(columns)
+    values = np.column_stack([np.asarray(columns[name], dtype=float) for name in names]
+                             ).reshape(len(order), len(names))[order]
+    finite = np.isfinite(values)
+
+    samples = np.diff(np.append(starts, len(order)))
+    if not len(order):
+        empty = {name: np.empty(0) for name in names}
+        return BoringSummary(borings, samples, empty, empty, empty, empty,
+                             np.zeros((0, len(limits.SOIL_TYPES)), dtype=int))
+
+    count = np.add.reduceat(finite, starts, axis=0)
+    total = np.add.reduceat(np.where(finite, values, 0.0), starts, axis=0)
+    minimum = np.minimum.reduceat(np.where(finite, values, np.inf), starts, axis=0)
+    maximum = np.maximum.reduceat(np.where(finite, values, -np.inf), starts, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    minimum[count == 0] = np.nan
+    maximum[count == 0] = np.nan
+
+    if codes is None:
+        class_counts = np.zeros((len(borings), len(limits.SOIL_TYPES)), dtype=int)
+    else:
+        one_hot = np.asarray(codes)[order, None] == np.arange(len(limits.SOIL_TYPES))
+        class_counts = np.add.reduceat(one_hot, starts, axis=0)
+
+    return BoringSummary(
+        borings, samples,
+        {name: count[:, i] for i, name in enumerate(names)},
+        {name: mean[:, i] for i, name in enumerate(names)},
+        {name: minimum[:, i] for i, name in enumerate(names)},
+        {name: maximum[:, i] for i, name in enumerate(names)},
+        class_counts,
+    )
+
+
+def class_codes(LL, PI):
+    """
+    limits.classify codes, -1 where LL or PI is missing.
+    """
+    LL = np.asarray(LL, dtype=float)
+    PI = np.asarray(PI, dtype=float)
+    codes = limits.classify(LL, PI)[0].astype(int)
+    codes[~(np.isfinite(LL) & np.isfinite(PI))] = -1
+    return codes
+
+
+def downsample(depth, values, max_points=PROFILE_POINTS):
+    """
+    Indexes of the points to draw for one profile, in depth order.  NaN
+    points are dropped; above max_points the depth-ordered points are cut
+    into max_points // 2 buckets and only the lowest and highest value of
+    each bucket is kept, so peaks survive.
+    """
+    depth = np.asarray(depth, dtype=float)
+    values = np.asarray(values, dtype=float)
+    keep = np.flatnonzero(np.isfinite(depth) & np.isfinite(values))
+    order = keep[np.argsort(depth[keep], kind="stable")]
+    if len(order) <= max_points:
+        return order
+
+    buckets = max(1, max_points // 2)
+    edges = np.linspace(0, len(order), buckets + 1).astype(int)
+    bucket = np.repeat(np.arange(buckets), np.diff(edges))
+    by_value = np.lexsort((values[order], bucket))
+    return order[np.union1d(by_value[edges[:-1]], by_value[edges[1:] - 1])]
+
+
+def profiles(boring, depth, columns, max_points=PROFILE_POINTS, budget=PROFILE_BUDGET):
+    """
+    {boring: {name: (depths, values)}} ready to plot, each downsampled to
+    max_points, and further so that all borings together stay within budget.
+    """
+    depth = np.asarray(depth, dtype=float)
+    borings, order, starts = group_by(boring)
+    max_points = min(max_points, max(8, budget // max(1, len(borings))))
+    result = {}
+    for name_boring, rows in zip(borings, np.split(order, starts[1:])):
+        series = result[str(name_boring)] = {}
+        for name, values in columns.items():
+            values = np.asarray(values, dtype=float)
+            keep = rows[downsample(depth[rows], values[rows], max_points)]
+            series[name] = (depth[keep], values[keep])
+    return result
@@ -0,0 +1,77 @@
+"""
+Headless report rendering.
+
+Every sample gets one page with its liquid-limit flow chart and its
+Casagrande chart, rendered with the Agg backend in the batch workers of
+cli.run.  Each worker builds its page figure once and only updates the
+data artists for every sample it renders.
+"""
+import os
+
+import numpy as np
+
+import limits
+
+# Page figure of the current worker process, built by _init_worker
+_page = None
+
+
+def _init_worker():
+    global _page
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    import charts
+
+    figure = Figure(figsize=(10, 4), dpi=100)
+    FigureCanvasAgg(figure)
+    _page = (
+        figure,
+        charts.LiquidLimitChart(figure, animated=False, subplot=(1, 2, 1)),
+        charts.CasagrandeChart(figure, animated=False, subplot=(1, 2, 2)),
+    )
+    # fixed margins: a layout engine would force an extra draw on every savefig
+    figure.subplots_adjust(left=0.07, right=0.98, bottom=0.13, top=0.85, wspace=0.25)
+
+
+def render_page(task):
+    """
+    Render one sample page to task["path"]; returns the path.
+    """
+    if _page is None:
+        _init_worker()
+    figure, ll_chart, casagrande_chart = _page
+    ll_chart.update(task["blows"], task["moisture"], task["LL"])
+    casagrande_chart.update(task["LL"], task["PI"], task["soil_type"])
+    figure.suptitle(task["title"], fontsize=12, fontweight="bold")
+    figure.savefig(task["path"])
+    return task["path"]
+
+
+def page_tasks(result, names, out_dir, fmt="png", first=0):
+    """
+    One render task per sample of a limits.AtterbergResult.  Samples
+    without LL/PL are skipped.  Files are named after the sample's row
+    number (counted from first) and its name, so samples whose names
+    only differ in punctuation do not overwrite each other.
+    """
+    codes, labels = limits.classify(result.LL, result.PI)
+    for i, name in enumerate(names):
+        if not (np.isfinite(result.LL[i]) and np.isfinite(result.PL[i])):
+            continue
+        blows = result.blow_counts[i]
+        moisture = result.liquid_mc[i]
+        valid = ~(np.isnan(blows) | np.isnan(moisture))
+        order = np.argsort(blows[valid], kind="stable")
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(name))
+        yield {
+            "title": f"Sample {name}",
+            "blows": blows[valid][order],
+            "moisture": moisture[valid][order],
+            "LL": float(result.LL[i]),
+            "PI": float(result.PI[i]),
+            "soil_type": labels[i],
+            "path": os.path.join(out_dir, f"{first + i + 1:06d}_{safe_name}.{fmt}"),
+        }
@@ -0,0 +1,281 @@
+"""
+Columnar sample store.
+
+Numeric fields live in typed NumPy columns and text fields as int32 codes
+into a shared list of distinct values, so a campaign of many samples
+costs a few dozen bytes per sample instead of a dict of strings each.
+The batch engines read the columns directly (no copies); the GUI uses
+the dict-like row API.
+"""
+import numpy as np
+
+TEXT = "text"
+
+# Column name -> dtype (TEXT for interned strings); names match bm.App's fields
+SAMPLE_COLUMNS = {
+    "Boring No": TEXT,
+    "Sample No": TEXT,
+    "Sample Depth": float,
+    "Soil Description": TEXT,
+    "Observed Temperature": float,
+    "M1": float,
+    "M4": float,
+    "Pycnometer Capacity": float,
+    "M2": float,
+    "M3": float,
+    "GTX": float,
+    "G20": float,
+    "Valid": bool,
+    "LL": float,
+    "PL": float,
+    "PI": float,
+}
+
+
+def _missing(dtype):
+    if dtype is TEXT:
+        return 0  # code of ""
+    if dtype is bool:
+        return False
+    return np.nan
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class Categories:
+    """
+    Distinct values of one text column; code 0 is always "".
+    """
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values = [""]
+        self.codes = {"": 0}
+
+    def encode(self, value):
+        value = "" if value is None else str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, codes):
+        return np.array(self.values, dtype=object)[codes]
+
+
+class SampleRow:
+    """
+    Dict-like view of one sample in a SampleStore.
+    """
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, key):
+        return self.store.value(key, self.index)
+
+    def __setitem__(self, key, value):
+        self.store.set_value(key, self.index, value)
+
+    def __contains__(self, key):
+        return key in self.store.columns
+
+    def get(self, key, default=None):
+        return self[key] if key in self.store.columns else default
+
+    def keys(self):
+        return self.store.columns.keys()
+
+    def update(self, values=(), **kwargs):
+        for key, value in dict(values, **kwargs).items():
+            self[key] = value
+
+    def as_dict(self):
+        return {key: self[key] for key in self.keys()}
+
+    def __repr__(self):
+        return f"SampleRow({self.as_dict()!r})"
+
+
+class SampleStore:
+    """
+    Growable set of samples stored column-wise.
+
+    store.append({...}) adds a sample, store[i] is a SampleRow, store[a:b]
+    is a store sharing the same buffers, and store.column(name) is a
+    zero-copy array of the filled part of a column.  Text given for a
+    number that does not parse is stored as NaN; the text itself is kept
+    aside (store.raw(name)) so validation can tell a typo from a blank.
+    Views share that text with their store, like the column buffers.
+    """
+
+    def __init__(self, columns=None, capacity=64):
+        self.columns = dict(columns or SAMPLE_COLUMNS)
+        self.categories = {name: Categories() for name, dtype in self.columns.items() if dtype is TEXT}
+        self.data = {name: np.full(capacity, _missing(dtype), dtype=np.int32 if dtype is TEXT else dtype)
+                     for name, dtype in self.columns.items()}
+        self.size = 0
+        self.is_view = False
+        self.rows = None  # of a view: its indexes in the store it was cut from
+        self.unparsed = {}  # numeric column -> {store index: text that is not a number}
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return self.size > 0
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield SampleRow(self, index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._view(index)
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("sample index out of range")
+        return SampleRow(self, index)
+
+    def _view(self, rows):
+        view = SampleStore.__new__(SampleStore)
+        view.columns = self.columns
+        view.categories = self.categories
+        view.data = {name: self.data[name][:self.size][rows] for name in self.columns}
+        view.rows = (self.rows if self.rows is not None else range(self.size))[rows]
+        view.size = len(view.rows)
+        view.is_view = True
+        view.unparsed = self.unparsed
+        return view
+
+    def _store_index(self, index):
+        return index if self.rows is None else self.rows[index]
+
+    def _reserve(self, size):
+        capacity = len(next(iter(self.data.values())))
+        if size <= capacity:
+            return
+        if self.is_view:
+            raise ValueError("cannot append to a slice of a SampleStore")
+        capacity = max(size, capacity * 2)
+        for name, dtype in self.columns.items():
+            grown = np.full(capacity, _missing(dtype), dtype=self.data[name].dtype)
+            grown[:self.size] = self.data[name][:self.size]
+            self.data[name] = grown
+
+    # -- row access ------------------------------------------------------
+    def value(self, name, index):
+        value = self.data[name][index]
+        if self.columns[name] is TEXT:
+            return self.categories[name].values[value]
+        return value.item()
+
+    def set_value(self, name, index, value):
+        dtype = self.columns[name]
+        if dtype is TEXT:
+            value = self.categories[name].encode(value)
+        elif dtype is bool:
+            value = bool(value)
+        else:
+            number = _to_number(value)
+            cells = self.unparsed.setdefault(name, {})
+            if number != number and value is not None and str(value).strip():
+                cells[self._store_index(index)] = str(value)
+            else:
+                cells.pop(self._store_index(index), None)
+            value = number
+        self.data[name][index] = value
+
+    def append(self, values):
+        """
+        Add one sample from a dict; missing or non-numeric numbers are NaN.
+        Returns its index.
+        """
+        self._reserve(self.size + 1)
+        index = self.size
+        self.size += 1
+        for name, value in values.items():
+            if name in self.columns:
+                self.set_value(name, index, value)
+        return index
+
+    def extend(self, columns):
+        """
+        Add many samples from a dict of equal-length columns; numbers may
+        be given as text, parsed like append() does.
+        """
+        count = len(next(iter(columns.values())))
+        start = self.size
+        self._reserve(start + count)
+        self.size += count
+        for name, values in columns.items():
+            dtype = self.columns.get(name)
+            if dtype is TEXT:
+                encode = self.categories[name].encode
+                values = [encode(value) for value in values]
+            elif dtype is not bool:
+                try:
+                    values = np.asarray(values, dtype=float)
+                except (TypeError, ValueError):
+                    for index, value in enumerate(values, start=start):
+                        self.set_value(name, index, value)
+                    continue
+            self.data[name][start:self.size] = values
+
+    # -- column access ---------------------------------------------------
+    def column(self, name):
+        """
+        Zero-copy view of a column (codes for text columns).
+        """
+        return self.data[name][:self.size]
+
+    def text(self, name):
+        """
+        Decoded values of a text column.
+        """
+        return self.categories[name].decode(self.column(name))
+
+    def raw(self, name):
+        """
+        A numeric column as entered: the column itself, or an object copy
+        holding the text of the cells that were not numbers.
+        """
+        cells = self.unparsed.get(name)
+        if not cells:
+            return self.column(name)
+        values = self.column(name).astype(object)
+        for index, text in cells.items():
+            if self.rows is None:
+                values[index] = text
+            elif index in self.rows:
+                values[self.rows.index(index)] = text
+        return values
+
+    def set_column(self, name, values):
+        self.data[name][:self.size] = values
+        cells = self.unparsed.get(name, {})
+        for index in [index for index in cells if self.rows is None or index in self.rows]:
+            del cells[index]
+
+    def groups(self, name="Boring No"):
+        """
+        {value: indexes of its samples} for a text column, e.g. per boring.
+        """
+        codes = self.column(name)
+        order = np.argsort(codes, kind="stable")
+        unique, starts = np.unique(codes[order], return_index=True)
+        values = self.categories[name].values
+        return {values[code]: rows for code, rows in zip(unique, np.split(order, starts[1:]))}
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.data.values())
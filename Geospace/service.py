@@ -0,0 +1,399 @@
+"""
+Local ingestion service for balances and LIMS batches.
+
+A small asyncio HTTP server (no dependencies):
+
+    POST /atterberg   JSON list of Atterberg sheet rows ("LL1 Can", ...)
+    POST /gravity     JSON list of pycnometer rows ("M1", "M4", ...)
+    POST /            {"kind": ..., "rows": [...]} (kind detected if omitted)
+    GET  /stats       throughput and latency
+
+Rows use the lab-sheet columns of importer; the reply is {"results": [...]}
+with the importer's result rows (LL/PL/PI/class or M2/M3/GTX/G20 and an
+Error column).  Rows of concurrent requests are gathered into
+micro-batches (up to MAX_BATCH rows, waiting at most MAX_WAIT seconds)
+and computed on a worker pool, so many small requests share one
+vectorized pass.
+
+    python service.py --port 8765 --workers 2
+
+Inside the Tk app, ServiceThread runs the server in the background and
+hands each batch of results to the frames through a queue polled with
+after().  The app runs one of them, shared(controller); each frame
+subscribes to the kind of results it shows.
+"""
+import argparse
+import asyncio
+import json
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import cli
+
+DEFAULT_PORT = 8765
+MAX_BATCH = 1024
+MAX_WAIT = 0.005
+MAX_BODY = 64 * 1024 * 1024
+LATENCY_WINDOW = 10000
+KINDS = ("atterberg", "gravity")
+POLL_MS = 100
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MicroBatcher:
+    """
+    Collects rows of one kind from concurrent requests and computes them
+    together.  submit() resolves to the result rows of its own request.
+    """
+
+    def __init__(self, service, kind):
+        self.service = service
+        self.kind = kind
+        self.pending = []  # (rows, future)
+        self.size = 0
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.ensure_future(self.run())
+
+    def submit(self, rows):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((rows, future))
+        self.size += len(rows)
+        self.wakeup.set()
+        return future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.wakeup.wait()
+            # give concurrent requests a moment to join the batch
+            deadline = loop.time() + self.service.max_wait
+            while self.size < self.service.max_batch and loop.time() < deadline:
+                await asyncio.sleep(max(0.0, min(0.001, deadline - loop.time())))
+            jobs, self.pending, self.size = self.pending, [], 0
+            self.wakeup.clear()
+            if jobs:
+                asyncio.ensure_future(self.compute(jobs))
+
+    async def compute(self, jobs):
+        rows = [row for job_rows, future in jobs for row in job_rows]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.service.pool, cli.run_batch, self.kind, rows)
+        except Exception as e:
+            for job_rows, future in jobs:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.service.record_batch(len(rows))
+        start = 0
+        for job_rows, future in jobs:
+            if not future.done():
+                future.set_result(results[start:start + len(job_rows)])
+            start += len(job_rows)
+        if self.service.on_results is not None:
+            self.service.on_results(self.kind, results)
+
+
+class IngestService:
+    """
+    HTTP front end, micro-batchers and worker pool.  workers=0 computes on
+    one thread of this process (lowest latency, no pickling); workers > 0
+    uses that many processes.  on_results(kind, rows) is called in the
+    event-loop thread with every computed batch.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, workers=0,
+                 max_batch=MAX_BATCH, max_wait=MAX_WAIT, on_results=None):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.on_results = on_results
+        self.pool = None
+        self.server = None
+        self.batchers = {}
+        self.connections = set()
+        self.started = None
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    async def start(self):
+        self.pool = (ProcessPoolExecutor(max_workers=self.workers) if self.workers > 0
+                     else ThreadPoolExecutor(max_workers=1))
+        self.batchers = {kind: MicroBatcher(self, kind) for kind in KINDS}
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.started = time.perf_counter()
+        return self
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self.connections):
+                writer.close()
+            while self.connections:  # let the handlers see the close
+                await asyncio.sleep(0.001)
+            await self.server.wait_closed()
+        for batcher in self.batchers.values():
+            batcher.task.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+
+    async def submit(self, kind, rows):
+        if kind not in self.batchers:
+            raise HTTPError(404, f"unknown kind {kind!r}")
+        if not rows:
+            return []
+        return await self.batchers[kind].submit(rows)
+
+    def record_batch(self, rows):
+        self.batches += 1
+        self.rows += rows
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        seconds = time.perf_counter() - self.started if self.started else 0.0
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else None
+
+        return {
+            "uptime_seconds": seconds,
+            "requests": self.requests,
+            "errors": self.errors,
+            "rows": self.rows,
+            "batches": self.batches,
+            "mean_batch_rows": self.rows / self.batches if self.batches else 0.0,
+            "rows_per_second": self.rows / seconds if seconds else 0.0,
+            "latency_p50_seconds": percentile(0.50),
+            "latency_p99_seconds": percentile(0.99),
+            "workers": self.workers,
+        }
+
+    # -- HTTP ------------------------------------------------------------
+    async def handle(self, reader, writer):
+        self.connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "bad request line"}, close=True)
+                    break
+                headers = await self.read_headers(reader)
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() != "HTTP/1.0")
+                try:
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY:
+                        keep_alive = False  # the unread body would be taken for the next request
+                        raise HTTPError(413, "request body too large")
+                    body = await reader.readexactly(length) if length else b""
+                    status, reply = 200, await self.route(method, path, body)
+                except HTTPError as e:
+                    status, reply = e.status, {"error": str(e)}
+                except (ValueError, KeyError) as e:
+                    status, reply = 400, {"error": str(e)}
+                except Exception as e:  # e.g. a batch that failed to compute
+                    status, reply = 500, {"error": f"{type(e).__name__}: {e}"}
+                if status != 200:
+                    self.errors += 1
+                await self.respond(writer, status, reply, close=not keep_alive)
+                if path != "/stats":
+                    self.requests += 1
+                    self.latencies.append(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def read_headers(reader):
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def route(self, method, path, body):
+        if method == "GET" and path == "/stats":
+            return self.stats()
+        if method != "POST":
+            raise HTTPError(405, f"{method} not allowed")
+        data = json.loads(body or b"null")
+        if path in ("/atterberg", "/gravity"):
+            kind, rows = path[1:], data
+        elif path == "/":
+            rows = data.get("rows", []) if isinstance(data, dict) else data
+            kind = data.get("kind") if isinstance(data, dict) else None
+            if kind is not None and not isinstance(kind, str):
+                raise ValueError("kind must be a string")
+        else:
+            raise HTTPError(404, f"no such endpoint {path}")
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("expected a JSON list of row objects")
+        kind = kind or ("gravity" if rows and "M1" in rows[0] else "atterberg")
+        results = await self.submit(kind, rows)
+        return {"kind": kind, "results": [{key: cli.json_value(value) for key, value in row.items()}
+                                          for row in results]}
+
+    @staticmethod
+    async def respond(writer, status, reply, close=False):
+        body = json.dumps(reply).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                  413: "Payload Too Large", 500: "Internal Server Error"}.get(status, "Error")
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: {'close' if close else 'keep-alive'}"
+                     f"\r\n\r\n".encode() + body)
+        await writer.drain()
+
+
+class ServiceThread(threading.Thread):
+    """
+    Run an IngestService on its own event loop in a daemon thread.
+    Results are queued for the Tk thread: call poll(widget, handlers) once
+    and it dispatches them with after(), handlers being {kind: callback}.
+    """
+
+    def __init__(self, **options):
+        super().__init__(daemon=True)
+        self.results = queue.Queue()
+        self.service = IngestService(on_results=lambda kind, rows: self.results.put((kind, rows)), **options)
+        self.loop = None
+        self.ready = threading.Event()
+        self.error = None
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self.service.start())
+        except OSError as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+        self.loop.run_forever()
+        self.loop.run_until_complete(self.service.stop())
+        self.loop.close()
+
+    def start(self):
+        """
+        Start and wait until the server listens; raises OSError if it
+        cannot (e.g. the port is taken).
+        """
+        super().start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def stop(self):
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def poll(self, widget, handlers):
+        while True:
+            try:
+                kind, rows = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind in handlers:
+                handlers[kind](rows)
+        if self.is_alive():
+            widget.after(POLL_MS, self.poll, widget, handlers)
+
+
+class ServiceHub:
+    """
+    One ServiceThread for all the frames of an app, so they do not fight
+    over the port: subscribe(widget, kind, handler) starts it for the
+    first frame, later frames add their handler, and it stops when the
+    last one unsubscribes.
+    """
+
+    def __init__(self, **options):
+        self.options = options
+        self.thread = None
+        self.handlers = {}
+
+    def subscribe(self, widget, kind, handler):
+        """
+        Route results of kind to handler; returns the running ServiceThread
+        (raises OSError if it cannot start).
+        """
+        if self.thread is None:
+            self.thread = ServiceThread(**self.options).start()
+            self.thread.poll(widget, self.handlers)
+        self.handlers[kind] = handler
+        return self.thread
+
+    def unsubscribe(self, kind):
+        self.handlers.pop(kind, None)
+        if not self.handlers and self.thread is not None:
+            self.thread.stop()
+            self.thread = None
+
+
+def shared(controller):
+    """
+    The ServiceHub of an app, kept on its controller.
+    """
+    hub = getattr(controller, "service_hub", None)
+    if hub is None:
+        hub = controller.service_hub = ServiceHub()
+    return hub
+
+
+async def serve(options):
+    service = await IngestService(**options).start()
+    print(f"Listening on http://{service.host}:{service.port} "
+          f"({service.workers or 'in-process'} workers)", file=sys.stderr)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.stop()
+        print(json.dumps(service.stats(), indent=2), file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="worker processes (default 0: compute on a thread of this process)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="most rows per micro-batch")
+    parser.add_argument("--max-wait", type=float, default=MAX_WAIT * 1000,
+                        help="milliseconds to wait for a micro-batch to fill")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve({"host": args.host, "port": args.port, "workers": args.workers,
+                           "max_batch": args.max_batch, "max_wait": args.max_wait / 1000}))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
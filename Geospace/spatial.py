@@ -0,0 +1,88 @@
+"""
+Uniform-grid spatial index for nearest-point lookups on 2-D charts.
+
+Points are bucketed into square cells once (one argsort); a query only
+looks at the cells in rings around the query point, so hover lookups
+stay fast with hundreds of thousands of points.
+"""
+import numpy as np
+
+
+class GridIndex:
+    """
+    Nearest-neighbour index over (x, y) points.  NaN points are ignored.
+    """
+
+    def __init__(self, x, y, cell=None, points_per_cell=4):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        ids = np.flatnonzero(np.isfinite(self.x) & np.isfinite(self.y))
+
+        if cell is None:
+            if len(ids):
+                area = max(np.ptp(self.x[ids]), 1.0) * max(np.ptp(self.y[ids]), 1.0)
+                cell = np.sqrt(area * points_per_cell / len(ids))
+            else:
+                cell = 1.0
+        self.cell = float(cell)
+        self.bounds = ((self.x[ids].min(), self.x[ids].max(), self.y[ids].min(), self.y[ids].max())
+                       if len(ids) else (0.0, 0.0, 0.0, 0.0))
+
+        cx, cy = self._cells(self.x[ids], self.y[ids])
+        keys = self._key(cx, cy)
+        order = np.argsort(keys, kind="stable")
+        self.ids = ids[order]
+        self.keys, self.starts = np.unique(keys[order], return_index=True)
+        self.ends = np.append(self.starts[1:], len(self.ids))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _cells(self, x, y):
+        return (np.floor(np.asarray(x) / self.cell).astype(np.int64),
+                np.floor(np.asarray(y) / self.cell).astype(np.int64))
+
+    @staticmethod
+    def _key(cx, cy):
+        # interleave signed cell coordinates into one sortable int64
+        return (np.asarray(cx, dtype=np.int64) << 32) + (np.asarray(cy, dtype=np.int64) & 0xFFFFFFFF)
+
+    def _members(self, cx, cy):
+        keys = self._key(cx, cy)
+        pos = np.searchsorted(self.keys, keys)
+        pos = pos[(pos < len(self.keys)) & (self.keys[np.minimum(pos, len(self.keys) - 1)] == keys)]
+        if not len(pos):
+            return self.ids[:0]
+        return np.concatenate([self.ids[s:e] for s, e in zip(self.starts[pos], self.ends[pos])])
+
+    def nearest(self, x, y, max_distance=np.inf):
+        """
+        Index of the point nearest to (x, y) within max_distance, or None.
+        """
+        if not len(self.ids):
+            return None
+        qx, qy = self._cells(x, y)
+        qx, qy = int(qx), int(qy)
+        xmin, xmax, ymin, ymax = self.bounds
+        reach = max(abs(x - xmin), abs(x - xmax), abs(y - ymin), abs(y - ymax))
+        max_ring = int(np.ceil(min(max_distance, reach) / self.cell)) + 1
+
+        best, best_distance = None, max_distance
+        for ring in range(max_ring + 1):
+            # every point in this ring is at least (ring - 1) cells away
+            if (ring - 1) * self.cell > best_distance:
+                break
+            if ring == 0:
+                cx, cy = np.array([qx]), np.array([qy])
+            else:
+                side = np.arange(-ring, ring + 1)
+                cx = np.concatenate([side, side, np.full(2 * ring - 1, -ring), np.full(2 * ring - 1, ring)]) + qx
+                cy = np.concatenate([np.full(2 * ring + 1, -ring), np.full(2 * ring + 1, ring),
+                                     side[1:-1], side[1:-1]]) + qy
+            candidates = self._members(cx, cy)
+            if len(candidates):
+                distance = np.hypot(self.x[candidates] - x, self.y[candidates] - y)
+                i = int(np.argmin(distance))
+                if distance[i] <= best_distance:
+                    best, best_distance = int(candidates[i]), float(distance[i])
+        return best
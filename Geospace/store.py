@@ -0,0 +1,324 @@
+"""
+SQLite project store.
+
+One file holds any number of projects; each project has its details
+(controller.shared_data), its borings and its samples with their test
+results.  Samples are indexed on (project, boring, depth), so opening a
+project or filtering it by boring only reads the rows asked for, and
+inserts go in as one executemany per transaction.
+
+    with ProjectStore("site.sqlite") as store:
+        project = store.project("Padma Bridge", {"Client": "..."})
+        store.add_samples(project, columns)
+        store.page(project, 0, 50, boring="B1")
+"""
+import sqlite3
+
+import numpy as np
+
+from samples import TEXT, SAMPLE_COLUMNS, SampleStore
+
+INSERT_BATCH = 4096
+FETCH_BATCH = 4096
+
+# Sample key -> SQL column; "Boring No" is stored as a boring_id
+SAMPLE_FIELDS = {
+    "Sample No": "sample_no",
+    "Sample Depth": "depth",
+    "Soil Description": "description",
+    "Observed Temperature": "temperature",
+    "M1": "m1",
+    "M4": "m4",
+    "Pycnometer Capacity": "capacity",
+    "M2": "m2",
+    "M3": "m3",
+    "GTX": "gtx",
+    "G20": "g20",
+    "Valid": "valid",
+    "LL": "ll",
+    "PL": "pl",
+    "PI": "pi",
+    "Class Code": "class_code",
+    "Soil Type": "soil_type",
+}
+TEXT_FIELDS = {"Sample No", "Soil Description", "Soil Type"}
+# Pseudo key selecting the samples' row ids (see load and save_samples)
+ROW_ID = "Row Id"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS project_fields (
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    field TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (project_id, field)
+);
+CREATE TABLE IF NOT EXISTS borings (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    UNIQUE (project_id, name)
+);
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    boring_id INTEGER NOT NULL REFERENCES borings(id) ON DELETE CASCADE,
+    sample_no TEXT,
+    depth REAL,
+    description TEXT,
+    temperature REAL,
+    m1 REAL,
+    m4 REAL,
+    capacity REAL,
+    m2 REAL,
+    m3 REAL,
+    gtx REAL,
+    g20 REAL,
+    valid INTEGER,
+    ll REAL,
+    pl REAL,
+    pi REAL,
+    class_code INTEGER,
+    soil_type TEXT
+);
+CREATE INDEX IF NOT EXISTS samples_location ON samples (project_id, boring_id, depth);
+"""
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _values(key, values):
+    """
+    One column as SQL parameters: NULL for blanks and NaN, numbers as
+    float, text as str.
+    """
+    if key in TEXT_FIELDS:
+        return [None if value is None or value == "" else str(value) for value in values]
+    try:
+        numbers = np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        numbers = np.array([_number(value) for value in values], dtype=float)
+    return [None if number != number else number for number in numbers.tolist()]
+
+
+class ProjectStore:
+    """
+    Connection to a project file.  Projects are addressed by id; use
+    project(name) to create or look one up.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- projects --------------------------------------------------------
+    def project(self, name, fields=None):
+        """
+        Id of the named project, created if needed; fields (e.g. the
+        values of controller.shared_data) are saved with it.
+        """
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO projects (name) VALUES (?)", (name,))
+            project_id = self.db.execute("SELECT id FROM projects WHERE name = ?", (name,)).fetchone()[0]
+            if fields:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO project_fields (project_id, field, value) VALUES (?, ?, ?)",
+                    [(project_id, field, str(value)) for field, value in fields.items()])
+        return project_id
+
+    def projects(self):
+        return [name for name, in self.db.execute("SELECT name FROM projects ORDER BY name")]
+
+    def project_fields(self, project_id):
+        return dict(self.db.execute("SELECT field, value FROM project_fields WHERE project_id = ?",
+                                    (project_id,)))
+
+    # -- borings ---------------------------------------------------------
+    def borings(self, project_id):
+        """
+        {boring name: sample count}, in boring order.
+        """
+        return dict(self.db.execute(
+            "SELECT b.name, COUNT(s.id) FROM borings b LEFT JOIN samples s ON s.boring_id = b.id "
+            "WHERE b.project_id = ? GROUP BY b.id ORDER BY b.id", (project_id,)))
+
+    def boring_ids(self, project_id, names):
+        """
+        {name: boring id} for the given names, adding the new ones.  Call
+        inside a transaction.
+        """
+        names = list(dict.fromkeys("" if name is None else str(name) for name in names))
+        self.db.executemany("INSERT OR IGNORE INTO borings (project_id, name) VALUES (?, ?)",
+                            [(project_id, name) for name in names])
+        ids = dict(self.db.execute("SELECT name, id FROM borings WHERE project_id = ?", (project_id,)))
+        return {name: ids[name] for name in names}
+
+    def _boring_filter(self, project_id, boring):
+        # WHERE clause on samples s for one project, or one of its borings
+        if boring is None:
+            return "s.project_id = ?", (project_id,)
+        row = self.db.execute("SELECT id FROM borings WHERE project_id = ? AND name = ?",
+                              (project_id, str(boring))).fetchone()
+        return "s.project_id = ? AND s.boring_id = ?", (project_id, row[0] if row else -1)
+
+    # -- samples ---------------------------------------------------------
+    def add_samples(self, project_id, columns):
+        """
+        Insert samples from a dict of equal-length columns keyed like
+        SampleStore (extra keys such as "Class Code" and "Soil Type" are
+        stored, unknown ones ignored), in one transaction.  Returns the
+        number of samples added.
+        """
+        with self.db:
+            self.db.executemany(*self._sample_rows(project_id, columns, "INSERT"))
+        return len(next(iter(columns.values()), ()))
+
+    def _sample_rows(self, project_id, columns, statement, ids=None):
+        # (sql, parameters) inserting the samples, or updating the rows ids
+        count = len(next(iter(columns.values()), ()))
+        keys = [key for key in SAMPLE_FIELDS if key in columns]
+        borings = columns.get("Boring No", [""] * count)
+        boring_ids = self.boring_ids(project_id, borings)
+        values = [[project_id] * count, [boring_ids["" if b is None else str(b)] for b in borings],
+                  *(_values(key, columns[key]) for key in keys)]
+        if statement == "INSERT":
+            return (f"INSERT INTO samples (project_id, boring_id, {', '.join(SAMPLE_FIELDS[k] for k in keys)}) "
+                    f"VALUES (?, ?{', ?' * len(keys)})"), zip(*values)
+        return (f"UPDATE samples SET project_id = ?, boring_id = ?, "
+                f"{', '.join(f'{SAMPLE_FIELDS[k]} = ?' for k in keys)} WHERE id = ?"), zip(*values, ids)
+
+    def add_rows(self, project_id, rows, batch_size=INSERT_BATCH):
+        """
+        Insert result rows (dicts, e.g. from importer.process) in batches;
+        returns the number of rows added.
+        """
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                count += self.add_samples(project_id, _columns(batch))
+                batch = []
+        if batch:
+            count += self.add_samples(project_id, _columns(batch))
+        return count
+
+    def save_samples(self, project_id, samples, ids=()):
+        """
+        Write a SampleStore back to the project in one transaction.
+        samples[:len(ids)] are the rows loaded with those ids (see load)
+        and are updated in place, only in the SampleStore's columns, so
+        results it does not hold (e.g. the soil type) are kept; the other
+        samples are inserted.  No other rows are touched.  Returns the ids
+        of all the samples.
+        """
+        columns = {key: (samples.text(key) if samples.columns[key] is TEXT else samples.column(key))
+                   for key in samples.columns}
+        loaded = len(ids)
+        ids = [int(i) for i in ids]
+        with self.db:
+            if loaded:
+                self.db.executemany(*self._sample_rows(
+                    project_id, {key: values[:loaded] for key, values in columns.items()}, "UPDATE", ids))
+            if len(samples) > loaded:
+                sql, rows = self._sample_rows(
+                    project_id, {key: values[loaded:] for key, values in columns.items()}, "INSERT")
+                added = self.db.executemany(sql, rows).rowcount
+                # new rows get ids above every existing one, and the
+                # transaction keeps other writers out, so the newest ids are ours
+                ids.extend(reversed([row[0] for row in self.db.execute(
+                    "SELECT id FROM samples ORDER BY id DESC LIMIT ?", (added,))]))
+        return ids
+
+    def count(self, project_id, boring=None):
+        where, params = self._boring_filter(project_id, boring)
+        return self.db.execute(f"SELECT COUNT(*) FROM samples s WHERE {where}", params).fetchone()[0]
+
+    def _select(self, keys, where, suffix=""):
+        fields = ", ".join("b.name" if key == "Boring No" else "s.id" if key == ROW_ID
+                           else f"s.{SAMPLE_FIELDS[key]}" for key in keys)
+        return (f"SELECT {fields} FROM samples s JOIN borings b ON b.id = s.boring_id "
+                f"WHERE {where} ORDER BY s.project_id, s.boring_id, s.depth, s.id{suffix}")
+
+    def page(self, project_id, offset, limit, boring=None, keys=None):
+        """
+        Samples offset..offset+limit in (boring, depth) order, as dicts.
+        """
+        keys = list(keys or ["Boring No", *SAMPLE_FIELDS])
+        where, params = self._boring_filter(project_id, boring)
+        rows = self.db.execute(self._select(keys, where, " LIMIT ? OFFSET ?"), (*params, limit, offset))
+        return [dict(zip(keys, row)) for row in rows]
+
+    def columns(self, project_id, keys, boring=None):
+        """
+        {key: array} of the selected samples; numbers are float arrays
+        (NaN for NULL), text columns object arrays.
+        """
+        where, params = self._boring_filter(project_id, boring)
+        return _arrays(keys, self.db.execute(self._select(keys, where), params).fetchall())
+
+    def iter_columns(self, project_id, keys, boring=None, size=FETCH_BATCH):
+        """
+        The same columns size samples at a time, from one cursor, so an
+        export of a whole project never holds more than one chunk.
+        """
+        where, params = self._boring_filter(project_id, boring)
+        cursor = self.db.execute(self._select(keys, where), params)
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                return
+            yield _arrays(keys, rows)
+
+    def load(self, project_id, boring=None):
+        """
+        (SampleStore, row ids) of the project's samples (or one boring's);
+        pass the ids to save_samples to write the samples back.
+        """
+        columns = self.columns(project_id, [*SAMPLE_COLUMNS, ROW_ID], boring)
+        ids = columns.pop(ROW_ID).astype(np.int64)
+        samples = SampleStore(capacity=max(64, len(ids)))
+        if len(ids):
+            columns["Valid"] = np.nan_to_num(columns["Valid"]).astype(bool)
+            samples.extend(columns)
+        return samples, ids
+
+    def load_samples(self, project_id, boring=None):
+        """
+        The project's samples (or one boring's) as a SampleStore.
+        """
+        return self.load(project_id, boring)[0]
+
+
+def _arrays(keys, rows):
+    columns = list(zip(*rows)) if rows else [()] * len(keys)
+    return {key: (np.array(["" if v is None else v for v in values], dtype=object)
+                  if key == "Boring No" or key in TEXT_FIELDS
+                  else np.array(values, dtype=float).reshape(len(values)))
+            for key, values in zip(keys, columns)}
+
+
+def _columns(rows):
+    keys = ["Boring No", *(key for key in SAMPLE_FIELDS if key in rows[0])]
+    return {key: [row.get(key) for row in rows] for key in keys}
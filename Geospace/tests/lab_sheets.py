@@ -0,0 +1,29 @@
+"""
+Lab-sheet rows and files for the tests.
+"""
+import csv
+
+
+def sheet_row(sample, **cells):
+    row = {"Boring No": "B1", "Sample No": sample, "Sample Depth": "1.5"}
+    for can, (moist, blows) in enumerate([(40.0, 32), (41.0, 24), (42.0, 16)], start=1):
+        row.update({f"LL{can} Can": str(can), f"LL{can} Clean": "10", f"LL{can} Moist": str(moist),
+                    f"LL{can} Dry": "30", f"LL{can} Blows": str(blows)})
+    for can in (1, 2):
+        row.update({f"PL{can} Can": str(can), f"PL{can} Clean": "10", f"PL{can} Moist": "14",
+                    f"PL{can} Dry": "13.2"})
+    row.update(cells)
+    return row
+
+
+def gravity_row(sample, m1="100"):
+    return {"Boring No": "B1", "Sample No": sample, "Sample Depth": "2", "Soil Description": "",
+            "Observed Temperature": "20", "M1": m1, "M4": "620", "Pycnometer Capacity": "500"}
+
+
+def write_sheet(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pytest
+
+import limits
+from archive import ArchiveError, ResultArchive
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ResultArchive(str(tmp_path / "history.gsa"))
+
+
+def test_append_and_read_back(archive):
+    archive.append({"Boring No": ["B1", "Bথ"], "Sample Depth": [1.5, ""], "LL": [45, 60], "PI": [20, ""]})
+    columns = ResultArchive(archive.path).columns()
+    assert [b.decode("utf-8") for b in columns["Boring No"]] == ["B1", "Bথ"]
+    assert columns["Sample Depth"][0] == 1.5 and np.isnan(columns["Sample Depth"][1])
+    assert list(columns["Class Code"]) == [limits.classify(45, 20)[0], -1]
+
+
+def test_long_boring_ids_are_rejected(archive):
+    with pytest.raises(ArchiveError):
+        archive.append({"Boring No": ["B1", "থ" * 8], "LL": [40, 40], "PI": [10, 10]})
+    assert len(archive) == 0
+    archive.append({"Boring No": ["x" * 23]})
+    assert archive.columns()["Boring No"][0] == b"x" * 23
+
+
+def test_readonly_open_leaves_the_file_alone(archive):
+    archive.append({"Boring No": ["B1"], "LL": [40]})
+    with open(archive.path, "ab") as f:
+        f.write(b"\0" * 10)  # an append cut short
+    size = os.path.getsize(archive.path)
+
+    viewer = ResultArchive(archive.path, readonly=True)
+    assert len(viewer) == 1 and viewer.columns()["LL"][0] == 40
+    assert os.path.getsize(archive.path) == size
+    with pytest.raises(ArchiveError):
+        viewer.append({"LL": [50]})
+    with pytest.raises(OSError):
+        ResultArchive(archive.path + ".missing", readonly=True)
+
+
+def test_append_drops_a_partial_record(archive):
+    archive.append({"LL": [40]})
+    with open(archive.path, "ab") as f:
+        f.write(b"\0" * 10)
+    ResultArchive(archive.path).append({"LL": [50]})
+    assert list(archive.columns()["LL"]) == [40, 50]
@@ -0,0 +1,70 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+
+import archive
+import aterbag
+import limits
+from benchmarks import suite
+
+
+def live_frame():
+    frame = suite.make_aterbag(None)
+    frame.live_values = {"liquid": np.full((len(frame.liquid_entries), 4), np.nan),
+                         "plastic": np.full((len(frame.plastic_entries), 3), np.nan)}
+    frame.live_mc = {"liquid": np.full(len(frame.liquid_entries), np.nan),
+                     "plastic": np.full(len(frame.plastic_entries), np.nan)}
+    frame.live_dirty = {("liquid", row) for row in range(len(frame.liquid_entries))}
+    frame.live_dirty |= {("plastic", row) for row in range(len(frame.plastic_entries))}
+    return frame
+
+
+def set_cell(entry, value):
+    entry.delete(0, "end")
+    entry.insert(0, value)
+
+
+def test_live_update_leaves_out_invalid_cans():
+    frame = live_frame()
+    set_cell(frame.liquid_entries[2][3], "50")  # dry above moist
+    set_cell(frame.liquid_entries[2][4], "28")
+    frame.live_update()
+
+    clean, moist, dry, blows = (np.array([[10.0, 10.0]]), np.array([[40.0, 42.0]]),
+                                np.array([[32.0, 33.0]]), np.array([[30.0, 22.0]]))
+    expected = limits.liquid_limit(blows, limits.moisture_content(clean, moist, dry)[0])[0]
+    assert frame.liquid_limit == expected
+    assert list(frame.ll_chart.line.get_xdata()) == [22, 30]
+
+
+def test_archive_results_needs_a_sample(tmp_path):
+    frame = suite.make_aterbag(None)
+    frame.archive = archive.ResultArchive(str(tmp_path / "history.gsa"))
+    frame.archived = {}
+    results = {"LL": 40, "PL": 20, "PI": 20}
+
+    frame.archive_results(results)
+    assert len(frame.archive) == 0 and "Not archived" in frame.results_label.text
+
+    set_cell(frame.sample_entries["Boring No"], "B1")
+    set_cell(frame.sample_entries["Sample No"], "3")
+    set_cell(frame.sample_entries["Sample Depth"], "4.5")
+    frame.archive_results(results)
+    frame.archive_results(results)
+    columns = frame.archive.columns()
+    assert len(frame.archive) == 1
+    assert columns["Boring No"][0] == b"B1" and columns["Sample Depth"][0] == 4.5
+
+
+def test_project_chart_reports_a_bad_archive(tmp_path, monkeypatch):
+    path = tmp_path / "history.gsa"
+    path.write_bytes(b"not an archive")
+    frame = suite.make_aterbag(None)
+    frame.project_store = None
+    monkeypatch.setattr(aterbag.filedialog, "askopenfilename", lambda **kwargs: str(path))
+
+    frame.open_project_chart()
+    assert "not a version" in frame.results_label.text
+    assert path.read_bytes() == b"not an archive"
@@ -0,0 +1,56 @@
+import types
+
+import pytest
+
+import bm
+from benchmarks import suite
+
+
+def test_find_sample_returns_latest_match():
+    app = suite.make_app(None)
+    for boring, sample in [("B1", "1"), ("B1", "2"), ("B2", "1"), ("B1", "1")]:
+        app.samples.append({"Boring No": boring, "Sample No": sample})
+
+    assert app.find_sample("B1", "1") == 3
+    assert app.find_sample("B2", "1") == 2
+    assert app.find_sample("B2", "2") is None
+    assert app.find_sample("B3", "1") is None
+
+
+class StubCombo(dict):
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+@pytest.fixture
+def scratch_app(monkeypatch, tmp_path):
+    app = suite.make_app(None)
+    app.root = types.SimpleNamespace(title=lambda text: None)
+    app.cmb_boring = StubCombo()
+    app.project_store = None
+    app.project_dirty = True
+    app.samples.append({"Boring No": "B1", "Sample No": "1"})
+    monkeypatch.setattr(bm.filedialog, "asksaveasfilename", lambda **kwargs: str(tmp_path / "site.sqlite"))
+    yield app
+    if app.project_store is not None:
+        app.project_store.close()
+
+
+@pytest.mark.parametrize("answer, saved", [(False, 0), (True, 1)])
+def test_open_project_writes_scratch_samples_only_when_asked(scratch_app, monkeypatch, answer, saved):
+    monkeypatch.setattr(bm.messagebox, "askyesnocancel", lambda *args: answer)
+    scratch_app.open_project()
+
+    assert scratch_app.project_store.count(scratch_app.project_id) == saved
+    assert len(scratch_app.samples) == saved
+
+
+def test_open_project_cancelled(scratch_app, monkeypatch):
+    monkeypatch.setattr(bm.messagebox, "askyesnocancel", lambda *args: None)
+    scratch_app.open_project()
+
+    assert scratch_app.project_store is None
+    assert len(scratch_app.samples) == 1
@@ -0,0 +1,41 @@
+import gc
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+from matplotlib.figure import Figure
+
+import charts
+import limits
+from benchmarks import suite
+
+
+def figures():
+    gc.collect()
+    return sum(isinstance(obj, Figure) for obj in gc.get_objects())
+
+
+def test_recalculating_adds_no_figures():
+    frame = suite.make_aterbag(None)
+    blows, mc = np.array([15, 22, 30]), np.array([40.0, 39.13, 36.36])
+    frame.calculate_liquid_limit()
+    frame.classify_soil()
+    before = figures()
+    for i in range(20):
+        frame.plot_liquid_limit_graph(blows, mc + i % 3, 38)
+        frame.plot_casagrande_chart(38 + i % 5, 16, limits.classify_soil_type(38 + i % 5, 16))
+        frame.calculate_liquid_limit()
+        frame.classify_soil()
+    assert figures() == before
+
+
+def test_updates_move_the_data_artists():
+    ll_chart = charts.LiquidLimitChart()
+    ll_chart.update([15, 22, 30], [40, 39, 36])
+    assert list(ll_chart.line.get_xdata()) == [15, 22, 30]
+    casagrande = charts.CasagrandeChart()
+    assert casagrande.update(38, 16, "CL") is True
+    assert casagrande.update(40, 18, "CL") is False  # same legend: the background stays valid
+    assert casagrande.point.get_offsets().tolist() == [[40, 18]]
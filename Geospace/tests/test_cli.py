@@ -0,0 +1,61 @@
+import csv
+import json
+
+import pytest
+
+import cli
+from lab_sheets import gravity_row, sheet_row, write_sheet
+
+
+@pytest.fixture
+def sheet(tmp_path):
+    return write_sheet(tmp_path / "sheet.csv", [sheet_row(str(i)) for i in range(7)])
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_csv_out(sheet, tmp_path):
+    assert cli.main([sheet, "-o", str(tmp_path / "out.csv"), "--batch-size", "3"]) == 0
+    rows = read_csv(tmp_path / "out.csv")
+    assert [row["Sample No"] for row in rows] == [str(i) for i in range(7)]
+    assert {row["LL"] for row in rows} == {"54"}
+
+
+def test_json_to_stdout(sheet, capsys):
+    cli.main([sheet, "--format", "json"])
+    rows = json.loads(capsys.readouterr().out)
+    assert len(rows) == 7 and rows[0]["PI"] == 29
+
+
+def test_workers_keep_input_order(sheet, tmp_path):
+    cli.main([sheet, "-o", str(tmp_path / "serial.csv"), "--batch-size", "2"])
+    cli.main([sheet, "-o", str(tmp_path / "parallel.csv"), "--batch-size", "2", "--workers", "2"])
+    assert read_csv(tmp_path / "serial.csv") == read_csv(tmp_path / "parallel.csv")
+
+
+def test_gravity_sheet(tmp_path):
+    sheet = write_sheet(tmp_path / "pycnometer.csv", [gravity_row("1"), gravity_row("2", m1="x")])
+    cli.main([sheet, "-o", str(tmp_path / "out.csv")])
+    good, bad = read_csv(tmp_path / "out.csv")
+    assert good["Error"] == "" and bad["Error"] == "M1: not a number"
+    with pytest.raises(SystemExit):
+        cli.main([sheet, "--charts", str(tmp_path / "pages")])
+
+
+@pytest.mark.parametrize("chart_format", ["png", "pdf"])
+def test_charts(tmp_path, capsys, chart_format):
+    rows = [sheet_row("1"), sheet_row("1"), sheet_row("2", **{"PL1 Can": "", "PL2 Can": ""})]
+    sheet = write_sheet(tmp_path / "sheet.csv", rows)
+    pages = tmp_path / "pages"
+    cli.main([sheet, "-o", str(tmp_path / "out.csv"), "--charts", str(pages), "--chart-format", chart_format])
+    assert sorted(path.name for path in pages.iterdir()) == [f"000001_B1-1.{chart_format}",
+                                                             f"000002_B1-1.{chart_format}"]
+    assert f"charts: 2 {chart_format} pages" in capsys.readouterr().err
+
+
+def test_report_needs_out(sheet):
+    with pytest.raises(SystemExit):
+        cli.main([sheet, "--format", "report"])
@@ -0,0 +1,102 @@
+import gc
+import json
+import threading
+import time
+
+import pytest
+
+import diagnostics
+
+
+@diagnostics.instrument
+def work(size=0, seconds=0.0):
+    data = bytearray(size)
+    time.sleep(seconds)
+    return len(data)
+
+
+@diagnostics.instrument
+def outer():
+    return work(1000) + work(1000)
+
+
+@diagnostics.instrument
+def burst(size, seconds):
+    # allocate and free, then keep running: only the peak remembers the burst
+    bytearray(size)
+    time.sleep(seconds)
+
+
+@pytest.fixture(autouse=True)
+def fresh():
+    diagnostics.reset()
+    yield
+    diagnostics.disable()
+    diagnostics.reset()
+
+
+def stats(name):
+    return diagnostics.snapshot()["functions"][f"{__name__}.{name}"]
+
+
+def test_disabled_records_nothing():
+    assert work(10) == 10
+    assert diagnostics.snapshot()["functions"] == {}
+
+
+def test_calls_and_times():
+    diagnostics.enable()
+    work(seconds=0.01)
+    outer()
+    work_stats = stats("work")
+    assert work_stats["calls"] == 3 and stats("outer")["calls"] == 1
+    assert work_stats["max_seconds"] >= 0.01 and work_stats["seconds"] >= work_stats["max_seconds"]
+    assert work_stats["allocated_bytes"] == 0  # allocations only with allocations=True
+
+
+def test_allocations():
+    diagnostics.enable(allocations=True)
+    work(1 << 20)
+    assert stats("work")["peak_bytes"] >= 1 << 20
+
+
+def test_threads_do_not_reset_each_others_peak():
+    diagnostics.enable(allocations=True)
+    started = threading.Event()
+
+    def background():
+        started.set()
+        burst(8 << 20, 0.2)
+
+    thread = threading.Thread(target=background)
+    thread.start()
+    started.wait()
+    time.sleep(0.05)
+    work(10)  # would reset the process-wide peak in the middle of burst
+    thread.join()
+    assert stats("burst")["peak_bytes"] >= 8 << 20
+
+
+def test_figure_count_follows_live_figures():
+    from matplotlib.figure import Figure
+
+    gc.collect()
+    before = diagnostics.figure_count()
+    figure = Figure()
+    diagnostics.track_figure(figure)
+    diagnostics.track_figure(figure)
+    assert diagnostics.figure_count() == before + 1
+    del figure
+    gc.collect()  # figures hold reference cycles
+    assert diagnostics.figure_count() == before
+
+
+def test_dump_json_and_profile(tmp_path):
+    diagnostics.enable()
+    diagnostics.start_profile()
+    work()
+    profiler = diagnostics.stop_profile(str(tmp_path / "run.prof"))
+    assert profiler is not None and (tmp_path / "run.prof").exists()
+    assert diagnostics.stop_profile() is None
+    with open(diagnostics.dump_json(str(tmp_path / "stats.json"))) as f:
+        assert f"{__name__}.work" in json.load(f)["functions"]
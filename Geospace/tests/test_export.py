@@ -0,0 +1,52 @@
+import csv
+
+import numpy as np
+import pytest
+
+import export
+from samples import SampleStore
+
+FIELDS = ["Boring No", "Sample Depth", "G20"]
+
+
+@pytest.fixture
+def samples():
+    samples = SampleStore()
+    samples.extend({"Boring No": ["B1", "B1", "B2"], "Sample Depth": np.array([1.0, 2.0, 1.5]),
+                    "G20": np.array([2.65, np.nan, 2.7])})
+    return samples
+
+
+def test_csv(samples, tmp_path):
+    path = str(tmp_path / "out.csv")
+    assert export.export(export.sample_chunks(samples, FIELDS, size=2), path, FIELDS) == 3
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows == [FIELDS, ["B1", "1.0", "2.65"], ["B1", "2.0", ""], ["B2", "1.5", "2.7"]]
+
+
+def test_report_groups_borings(samples, tmp_path):
+    from openpyxl import load_workbook
+
+    path = str(tmp_path / "out.xlsx")
+    count = export.export(export.sample_chunks(samples, FIELDS), path, FIELDS, "report",
+                          title="Results", details={"Client": "Lab"})
+    assert count == 3
+    rows = list(load_workbook(path).active.values)
+    assert rows[0][0] == "Results" and rows[1][:2] == ("Client:", "Lab")
+    assert [row[0] for row in rows[4:]] == ["Boring B1", "B1", "B1", "Boring B2", "B2"]
+    assert rows[5][2] == 2.65 and rows[6][2] is None  # NaN is left blank
+
+
+def test_row_chunks_parse_numbers():
+    chunk, = export.row_chunks([{"Boring No": "B1", "G20": "2.6"}, {"Boring No": "B2", "G20": ""}], FIELDS)
+    assert chunk["Boring No"] == ["B1", "B2"]
+    assert chunk["G20"][0] == 2.6 and np.isnan(chunk["G20"][1]) and np.isnan(chunk["Sample Depth"]).all()
+
+
+@pytest.mark.parametrize("path, filetype, fmt", [
+    ("a.csv", "", "csv"), ("a.xlsx", "Excel workbook", "xlsx"), ("a.xlsx", "Lab report", "report"),
+    ("a.txt", "Lab report", "csv"),
+])
+def test_file_format(path, filetype, fmt):
+    assert export.file_format(path, filetype) == fmt
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+import gravity
+
+
+def test_density_table():
+    assert gravity.density_at_temperature(20) == pytest.approx(gravity.DENSITY_DATA[50])
+    assert np.isnan(gravity.density_at_temperature([14.9, 30.85, 31.0])).all()
+    assert gravity.density_at_temperature(gravity.MAX_TEMPERATURE) == gravity.DENSITY_DATA[-1]
+
+
+def test_to_float():
+    values = gravity.to_float(["1.5", "", None, "12,5", 3])
+    assert values[0] == 1.5 and values[4] == 3 and np.isnan(values[1:4]).all()
+
+
+def test_calculate_gravity():
+    result = gravity.calculate_gravity([100.0, 100.0], [650.0, 650.0], [20.0, 40.0], [500.0, 500.0],
+                                       ["", ""])
+    density = gravity.density_at_temperature(20)
+    m2 = 100 + gravity.DEFAULT_SOIL_MASS
+    m3 = 100 + 500 * density
+    gtx = gravity.DEFAULT_SOIL_MASS / (gravity.DEFAULT_SOIL_MASS + m3 - 650)
+    assert (result.M2[0], result.M3[0]) == (pytest.approx(m2), pytest.approx(m3))
+    assert result.GTX[0] == pytest.approx(gtx) and result.G20[0] == pytest.approx(gtx * density)
+    assert list(result.valid) == [True, False]  # 40°C is off the density table
+
+
+def test_soil_mass_by_description():
+    description, mass = next(iter(gravity.SOIL_MASS.items()))
+    assert list(gravity.soil_mass([f" {description} ", "other"])) == [mass, gravity.DEFAULT_SOIL_MASS]
@@ -0,0 +1,51 @@
+import csv
+
+import importer
+from lab_sheets import gravity_row, sheet_row, write_sheet
+
+
+def test_read_rows_csv_and_excel(tmp_path):
+    from openpyxl import Workbook
+
+    rows = [sheet_row("1"), sheet_row("2")]
+    assert list(importer.read_rows(write_sheet(tmp_path / "sheet.csv", rows))) == rows
+    workbook = Workbook()
+    workbook.active.append(list(rows[0]))
+    workbook.active.append([None if key == "Sample No" else value for key, value in rows[0].items()])
+    workbook.save(tmp_path / "sheet.xlsx")
+    row, = importer.read_rows(str(tmp_path / "sheet.xlsx"))
+    assert row["Sample No"] == "" and row["LL1 Moist"] == "40.0"
+
+
+def test_detect_kind(tmp_path):
+    assert importer.detect_kind(write_sheet(tmp_path / "a.csv", [sheet_row("1")])) == "atterberg"
+    assert importer.detect_kind(write_sheet(tmp_path / "g.csv", [gravity_row("1")])) == "gravity"
+
+
+def test_atterberg_results_leave_out_bad_cans():
+    rows = [
+        sheet_row("1"),
+        sheet_row("2", **{"LL3 Dry": "50"}),  # dry above moist: computed from the other two cans
+        sheet_row("3", **{"PL1 Can": "", "PL2 Can": ""}),
+    ]
+    good, bad_can, no_pl = importer.atterberg_results(rows, batch_size=2)
+    assert (good["LL"], good["PL"], good["PI"], good["Error"]) == (54, 25, 29, "")
+    assert good["Soil Type"] == importer.limits.SOIL_TYPES[good["Class Code"]]
+    assert bad_can["LL"] == 54 and "LL3 Dry" in bad_can["Error"]
+    assert no_pl["LL"] == "" and "plastic limit" in no_pl["Error"]
+
+
+def test_gravity_results_report_typos():
+    good, typo = importer.gravity_results([gravity_row("1"), gravity_row("2", m1="12,5")])
+    assert good["Error"] == "" and 2 < good["G20"] < 3
+    assert typo["Error"] == "M1: not a number" and typo["G20"] != typo["G20"]
+
+
+def test_import_file(tmp_path):
+    path = write_sheet(tmp_path / "sheet.csv", [sheet_row(str(i)) for i in range(5)])
+    seen = []
+    stats = importer.import_file(path, str(tmp_path / "out.csv"), batch_size=2, on_result=seen.append)
+    assert stats["kind"] == "atterberg" and stats["rows"] == len(seen) == 5
+    with open(tmp_path / "out.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == importer.ATTERBERG_RESULTS and rows[4]["LL"] == "54"
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+import limits
+
+
+def test_round_half_up():
+    assert list(limits.round_half_up([54.5, 54.49, 0.5, np.nan])[:3]) == [55, 54, 1]
+    assert np.isnan(limits.round_half_up(np.nan))
+
+
+def test_moisture_content():
+    mc, dry, water = limits.moisture_content([[10, 10]], [[40, 20]], [[30, 10]])
+    assert mc[0, 0] == 50 and dry[0, 0] == 20 and water[0, 0] == 10
+    assert np.isnan(mc[0, 1])  # no dry soil
+
+
+def test_liquid_limit_interpolates_around_25_blows():
+    blows = [[32, 24, 16], [32, np.nan, np.nan]]
+    mc = [[50, 55, 60], [50, np.nan, np.nan]]
+    assert limits.liquid_limit(blows, mc, rounded=False)[0] == pytest.approx(54.375)
+    ll = limits.liquid_limit(blows, mc)
+    assert ll[0] == 54 and np.isnan(ll[1])
+
+
+def test_flow_curve_fits_a_straight_line():
+    blows = np.array([[10.0, 25.0, 40.0]])
+    mc = 60 - 12 * np.log10(blows)
+    curve = limits.flow_curve(blows, mc)
+    assert curve.LL[0] == pytest.approx(60 - 12 * np.log10(25))
+    assert curve.flow_index[0] == pytest.approx(12)
+    assert curve.cans[0] == 3
+
+
+def test_flow_curve_single_can_uses_one_point_method():
+    curve = limits.flow_curve([[20, np.nan]], [[40, np.nan]])
+    assert curve.LL[0] == pytest.approx(40 * (20 / 25) ** limits.ONE_POINT_EXPONENT)
+    assert np.isnan(curve.flow_index[0])
+
+
+def test_plastic_limit_is_lowest_can():
+    pl = limits.plastic_limit([[21.4, 20.6], [np.nan, np.nan]])
+    assert pl[0] == 21 and np.isnan(pl[1])
+
+
+def test_calculate_limits():
+    clean = np.full((1, 3), 10.0)
+    dry = np.full((1, 3), 30.0)
+    moist = np.array([[40.0, 41.0, 42.0]])
+    blows = np.array([[32.0, 24.0, 16.0]])
+    plastic = (np.full((1, 2), 10.0), np.full((1, 2), 14.0), np.full((1, 2), 13.2))
+    result = limits.calculate_limits(clean, moist, dry, blows, *plastic)
+    assert (result.LL[0], result.PL[0], result.PI[0]) == (54, 25, 29)
+    with pytest.raises(ValueError):
+        limits.calculate_limits(clean, moist, dry, blows, *plastic, method="unknown")
+
+
+def test_calculate_limits_flow_curve_method():
+    clean = np.full((1, 3), 10.0)
+    dry = np.full((1, 3), 30.0)
+    moist = np.array([[40.0, 41.0, 42.0]])
+    blows = np.array([[32.0, 24.0, 16.0]])
+    plastic = (np.full((1, 2), 10.0), np.full((1, 2), 14.0), np.full((1, 2), 13.2))
+    result = limits.calculate_limits(clean, moist, dry, blows, *plastic, method="flow_curve")
+    assert result.LL[0] == 54 and result.flow_index[0] > 0
+    assert result.toughness_index[0] == pytest.approx(result.PI[0] / result.flow_index[0])
+
+
+@pytest.mark.parametrize("LL, PI, code", [
+    (25, 5, limits.CL_ML),
+    (40, 20, limits.CL_OL),
+    (40, 5, limits.ML_OL),
+    (60, 35, limits.CH_OH),
+    (60, 20, limits.MH_OH),
+])
+def test_classify(LL, PI, code):
+    codes, labels = limits.classify([LL], [PI])
+    assert codes[0] == code and labels[0] == limits.SOIL_TYPES[code]
+    assert limits.classify_soil_type(LL, PI) == limits.SOIL_TYPES[code]
+
+
+def test_classify_structured_array():
+    records = np.array([(25.0, 5.0), (60.0, 35.0)], dtype=[("LL", float), ("PI", float)])
+    assert list(limits.classify(records)[0]) == [limits.CL_ML, limits.CH_OH]
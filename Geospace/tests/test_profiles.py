@@ -0,0 +1,54 @@
+import numpy as np
+
+import limits
+import profiles
+
+
+def test_summarize_per_boring():
+    boring = ["B2", "B1", "B2", "B1", "B3"]
+    LL = [40.0, 30.0, 60.0, np.nan, np.nan]
+    PI = [20.0, 5.0, 35.0, np.nan, np.nan]
+    summary = profiles.summarize(boring, {"LL": LL}, profiles.class_codes(LL, PI))
+    assert list(summary.borings) == ["B1", "B2", "B3"]
+    assert list(summary.samples) == [2, 2, 1]
+    assert list(summary.count["LL"]) == [1, 2, 0]
+    assert summary.mean["LL"][1] == 50 and summary.minimum["LL"][1] == 40 and summary.maximum["LL"][1] == 60
+    assert np.isnan(summary.mean["LL"][2]) and np.isnan(summary.minimum["LL"][2])
+    assert summary.class_counts[1, limits.CL_OL] == 1 and summary.class_counts[1, limits.CH_OH] == 1
+    assert summary.class_counts[2].sum() == 0
+
+
+def test_summarize_bytes_borings():
+    summary = profiles.summarize(np.array([b"B\xe0\xa6\xa5", b"A"]), {"G20": [2.6, 2.7]})
+    assert list(summary.borings) == ["A", "Bথ"]
+
+
+def test_summarize_nothing():
+    summary = profiles.summarize([], {"LL": []})
+    assert len(summary.borings) == 0 and summary.class_counts.shape == (0, len(limits.SOIL_TYPES))
+
+
+def test_class_codes_marks_missing():
+    assert list(profiles.class_codes([25, np.nan], [5, 5])) == [limits.CL_ML, -1]
+
+
+def test_downsample_keeps_peaks_in_depth_order():
+    depth = np.arange(1000.0)
+    values = np.sin(depth / 10)
+    values[500] = 5.0
+    values[10] = np.nan
+    keep = profiles.downsample(depth, values, max_points=100)
+    assert len(keep) <= 100 and 500 in keep and 10 not in keep
+    assert np.all(np.diff(depth[keep]) > 0)
+    assert list(profiles.downsample([2.0, 1.0], [1.0, 2.0])) == [1, 0]
+
+
+def test_profiles_stay_within_budget():
+    rng = np.random.default_rng(0)
+    boring = np.repeat(["B1", "B2"], 500)
+    depth = rng.uniform(0, 30, 1000)
+    result = profiles.profiles(boring, depth, {"LL": rng.uniform(20, 60, 1000)}, max_points=400, budget=200)
+    assert set(result) == {"B1", "B2"}
+    depths, values = result["B1"]["LL"]
+    assert len(depths) == len(values) <= 100
+    assert np.all(np.diff(depths) >= 0)
@@ -0,0 +1,22 @@
+import os
+
+import importer
+import report
+
+
+def sheet_row(sample):
+    row = {"Boring No": "B1", "Sample No": sample}
+    for can, (moist, blows) in enumerate([(40.0, 32), (41.0, 24), (42.0, 16)], start=1):
+        row.update({f"LL{can} Can": str(can), f"LL{can} Clean": "10", f"LL{can} Moist": str(moist), f"LL{can} Dry": "30",
+                    f"LL{can} Blows": str(blows)})
+    for can in (1, 2):
+        row.update({f"PL{can} Can": str(can), f"PL{can} Clean": "10", f"PL{can} Moist": "14", f"PL{can} Dry": "13.2"})
+    return row
+
+
+def test_page_names_are_unique():
+    names = ["A/1", "A_1", "A 1"]
+    result = importer.calculate_batch([sheet_row(name) for name in names])
+    paths = [task["path"] for task in report.page_tasks(result, names, "pages", first=10)]
+    assert len(set(paths)) == 3
+    assert os.path.basename(paths[0]) == "000011_A_1.png"
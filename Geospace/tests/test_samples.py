@@ -0,0 +1,57 @@
+import numpy as np
+
+import validation
+from samples import SampleStore
+
+GRAVITY_FIELDS = ["M1", "M4", "Observed Temperature", "Pycnometer Capacity"]
+
+
+def gravity_samples(*m1):
+    samples = SampleStore()
+    for value in m1:
+        samples.append({"Boring No": "B1", "M1": value, "M4": "650", "Observed Temperature": "20",
+                        "Pycnometer Capacity": "500"})
+    return samples
+
+
+def test_unparsed_numbers_are_nan_but_kept():
+    samples = gravity_samples("100", "12,5", "")
+    assert np.isnan(samples.column("M1")[1:]).all()
+    raw = samples.raw("M1")
+    assert raw[0] == 100.0 and raw[1] == "12,5" and np.isnan(raw[2])
+    assert samples.raw("M4").dtype == float
+
+
+def test_validation_reports_typos_as_not_numbers():
+    samples = gravity_samples("100", "12,5", "")
+    report = validation.check_gravity({key: samples.raw(key) for key in GRAVITY_FIELDS})
+    codes = {(error.row, error.code) for error in report.errors if error.field == "M1"}
+    assert codes == {(1, validation.NOT_NUMBER), (2, validation.MISSING)}
+
+
+def test_correcting_a_typo_clears_it():
+    samples = gravity_samples("12,5")
+    samples[0]["M1"] = "12.5"
+    assert samples.raw("M1").dtype == float and samples.column("M1")[0] == 12.5
+
+
+def test_slices_keep_the_text_of_their_rows():
+    samples = gravity_samples("1", "x", "2", "y")
+    assert list(samples[1:3].raw("M1")) == ["x", 2.0]
+
+
+def test_extend_parses_text():
+    samples = gravity_samples("1")
+    samples.extend({"Boring No": ["B2", "B2"], "M1": ["2.5", "12,5"], "Valid": [True, False]})
+    raw = samples.raw("M1")
+    assert raw[1] == 2.5 and raw[2] == "12,5" and np.isnan(samples.column("M1")[2])
+    assert list(samples.column("Valid")) == [False, True, False]
+
+
+def test_edits_through_views_reach_the_store():
+    samples = gravity_samples("1", "2", "3", "4")
+    view = samples[1:][::2]  # rows 1 and 3
+    view[1]["M1"] = "x"
+    assert samples.raw("M1")[3] == "x" and list(view.raw("M1")) == [2.0, "x"]
+    view.set_column("M1", [5.0, 6.0])
+    assert list(samples.raw("M1")) == [1.0, 5.0, 3.0, 6.0]
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import types
+
+import pytest
+
+import cli
+import service
+
+
+async def exchange(port, request):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(request)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = await service.IngestService.read_headers(reader)
+    reply = json.loads(await reader.readexactly(int(headers["content-length"])))
+    closed = headers["connection"] == "close" and await reader.read() == b""
+    writer.close()
+    return status, reply, closed
+
+
+def post(path, body, headers=""):
+    return (f"POST {path} HTTP/1.1\r\nHost: localhost\r\n{headers}"
+            f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+def run(*requests):
+    async def main():
+        server = await service.IngestService(port=0).start()
+        try:
+            return [await exchange(server.port, request) for request in requests]
+        finally:
+            await server.stop()
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("body", [b"[1]", b'{"kind": ["x"], "rows": []}', b'{"rows": [null]}', b"null"])
+def test_malformed_bodies_get_400(body):
+    (status, reply, _), = run(post("/", body))
+    assert status == 400 and reply["error"]
+
+
+def test_gravity_rows_are_detected():
+    row = {"M1": "100", "M2": "150", "M3": "680", "M4": "650", "Observed Temperature": "20"}
+    (status, reply, _), = run(post("/", json.dumps([row]).encode()))
+    assert status == 200 and reply["kind"] == "gravity" and len(reply["results"]) == 1
+
+
+def test_failed_batch_gets_500(monkeypatch):
+    def fail(kind, rows):
+        raise TypeError("bad cell")
+
+    monkeypatch.setattr(cli, "run_batch", fail)
+    (status, reply, _), = run(post("/atterberg", b'[{"LL1 Can": "1"}]'))
+    assert status == 500 and "bad cell" in reply["error"]
+
+
+def test_oversized_body_closes_connection(monkeypatch):
+    monkeypatch.setattr(service, "MAX_BODY", 4)
+    (status, _, closed), = run(post("/atterberg", b"[{}, {}]", "Connection: keep-alive\r\n"))
+    assert status == 413 and closed
+
+
+class StubWidget:
+    def after(self, ms, callback, *args):
+        pass
+
+
+def test_frames_share_one_service():
+    controller = types.SimpleNamespace(service_hub=service.ServiceHub(port=0))
+    hub = service.shared(controller)
+    received = []
+    first = hub.subscribe(StubWidget(), "atterberg", lambda rows: received.append(("atterberg", rows)))
+    second = hub.subscribe(StubWidget(), "gravity", lambda rows: received.append(("gravity", rows)))
+    assert hub is controller.service_hub and first is second
+
+    first.results.put(("gravity", [1]))
+    first.results.put(("atterberg", [2]))
+    first.poll(StubWidget(), hub.handlers)
+    assert received == [("gravity", [1]), ("atterberg", [2])]
+
+    hub.unsubscribe("atterberg")
+    assert first.is_alive()
+    hub.unsubscribe("gravity")
+    first.join(5)
+    assert not first.is_alive() and hub.thread is None
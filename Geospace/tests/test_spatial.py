@@ -0,0 +1,20 @@
+import numpy as np
+
+from spatial import GridIndex
+
+
+def test_nearest_matches_brute_force():
+    rng = np.random.default_rng(1)
+    x, y = rng.uniform(0, 100, 2000), rng.uniform(0, 60, 2000)
+    x[::50] = np.nan
+    index = GridIndex(x, y)
+    for qx, qy in rng.uniform(-10, 110, (50, 2)):
+        distance = np.hypot(x - qx, y - qy)
+        assert index.nearest(qx, qy) == np.nanargmin(distance)
+
+
+def test_nearest_within_distance():
+    index = GridIndex([0.0, 10.0], [0.0, 0.0])
+    assert index.nearest(9.0, 0.0, max_distance=2) == 1
+    assert index.nearest(5.0, 5.0, max_distance=2) is None
+    assert GridIndex([np.nan], [np.nan]).nearest(0.0, 0.0) is None
@@ -0,0 +1,90 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from samples import SampleStore
+from store import ProjectStore
+
+
+def sample_columns(borings, depths):
+    return {"Boring No": list(borings), "Sample No": [f"S{i}" for i in range(len(borings))],
+            "Sample Depth": np.asarray(depths, dtype=float), "G20": np.full(len(borings), 2.65)}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ProjectStore(str(tmp_path / "site.sqlite")) as store:
+        yield store
+
+
+@pytest.fixture
+def project(store):
+    project = store.project("Site")
+    store.add_samples(project, sample_columns(["B1", "B1", "B2", "B2", "B2"], [1, 2, 1, 2, 3]))
+    return project
+
+
+def test_load_returns_row_ids(store, project):
+    samples, ids = store.load(project, "B2")
+    assert len(samples) == len(ids) == 3
+    assert list(samples.text("Boring No")) == ["B2"] * 3
+
+
+def test_save_filtered_boring_keeps_other_borings(store, project):
+    samples, ids = store.load(project, "B1")
+    samples.append({"Boring No": "B2", "Sample No": "new", "Sample Depth": 4.0})
+    ids = store.save_samples(project, samples, ids)
+
+    assert len(ids) == 3
+    assert store.borings(project) == {"B1": 2, "B2": 4}
+
+
+def test_save_updates_loaded_rows_in_place(store, project):
+    samples, ids = store.load(project, "B1")
+    samples.set_value("G20", 0, 2.70)
+    samples.set_value("Boring No", 1, "B3")
+    assert store.save_samples(project, samples, ids) == list(ids)
+
+    assert store.borings(project) == {"B1": 1, "B2": 3, "B3": 1}
+    assert store.load_samples(project, "B1").column("G20")[0] == pytest.approx(2.70)
+
+
+def test_save_keeps_columns_the_samples_lack(store, project):
+    store.add_samples(project, {**sample_columns(["B4"], [1]), "Soil Type": ["Clay"], "LL": [40.0]})
+    samples, ids = store.load(project, "B4")
+    samples.set_value("G20", 0, 2.70)
+    store.save_samples(project, samples, ids)
+
+    columns = store.columns(project, ["Soil Type", "LL", "G20"], "B4")
+    assert list(columns["Soil Type"]) == ["Clay"]
+    assert columns["LL"][0] == 40.0 and columns["G20"][0] == pytest.approx(2.70)
+
+
+def test_failed_save_changes_nothing(store, project):
+    samples, ids = store.load(project)
+    samples.append({"Boring No": "B2", "Sample Depth": 5.0})
+    store.db.execute("CREATE TRIGGER fail BEFORE INSERT ON samples BEGIN SELECT RAISE(ABORT, 'disk full'); END")
+    samples.set_value("G20", 0, 1.0)
+    with pytest.raises(sqlite3.DatabaseError):
+        store.save_samples(project, samples, ids)
+
+    assert store.count(project) == 5
+    assert store.load_samples(project).column("G20")[0] == pytest.approx(2.65)
+
+
+def test_save_new_project(store):
+    project = store.project("Empty")
+    samples = SampleStore()
+    samples.extend(sample_columns(["B1", "B2"], [1, 2]))
+    ids = store.save_samples(project, samples)
+    assert len(ids) == 2 and store.count(project) == 2
+
+
+def test_save_returns_ids_of_inserted_rows(store, project):
+    samples, ids = store.load(project, "B1")
+    samples.extend(sample_columns(["B2", "B1", "B3"], [6, 7, 8]))
+    ids = store.save_samples(project, samples, ids)
+
+    names = [store.db.execute("SELECT sample_no FROM samples WHERE id = ?", (i,)).fetchone()[0] for i in ids]
+    assert names == list(samples.text("Sample No"))
@@ -0,0 +1,61 @@
+import numpy as np
+
+import validation
+
+
+def atterberg_fields(rows):
+    fields = {}
+    for row in rows:
+        for key, value in row.items():
+            fields.setdefault(key, []).append(value)
+    return fields
+
+
+def can(prefix, number, clean="10", moist="40", dry="30", blows=None):
+    values = {f"{prefix}{number} Can": str(number), f"{prefix}{number} Clean": clean,
+              f"{prefix}{number} Moist": moist, f"{prefix}{number} Dry": dry}
+    if blows is not None:
+        values[f"{prefix}{number} Blows"] = blows
+    return values
+
+
+def test_parse():
+    numbers, non_numeric = validation.parse(["1.5", "", None, "12,5", 2])
+    assert numbers[0] == 1.5 and numbers[4] == 2 and np.isnan(numbers[1:4]).all()
+    assert list(non_numeric) == [False, False, False, True, False]
+
+
+def test_check_atterberg():
+    good = {**can("LL", 1, blows="30"), **can("LL", 2, blows="20"), **can("PL", 1, moist="14", dry="13")}
+    rows = [
+        good,
+        {**good, **can("LL", 1, moist="20", blows="30")},  # dry above moist
+        {**good, **can("LL", 2, blows="2.5")},
+        {**good, "LL2 Can": ""},  # one liquid limit can left
+        {**good, "PL1 Dry": "x"},
+    ]
+    report = validation.check_atterberg(atterberg_fields(rows), len(rows))
+    codes = {(error.row, error.field, error.code) for error in report.errors}
+    assert codes == {
+        (1, "LL1 Dry", validation.DRY_ABOVE_MOIST),
+        (1, "LL", validation.TOO_FEW_CANS),
+        (2, "LL2 Blows", validation.BAD_BLOWS),
+        (2, "LL", validation.TOO_FEW_CANS),
+        (3, "LL", validation.TOO_FEW_CANS),
+        (4, "PL1 Dry", validation.NOT_NUMBER),
+        (4, "PL", validation.TOO_FEW_CANS),
+    }
+    assert list(report.invalid) == [False, True, True, True, True]
+    assert report.cells["LL1 Dry"].tolist() == [False, True, False, False, False]
+
+
+def test_check_gravity():
+    report = validation.check_gravity({"M1": [100, 100, 100], "M4": [650, 90, 650],
+                                       "Observed Temperature": [20, 20, 35],
+                                       "Pycnometer Capacity": [500, 500, ""]})
+    codes = {(error.row, error.field, error.code) for error in report.errors}
+    assert codes == {(1, "M4", validation.M4_NOT_ABOVE_M1),
+                     (2, "Observed Temperature", validation.TEMPERATURE_RANGE),
+                     (2, "Pycnometer Capacity", validation.MISSING)}
+    assert sorted(report.by_row()) == [1, 2]
+    assert report.numbers["M4"].tolist() == [650, 90, 650]
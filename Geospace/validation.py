@@ -0,0 +1,178 @@
+"""
+Vectorized input validation.
+
+Each check runs over whole columns at once and the result is one report
+for the batch: a FieldError per bad cell (row, field, code, message), a
+per-row invalid flag and a per-field mask of bad cells, so callers can
+mark cells in place instead of stopping at the first error.
+
+Field names follow the lab sheets: "LL2 Dry", "PL1 Moist", "M1",
+"Observed Temperature", ...
+"""
+from collections import namedtuple
+
+import numpy as np
+
+import gravity
+
+# Error codes
+NOT_NUMBER = "not_number"
+MISSING = "missing"
+DRY_ABOVE_MOIST = "dry_above_moist"
+ZERO_DRY_MASS = "zero_dry_mass"
+BAD_BLOWS = "bad_blows"
+TOO_FEW_CANS = "too_few_cans"
+TEMPERATURE_RANGE = "temperature_out_of_range"
+NOT_POSITIVE = "not_positive"
+M4_NOT_ABOVE_M1 = "m4_not_above_m1"
+
+FieldError = namedtuple("FieldError", ["row", "field", "code", "message"])
+
+
+class ValidationReport:
+    """
+    Errors of a batch of rows.  report.cells[field] is a bool array over
+    the rows marking the bad cells of that field.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.errors = []
+        self.invalid = np.zeros(rows, dtype=bool)
+        self.cells = {}
+        self.cans = {}
+        self.numbers = {}
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def add(self, mask, field, code, message):
+        """
+        Record one error for every row where mask is True.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        if not mask.any():
+            return
+        self.invalid |= mask
+        self.cells[field] = self.cells.get(field, np.zeros(self.rows, dtype=bool)) | mask
+        self.errors.extend(FieldError(int(row), field, code, f"{field}: {message}")
+                           for row in np.flatnonzero(mask))
+
+    def by_row(self):
+        """
+        {row: [FieldError, ...]} for the rows with errors.
+        """
+        rows = {}
+        for error in self.errors:
+            rows.setdefault(error.row, []).append(error)
+        return rows
+
+    def messages(self, row):
+        return [error.message for error in self.errors if error.row == row]
+
+
+def parse(values):
+    """
+    (numbers, non_numeric) for raw cell values: numbers has NaN for every
+    cell that is not a number, non_numeric flags the ones that are not
+    blank either.  Only NaN cells are inspected one by one.
+    """
+    raw = np.asarray(values, dtype=object)
+    numbers = gravity.to_float(raw.ravel()).reshape(raw.shape)
+    non_numeric = np.zeros(raw.shape, dtype=bool)
+    nan = np.flatnonzero(np.isnan(numbers))
+    if len(nan):
+        flat = raw.ravel()
+        non_numeric.ravel()[nan] = [not (flat[i] is None or flat[i] != flat[i] or str(flat[i]).strip() == "")
+                                    for i in nan]
+    return numbers, non_numeric
+
+
+def check_cans(report, prefix, cans, fields):
+    """
+    Check one table of cans; fields maps "Can", "Clean", "Moist", "Dry" (and
+    "Blows") to raw (rows, cans) arrays.  The parsed numbers are kept in
+    report.numbers[prefix]; returns the (rows, cans) mask of usable cans.
+    """
+    can_no = np.asarray(fields["Can"], dtype=object).reshape(report.rows, cans)
+    present = np.not_equal(can_no, None) & (np.char.str_len(np.char.strip(can_no.astype(str))) > 0)
+    values = report.numbers[prefix] = {}
+    bad = np.zeros((report.rows, cans), dtype=bool)
+    for name in [name for name in fields if name != "Can"]:
+        numbers, non_numeric = parse(fields[name])
+        numbers = numbers.reshape(report.rows, cans)
+        non_numeric = non_numeric.reshape(report.rows, cans) & present
+        missing = np.isnan(numbers) & present & ~non_numeric
+        values[name] = numbers
+        bad |= non_numeric | missing
+        for can in range(cans):
+            field = f"{prefix}{can + 1} {name}"
+            report.add(non_numeric[:, can], field, NOT_NUMBER, "not a number")
+            report.add(missing[:, can], field, MISSING, "missing")
+
+    clean, moist, dry = values["Clean"], values["Moist"], values["Dry"]
+    with np.errstate(invalid="ignore"):
+        dry_above_moist = present & (dry > moist)
+        zero_dry = present & (dry <= clean)
+        bad_blows = (present & np.isfinite(values["Blows"]) & ((values["Blows"] <= 0) |
+                                                            (values["Blows"] != np.round(values["Blows"])))
+                     if "Blows" in values else np.zeros_like(present))
+    for can in range(cans):
+        report.add(dry_above_moist[:, can], f"{prefix}{can + 1} Dry", DRY_ABOVE_MOIST,
+                   "dry weight is more than the moist weight")
+        report.add(zero_dry[:, can], f"{prefix}{can + 1} Dry", ZERO_DRY_MASS,
+                   "no dry soil (dry weight not above the clean can)")
+        report.add(bad_blows[:, can], f"{prefix}{can + 1} Blows", BAD_BLOWS,
+                   "blow count must be a whole number above 0")
+    return present & ~(bad | dry_above_moist | zero_dry | bad_blows)
+
+
+def check_atterberg(fields, rows, liquid_cans=3, plastic_cans=2):
+    """
+    Validate Atterberg rows; fields maps sheet column names ("LL1 Can",
+    "LL1 Clean", ..., "PL2 Dry") to raw values per row.  Rows also need
+    two usable liquid-limit cans and one plastic-limit can; report.cans
+    holds the usable-can masks and report.numbers the parsed values per
+    table ("LL", "PL").
+    """
+    report = ValidationReport(rows)
+
+    def table(prefix, cans, names):
+        return {name: np.column_stack([np.asarray(fields.get(f"{prefix}{i} {name}", [""] * rows), dtype=object)
+                                       for i in range(1, cans + 1)])
+                for name in names}
+
+    report.cans = {
+        "LL": check_cans(report, "LL", liquid_cans, table("LL", liquid_cans, ["Can", "Clean", "Moist", "Dry", "Blows"])),
+        "PL": check_cans(report, "PL", plastic_cans, table("PL", plastic_cans, ["Can", "Clean", "Moist", "Dry"])),
+    }
+    report.add(report.cans["LL"].sum(axis=1) < 2, "LL", TOO_FEW_CANS, "at least two liquid limit cans are needed")
+    report.add(report.cans["PL"].sum(axis=1) < 1, "PL", TOO_FEW_CANS, "no plastic limit can")
+    return report
+
+
+def check_gravity(fields, rows=None):
+    """
+    Validate pycnometer rows; fields maps "M1", "M4", "Observed Temperature"
+    and "Pycnometer Capacity" to raw values (or floats) per row.  The
+    parsed numbers are kept in report.numbers.
+    """
+    rows = len(fields["M1"]) if rows is None else rows
+    report = ValidationReport(rows)
+    numbers = report.numbers
+    for name in ["M1", "M4", "Observed Temperature", "Pycnometer Capacity"]:
+        numbers[name], non_numeric = parse(fields.get(name, [""] * rows))
+        report.add(non_numeric, name, NOT_NUMBER, "not a number")
+        report.add(np.isnan(numbers[name]) & ~non_numeric, name, MISSING, "missing")
+
+    temperature = numbers["Observed Temperature"]
+    with np.errstate(invalid="ignore"):
+        report.add(np.isfinite(temperature) & ~gravity.temperature_in_range(temperature),
+                   "Observed Temperature", TEMPERATURE_RANGE,
+                   f"out of range ({gravity.MIN_TEMPERATURE:g}°C to {gravity.MAX_TEMPERATURE:g}°C)")
+        report.add(numbers["M4"] <= numbers["M1"], "M4", M4_NOT_ABOVE_M1,
+                   "not heavier than the empty pycnometer")
+        report.add(numbers["Pycnometer Capacity"] <= 0, "Pycnometer Capacity", NOT_POSITIVE,
+                   "must be above 0")
+    return report